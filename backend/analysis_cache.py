@@ -0,0 +1,184 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Configuration for the LLM analysis cache
+ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+# Defaults to the user's cache directory, outside the working tree.
+ANALYSIS_CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH") or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "atlas", "analysis_cache.db"
+)
+ANALYSIS_CACHE_MEMORY_SIZE = int(os.getenv("ANALYSIS_CACHE_MEMORY_SIZE", "1024"))
+ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+ANALYSIS_CACHE_MAX_ROWS = int(os.getenv("ANALYSIS_CACHE_MAX_ROWS", "100000"))
+
+
+def normalize_problem_text(problem_text: str) -> str:
+    """Normalizes unicode form and whitespace so trivially different copies of a problem share a cache entry."""
+    return " ".join(unicodedata.normalize("NFC", problem_text).split())
+
+
+def make_cache_key(problem_text: str, model_name: str, catalog_version: str) -> str:
+    """
+    Builds a content address for an analysis from the normalized problem text,
+    the LLM model and the version of the concept catalog offered to the model.
+    """
+    material = json.dumps([normalize_problem_text(problem_text), model_name, catalog_version], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Two-tier cache for LLM problem analyses: a bounded in-memory LRU in front
+    of a persistent SQLite table with TTL and size-based eviction.
+    """
+
+    def __init__(
+        self,
+        path: str = ANALYSIS_CACHE_PATH,
+        memory_size: int = ANALYSIS_CACHE_MEMORY_SIZE,
+        ttl_seconds: int = ANALYSIS_CACHE_TTL_SECONDS,
+        max_rows: int = ANALYSIS_CACHE_MAX_ROWS,
+        enabled: bool = ANALYSIS_CACHE_ENABLED,
+    ):
+        self.path = path
+        self.memory_size = memory_size
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self.enabled = enabled
+        self._memory: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_rows = 0
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        # The SQLite file is only created once the cache is first used.
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                " cache_key TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_analysis_cache_last_accessed ON analysis_cache (last_accessed)")
+            expired = conn.execute("DELETE FROM analysis_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,)).rowcount
+            conn.commit()
+            self._counters["expirations"] += expired
+            self._disk_rows = conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: str, created_at: float, value: dict):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return copy.deepcopy(value)
+                del self._memory[key]
+
+            conn = self._connect()
+            row = conn.execute("SELECT payload, created_at FROM analysis_cache WHERE cache_key = ?", (key,)).fetchone()
+            if row is not None:
+                payload, created_at = row
+                if now - created_at <= self.ttl_seconds:
+                    conn.execute("UPDATE analysis_cache SET last_accessed = ? WHERE cache_key = ?", (now, key))
+                    conn.commit()
+                    value = json.loads(payload)
+                    self._remember(key, created_at, value)
+                    self._counters["disk_hits"] += 1
+                    return copy.deepcopy(value)
+                conn.execute("DELETE FROM analysis_cache WHERE cache_key = ?", (key,))
+                conn.commit()
+                self._disk_rows -= 1
+                self._counters["expirations"] += 1
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, key: str, value: dict):
+        if not self.enabled:
+            return
+        now = time.time()
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._remember(key, now, value)
+            conn = self._connect()
+            existed = conn.execute("SELECT 1 FROM analysis_cache WHERE cache_key = ?", (key,)).fetchone() is not None
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (cache_key, payload, created_at, last_accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            if not existed:
+                self._disk_rows += 1
+            if self._disk_rows > self.max_rows:
+                # Evict the least recently used rows to get back under the size limit.
+                evicted = conn.execute(
+                    "DELETE FROM analysis_cache WHERE cache_key IN ("
+                    " SELECT cache_key FROM analysis_cache ORDER BY last_accessed ASC LIMIT ?)",
+                    (self._disk_rows - self.max_rows,),
+                ).rowcount
+                self._disk_rows -= evicted
+                self._counters["evictions"] += evicted
+            conn.commit()
+            self._counters["stores"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM analysis_cache")
+                self._conn.commit()
+            self._disk_rows = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["memory_hits"] + self._counters["disk_hits"] + self._counters["misses"]
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            return {
+                "enabled": self.enabled,
+                **self._counters,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_rows,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,86 @@
+"""
+Async read functions for the dashboard endpoints.
+
+They run the statements built in backend.crud on an AsyncSession (see
+main.get_async_db), so a read waits on the event loop instead of holding
+one of the threadpool's worker threads. Writes stay on the sync path.
+"""
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud, models
+
+
+async def get_student(db: AsyncSession, student_id: str) -> Optional[models.Student]:
+    return await db.get(models.Student, student_id)
+
+
+async def get_students(db: AsyncSession, limit: Optional[int] = None, after: Optional[tuple] = None) -> List[models.Student]:
+    return (await db.scalars(crud.students_statement(limit, after))).all()
+
+
+async def get_coach(db: AsyncSession, coach_id: str) -> Optional[models.Coach]:
+    return await db.get(models.Coach, coach_id)
+
+
+async def get_coaches(db: AsyncSession, limit: Optional[int] = None, after: Optional[tuple] = None) -> List[models.Coach]:
+    return (await db.scalars(crud.coaches_statement(limit, after))).all()
+
+
+async def get_students_by_coach(db: AsyncSession, coach_id: str) -> List[models.Student]:
+    return (await db.scalars(crud.students_by_coach_statement(coach_id))).all()
+
+
+async def get_submissions_by_student(
+    db: AsyncSession, student_id: str, limit: Optional[int] = None, after: Optional[tuple] = None
+) -> List[models.Submission]:
+    return (await db.scalars(crud.submissions_by_student_statement(student_id, limit, after))).all()
+
+
+async def get_submissions_by_coach(db: AsyncSession, coach_id: str, **filters) -> List[models.Submission]:
+    """Same feed as crud.get_submissions_by_coach; the concept is loaded with the query."""
+    return (await db.scalars(crud.submissions_by_coach_statement(coach_id, **filters))).all()
+
+
+async def get_vector_history_by_student(
+    db: AsyncSession, student_id: str, limit: Optional[int] = None, after: Optional[tuple] = None
+) -> list:
+    return (await db.execute(crud.vector_history_by_student_statement(student_id, limit, after))).all()
+
+
+async def get_latest_vector_for_student(db: AsyncSession, student_id: str):
+    current = await db.get(models.StudentCurrentVector, student_id)
+    if current is not None:
+        return current
+    return (await db.scalars(crud.latest_vector_history_statement(student_id))).first()
+
+
+async def get_vector_axes_by_student(db: AsyncSession, student_id: str) -> list:
+    return (await db.execute(crud.vector_axes_statement(student_id))).all()
+
+
+async def get_current_vectors(db: AsyncSession, student_ids: Optional[list] = None) -> list:
+    return (await db.execute(crud.current_vectors_statement(student_ids))).all()
+
+
+async def get_student_names(db: AsyncSession, student_ids: List[str]) -> dict:
+    return dict((await db.execute(crud.student_names_statement(student_ids))).all())
+
+
+async def get_cohort_vectors(db: AsyncSession, coach_id: str, student_ids: Optional[list] = None) -> list:
+    return (await db.execute(crud.cohort_vectors_statement(coach_id, student_ids))).all()
+
+
+async def get_anki_cards_by_student(
+    db: AsyncSession, student_id: str, limit: Optional[int] = None, after: Optional[tuple] = None
+) -> List[models.AnkiCard]:
+    return (await db.scalars(crud.anki_cards_by_student_statement(student_id, limit, after))).all()
+
+
+async def get_student_mastery_by_student(db: AsyncSession, student_id: str) -> List[models.StudentMastery]:
+    return (await db.scalars(crud.student_mastery_by_student_statement(student_id))).all()
+
+
+async def get_reports_by_student(db: AsyncSession, student_id: str) -> List[models.WeeklyReport]:
+    return (await db.scalars(crud.reports_by_student_statement(student_id))).all()
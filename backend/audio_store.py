@@ -0,0 +1,172 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Configuration for the synthesized audio store
+AUDIO_STORE_DIR = os.getenv("AUDIO_STORE_DIR") or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "atlas", "audio_store"
+)
+AUDIO_STORE_MAX_BYTES = int(os.getenv("AUDIO_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+AUDIO_MEDIA_TYPES = {
+    "wav": "audio/wav",
+    "mp3": "audio/mpeg",
+}
+
+
+def make_audio_key(text: str, speaker_id: str, output_format: str) -> str:
+    """Content address of a synthesized explanation."""
+    material = json.dumps([text, speaker_id, output_format], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class AudioStore:
+    """
+    Content-addressed directory of synthesized audio files, capped at
+    `max_bytes` with least-recently-used eviction.
+
+    Files are named `<key>.<format>`. Access times are kept in the file mtime,
+    so the LRU order survives restarts. Concurrent requests for the same key
+    synthesize it only once.
+    """
+
+    def __init__(self, root: str = AUDIO_STORE_DIR, max_bytes: int = AUDIO_STORE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Per-key [lock, number of threads holding or waiting for it]
+        self._key_locks: dict[str, list] = {}
+        self._index: Optional["OrderedDict[str, tuple[str, int]]"] = None
+        self._total_bytes = 0
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _load_index(self):
+        # Called with self._lock held. The directory is only scanned once.
+        if self._index is not None:
+            return
+        entries = []
+        if os.path.isdir(self.root):
+            for entry in os.scandir(self.root):
+                key, _, ext = entry.name.partition(".")
+                if entry.is_file() and ext in AUDIO_MEDIA_TYPES and len(key) == 64:
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, key, entry.name, stat.st_size))
+        entries.sort()
+        self._index = OrderedDict((key, (name, size)) for _, key, name, size in entries)
+        self._total_bytes = sum(size for _, _, _, size in entries)
+        logger.debug(f"Audio store at {self.root} holds {len(self._index)} files ({self._total_bytes} bytes).")
+
+    def get_path(self, key: str) -> Optional[str]:
+        """Returns the file for `key` and marks it as recently used, or None if it is not stored."""
+        with self._lock:
+            self._load_index()
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            self._index.move_to_end(key)
+        path = os.path.join(self.root, entry[0])
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                if self._index.pop(key, None):
+                    self._total_bytes -= entry[1]
+            return None
+        return path
+
+    def media_type(self, path: str) -> str:
+        return AUDIO_MEDIA_TYPES.get(path.rsplit(".", 1)[-1], "application/octet-stream")
+
+    def put(self, key: str, output_format: str, data: bytes) -> str:
+        os.makedirs(self.root, exist_ok=True)
+        name = f"{key}.{output_format}"
+        path = os.path.join(self.root, name)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            self._load_index()
+            previous = self._index.pop(key, None)
+            if previous:
+                self._total_bytes -= previous[1]
+            self._index[key] = (name, len(data))
+            self._total_bytes += len(data)
+            self._evict()
+        return path
+
+    def _evict(self):
+        # Called with self._lock held; the newest file is always kept.
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, (name, size) = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self._counters["evictions"] += 1
+            try:
+                os.remove(os.path.join(self.root, name))
+            except FileNotFoundError:
+                pass
+            logger.debug(f"Evicted audio {key} ({size} bytes) from the audio store.")
+
+    def get_or_synthesize(
+        self,
+        text: str,
+        synthesize: Callable[..., bytes],
+        speaker_id: str = "default",
+        output_format: str = "wav",
+    ) -> str:
+        """
+        Returns the key of the stored audio for this text, calling
+        `synthesize(text, speaker_id=..., output_format=...)` only if it is not
+        stored yet. Errors from `synthesize` propagate and nothing is stored.
+        """
+        key = make_audio_key(text, speaker_id, output_format)
+        if self.get_path(key):
+            self._count("hits")
+            return key
+
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                # Another thread may have synthesized it while we waited.
+                if self.get_path(key):
+                    self._count("hits")
+                    return key
+                self._count("misses")
+                data = synthesize(text, speaker_id=speaker_id, output_format=output_format)
+                self.put(key, output_format, data)
+                return key
+        finally:
+            with self._lock:
+                # Only the last user drops the lock; a thread arriving earlier must find it and wait.
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._load_index()
+            return {
+                "root": self.root,
+                "files": len(self._index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                **self._counters,
+            }
@@ -0,0 +1,255 @@
+"""
+Axis distribution analytics over a coach's roster.
+
+Each student's latest vector comes from the student_current_vector projection
+in one query joined through student_coach_relation, and is kept per coach as
+an (n, 11) NumPy matrix. From it, all axes at once:
+
+- mean and standard deviation;
+- quantiles (COHORT_QUANTILES);
+- histograms over COHORT_HISTOGRAM_BINS equal bins of 0-100;
+- the 11x11 Pearson correlation matrix (null where an axis does not vary).
+
+The matrix is a materialized cache refreshed incrementally: when vectors are
+committed (see vector_stats.on_vectors_committed), only the affected rows are
+marked stale and re-read with a small IN query on the next request; the
+aggregates are then recomputed from memory. Roster changes drop the cached
+cohorts, and COHORT_STATS_MAX_AGE_SECONDS bounds how long writes from other
+processes can go unnoticed. Like vector_stats, the matrix is only ever read
+from the primary: a read replica may not have replayed the commit that
+marked a row stale yet.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import async_crud, models, vector_stats
+from .crud import VECTOR_AXES
+
+logger = logging.getLogger(__name__)
+
+COHORT_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+COHORT_HISTOGRAM_BINS = int(os.getenv("COHORT_HISTOGRAM_BINS", "10"))
+COHORT_STATS_MAX_AGE_SECONDS = float(os.getenv("COHORT_STATS_MAX_AGE_SECONDS", "300"))
+COHORT_STATS_CACHE_SIZE = int(os.getenv("COHORT_STATS_CACHE_SIZE", "1000"))  # coaches
+
+ROSTER_TABLES = {models.student_coach_relation.name, models.Student.__tablename__, models.Coach.__tablename__}
+_ROSTER_DIRTY_KEY = "cohort_roster_dirty"
+
+
+def _optional(value) -> Optional[float]:
+    return float(value) if np.isfinite(value) else None
+
+
+def compute_cohort_stats(coach_id: str, roster_size: int, values: np.ndarray) -> dict:
+    """`values` holds one row of VECTOR_AXES per student that has a vector."""
+    count = len(values)
+    edges = np.linspace(0, 100, COHORT_HISTOGRAM_BINS + 1)
+    result = {
+        "coach_id": coach_id,
+        "roster_size": roster_size,
+        "students_with_vectors": count,
+        "axis_order": list(VECTOR_AXES),
+        "histogram_edges": edges.tolist(),
+        "axes": {},
+        "correlation": [],
+    }
+    if not count:
+        return result
+
+    means, stds = values.mean(axis=0), values.std(axis=0)
+    quantiles = np.quantile(values, COHORT_QUANTILES, axis=0)
+    # Bin index of every value; 100 belongs to the last bin.
+    bins = np.minimum((values * COHORT_HISTOGRAM_BINS / 100).astype(np.int64), COHORT_HISTOGRAM_BINS - 1)
+    histograms = (bins[:, :, None] == np.arange(COHORT_HISTOGRAM_BINS)).sum(axis=0)
+    if count > 1:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlation = np.corrcoef(values, rowvar=False)
+    else:
+        correlation = np.full((len(VECTOR_AXES), len(VECTOR_AXES)), np.nan)
+
+    for i, axis in enumerate(VECTOR_AXES):
+        result["axes"][axis] = {
+            "mean": float(means[i]),
+            "std": float(stds[i]),
+            "quantiles": {f"p{round(q * 100)}": float(quantiles[j, i]) for j, q in enumerate(COHORT_QUANTILES)},
+            "histogram": histograms[i].tolist(),
+        }
+    result["correlation"] = [[_optional(value) for value in row] for row in correlation]
+    return result
+
+
+class CohortSnapshot:
+    """The latest vectors of one coach's students, as a matrix with a row per student."""
+
+    def __init__(self, coach_id: str, rows: list):
+        self.coach_id = coach_id
+        self.roster = {row[0] for row in rows}
+        with_vectors = [row for row in rows if row[1] is not None]
+        self.index = {row[0]: i for i, row in enumerate(with_vectors)}
+        self.values = np.array([row[1:] for row in with_vectors], dtype=np.float64).reshape(-1, len(VECTOR_AXES))
+        self.stale = set()
+        self.stats: Optional[dict] = None
+        self.loaded_at = time.monotonic()
+
+    def patch(self, rows: list) -> bool:
+        """Applies re-read rows; False if the matrix cannot be patched (a vector disappeared)."""
+        appended = []
+        for student_id, *axes in rows:
+            i = self.index.get(student_id)
+            if axes[0] is None:
+                if i is not None:
+                    return False
+                continue
+            if i is None:
+                self.index[student_id] = len(self.values) + len(appended)
+                appended.append(axes)
+            else:
+                self.values[i] = axes
+        if appended:
+            self.values = np.vstack([self.values, np.array(appended, dtype=np.float64)])
+        self.stats = None
+        return True
+
+
+class CohortStatsCache:
+    """
+    LRU of CohortSnapshots by coach. `generation()` changes on every vector
+    commit and roster change; a snapshot loaded while it changed is used for
+    that request but not stored, as it may already be out of date.
+    """
+
+    def __init__(self, max_coaches: int = COHORT_STATS_CACHE_SIZE, max_age: float = COHORT_STATS_MAX_AGE_SECONDS):
+        self.max_coaches = max_coaches
+        self.max_age = max_age
+        self._snapshots: "OrderedDict[str, CohortSnapshot]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def checkout(self, coach_id: str):
+        """The cached snapshot (or None) and the students to re-read, which are no longer marked stale."""
+        with self._lock:
+            snapshot = self._snapshots.get(coach_id)
+            if snapshot is None or time.monotonic() - snapshot.loaded_at >= self.max_age:
+                self._snapshots.pop(coach_id, None)
+                return None, set()
+            self._snapshots.move_to_end(coach_id)
+            stale, snapshot.stale = snapshot.stale, set()
+            return snapshot, stale
+
+    def restore_stale(self, snapshot: CohortSnapshot, stale: set):
+        """Marks students taken by `checkout` stale again after their re-read failed."""
+        with self._lock:
+            snapshot.stale.update(stale)
+
+    def store(self, snapshot: CohortSnapshot, generation: int):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._snapshots[snapshot.coach_id] = snapshot
+            self._snapshots.move_to_end(snapshot.coach_id)
+            while len(self._snapshots) > self.max_coaches:
+                self._snapshots.popitem(last=False)
+
+    def patch(self, snapshot: CohortSnapshot, rows: list):
+        with self._lock:
+            if not snapshot.patch(rows):
+                self._snapshots.pop(snapshot.coach_id, None)
+
+    def stats(self, snapshot: CohortSnapshot) -> dict:
+        with self._lock:
+            if snapshot.stats is None:
+                snapshot.stats = compute_cohort_stats(snapshot.coach_id, len(snapshot.roster), snapshot.values)
+            return snapshot.stats
+
+    def mark_stale(self, student_ids: Optional[frozenset]):
+        """New vectors for `student_ids` (None: anyone) were committed."""
+        with self._lock:
+            self._generation += 1
+            if student_ids is None:
+                self._snapshots.clear()
+                return
+            for snapshot in self._snapshots.values():
+                changed = student_ids & snapshot.roster
+                if changed:
+                    snapshot.stale.update(changed)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._snapshots.clear()
+
+    def __len__(self):
+        return len(self._snapshots)
+
+
+cache = CohortStatsCache()
+vector_stats.on_vectors_committed(cache.mark_stale)
+
+
+async def get_cohort_stats(db: AsyncSession, coach_id: str) -> Optional[dict]:
+    """The coach's cohort stats, or None if the coach does not exist. `db` must be a primary session."""
+    generation = cache.generation()
+    snapshot, stale = cache.checkout(coach_id)
+    if snapshot is None:
+        rows = await async_crud.get_cohort_vectors(db, coach_id)
+        if not rows and await async_crud.get_coach(db, coach_id) is None:
+            return None
+        snapshot = CohortSnapshot(coach_id, rows)
+        cache.store(snapshot, generation)
+        logger.debug(f"Loaded cohort of coach {coach_id}: {len(snapshot.roster)} students.")
+    elif stale:
+        try:
+            rows = await async_crud.get_cohort_vectors(db, coach_id, sorted(stale))
+        except BaseException:
+            # Also on cancellation: the next request must still re-read these students.
+            cache.restore_stale(snapshot, stale)
+            raise
+        cache.patch(snapshot, rows)
+        logger.debug(f"Refreshed {len(stale)} student(s) in the cohort of coach {coach_id}.")
+    return cache.stats(snapshot)
+
+
+def _is_roster_object(obj) -> bool:
+    return getattr(obj, "__tablename__", None) in ROSTER_TABLES
+
+
+@event.listens_for(Session, "after_flush")
+def _track_roster_writes(session, flush_context):
+    # Adding to Student.coaches / Coach.students marks the owning object dirty.
+    if any(_is_roster_object(obj) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info[_ROSTER_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_roster_writes(orm_execute_state):
+    if orm_execute_state.is_select:
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) in ROSTER_TABLES:
+        orm_execute_state.session.info[_ROSTER_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _clear_after_roster_commit(session):
+    if session.info.pop(_ROSTER_DIRTY_KEY, False):
+        cache.clear()
+        logger.debug("Cohort stats cleared after a roster change.")
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_roster_writes(session):
+    session.info.pop(_ROSTER_DIRTY_KEY, None)
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from itertools import chain
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+# Snapshots are also refreshed after this many seconds so that writes made by
+# other processes (e.g. the populate scripts) are eventually picked up.
+CONCEPT_CATALOG_MAX_AGE_SECONDS = float(os.getenv("CONCEPT_CATALOG_MAX_AGE_SECONDS", "60"))
+
+CONCEPTS_TABLE = models.ConceptsLibrary.__tablename__
+_DIRTY_KEY = "concept_catalog_dirty"
+
+
+class CatalogConcept(NamedTuple):
+    concept_id: str
+    curriculum_id: Optional[str]
+    concept_name: str
+    manim_data_path: Optional[str]
+    description: Optional[str]
+
+
+class ConceptCatalog:
+    """
+    Immutable snapshot of the ConceptsLibrary table with lookup maps and the
+    pre-joined concept ID list used in LLM prompts.
+
+    `version` increases every time the catalog is invalidated within this
+    process. `fingerprint` is a digest of the catalog contents and is stable
+    across processes, so it can be used in persistent cache keys.
+    """
+
+    def __init__(self, version: int, concepts: list[CatalogConcept]):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.concepts = tuple(concepts)
+        self.by_id = MappingProxyType({c.concept_id: c for c in self.concepts})
+        by_name = {}
+        for c in self.concepts:
+            by_name.setdefault(c.concept_name, c)
+        self.by_name = MappingProxyType(by_name)
+        self.prompt_fragment = ", ".join(c.concept_id for c in self.concepts)
+        # Same row the previous `db.query(ConceptsLibrary).first()` fallback returned.
+        self.default = self.concepts[0] if self.concepts else None
+        material = json.dumps(sorted([list(c) for c in self.concepts]), ensure_ascii=False)
+        self.fingerprint = hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
+    def get(self, concept_id: Optional[str]) -> Optional[CatalogConcept]:
+        return self.by_id.get(concept_id) if concept_id else None
+
+    def find_by_name(self, concept_name: str) -> Optional[CatalogConcept]:
+        return self.by_name.get(concept_name)
+
+    def __len__(self):
+        return len(self.concepts)
+
+
+_lock = threading.Lock()
+_generation = 1
+_snapshot: Optional[ConceptCatalog] = None
+
+
+def get_catalog(db: Session) -> ConceptCatalog:
+    """Returns the current catalog snapshot, loading it with a single query if it is missing or stale."""
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - snapshot.loaded_at < CONCEPT_CATALOG_MAX_AGE_SECONDS:
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshot
+        if snapshot is not None and time.monotonic() - snapshot.loaded_at < CONCEPT_CATALOG_MAX_AGE_SECONDS:
+            return snapshot
+        rows = db.query(models.ConceptsLibrary).all()
+        concepts = [CatalogConcept(r.concept_id, r.curriculum_id, r.concept_name, r.manim_data_path, r.description) for r in rows]
+        snapshot = ConceptCatalog(_generation, concepts)
+        if _snapshot is not None and _snapshot.fingerprint != snapshot.fingerprint:
+            # The table was changed by another process; publish it as a new version.
+            snapshot = ConceptCatalog(_bump_generation(), concepts)
+        _snapshot = snapshot
+        logger.debug(f"Loaded concept catalog version {snapshot.version} with {len(snapshot)} concepts.")
+        return snapshot
+
+
+def _bump_generation() -> int:
+    global _generation
+    _generation += 1
+    return _generation
+
+
+def invalidate():
+    """Drops the current snapshot. Call this after writing to ConceptsLibrary outside an ORM session."""
+    global _snapshot
+    with _lock:
+        _bump_generation()
+        _snapshot = None
+    logger.debug("Concept catalog invalidated.")
+
+
+def _is_concept(obj) -> bool:
+    # Compare by table name: some scripts import the models module outside the backend package.
+    return getattr(obj, "__tablename__", None) == CONCEPTS_TABLE
+
+
+@event.listens_for(Session, "after_flush")
+def _track_concept_writes(session, flush_context):
+    if any(_is_concept(obj) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_concept_writes(orm_execute_state):
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and _is_concept(mapper.class_):
+        orm_execute_state.session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop(_DIRTY_KEY, False):
+        invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_writes(session):
+    session.info.pop(_DIRTY_KEY, None)
+
+
+@event.listens_for(models.Base.metadata, "after_create")
+@event.listens_for(models.Base.metadata, "after_drop")
+def _invalidate_on_schema_change(target, connection, **kw):
+    invalidate()
@@ -1,25 +1,81 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Integer, String, and_, delete, event, exists, insert, literal_column, or_, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, joinedload
 from . import models, schemas
 from datetime import datetime, UTC, timedelta
-from typing import Optional, List
-import uuid
+from typing import Iterator, Optional, List
 import logging
 from . import kakao_sender
 import requests
 from fastapi import HTTPException
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from .fish_speech_adapter import FishSpeechAdapter # Import FishSpeechAdapter
+from .analysis_cache import AnalysisCache, make_cache_key, normalize_problem_text
+from .audio_store import AudioStore
+from .keyword_matcher import KeywordMatcher
+from .resilience import OutboundGuard
+from . import concept_catalog
+from . import ids
+from . import http_client
+from . import llm_stream
+from .database import create_session_factory
+from .pagination import apply_keyset
 
 logger = logging.getLogger(__name__)
 
 # Placeholder for external LLM API configuration
 LLM_API_URL = os.getenv("LLM_API_URL", "http://localhost:11434/api/generate") # Ollama API endpoint
 LLM_MODEL_NAME = os.getenv("LLM_MODEL_NAME", "llama2") # Default Ollama model
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "120"))
+
+# External Manim Agent API configuration
+MANIM_AGENT_API_URL = os.getenv("MANIM_AGENT_API_URL", "http://your_manim_agent_api_url/generate")
+MANIM_AGENT_API_KEY = os.getenv("MANIM_AGENT_API_KEY", "your_manim_agent_api_key")
+MANIM_AGENT_READ_TIMEOUT = float(os.getenv("MANIM_AGENT_READ_TIMEOUT", "60"))
+MANIM_AGENT_ENABLED = os.getenv("MANIM_AGENT_ENABLED", "false").lower() == "true"
+MANIM_AGENT_DEFAULT_URL = "https://youtube.com/watch?v=default_manim_video"
+MANIM_AGENT_ERROR_URL = "https://youtube.com/watch?v=error_manim_video"
+
+# Post-analysis stages (TTS, Manim video request) run concurrently with the DB writes.
+POST_ANALYSIS_WORKERS = int(os.getenv("POST_ANALYSIS_WORKERS", "8"))
+TTS_STAGE_DEADLINE = float(os.getenv("TTS_STAGE_DEADLINE", "35"))
+MANIM_STAGE_DEADLINE = float(os.getenv("MANIM_STAGE_DEADLINE", "65"))
+AUDIO_ERROR_URL = "https://audio.example.com/error.wav"
+AUDIO_PUBLIC_BASE_URL = os.getenv("AUDIO_PUBLIC_BASE_URL", "")  # prefix for /audio/{hash} links, e.g. the API origin
+post_analysis_executor = ThreadPoolExecutor(max_workers=POST_ANALYSIS_WORKERS, thread_name_prefix="post-analysis")
+
+# Batch submissions analyse their problems concurrently, bounded per process.
+SUBMISSION_BATCH_MAX_ITEMS = int(os.getenv("SUBMISSION_BATCH_MAX_ITEMS", "50"))
+BATCH_ANALYSIS_CONCURRENCY = int(os.getenv("BATCH_ANALYSIS_CONCURRENCY", "4"))
+BATCH_PACK_PROMPTS = os.getenv("BATCH_PACK_PROMPTS", "false").lower() == "true"  # several problems per Ollama prompt
+BATCH_PACK_SIZE = int(os.getenv("BATCH_PACK_SIZE", "5"))
+# A PROCESSING claim older than this is presumed abandoned by a stopped worker; well above LLM_READ_TIMEOUT.
+SUBMISSION_PROCESSING_LEASE_SECONDS = int(os.getenv("SUBMISSION_PROCESSING_LEASE_SECONDS", "900"))
+ASSESSMENT_BULK_MAX_ITEMS = int(os.getenv("ASSESSMENT_BULK_MAX_ITEMS", "20000"))
+VECTOR_HISTORY_RAW_DAYS = int(os.getenv("VECTOR_HISTORY_RAW_DAYS", "90"))  # raw vectors are kept this long
+VECTOR_HISTORY_DAILY_DAYS = int(os.getenv("VECTOR_HISTORY_DAILY_DAYS", "365"))  # then daily rollups, then weekly
+VECTOR_STUDENT_IDS_OPTION = "vector_student_ids"  # execution option naming the students a bulk vector statement touches
+IN_CLAUSE_CHUNK = 500  # ids per IN (...) lookup; stays under SQLite's bound-parameter limit
+EXPORT_DATASETS = ("vector-history", "submissions", "llm-logs")
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))  # rows per export read transaction
+batch_analysis_executor = ThreadPoolExecutor(max_workers=BATCH_ANALYSIS_CONCURRENCY, thread_name_prefix="batch-analysis")
 
 # Initialize FishSpeechAdapter globally
 fish_speech_adapter = FishSpeechAdapter()
 
+# Cache of LLM analyses, shared by every submission in the process
+analysis_cache = AnalysisCache()
+
+# Circuit breaker and adaptive concurrency limit for Ollama calls
+llm_guard = OutboundGuard("Ollama")
+
+# Synthesized explanations, addressed by their text so each is only synthesized once
+audio_store = AudioStore()
+
 # Load LLM simulation configuration
 LLM_SIM_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config", "llm_sim_config.json")
 llm_sim_configs = []
@@ -30,6 +86,7 @@ except FileNotFoundError:
     logger.warning(f"LLM simulation config file not found at {LLM_SIM_CONFIG_PATH}. Using default simulations.")
 except json.JSONDecodeError:
     logger.error(f"Error decoding LLM simulation config file at {LLM_SIM_CONFIG_PATH}. Using default simulations.")
+llm_sim_matcher = KeywordMatcher.from_configs(llm_sim_configs)
 
 # Load Manim simulation configuration
 MANIM_SIM_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config", "manim_sim_config.json")
@@ -42,6 +99,118 @@ except FileNotFoundError:
 except json.JSONDecodeError:
     logger.error(f"Error decoding Manim simulation config file at {MANIM_SIM_CONFIG_PATH}. Using default simulations.")
 
+ANALYSIS_FIELDS_PROMPT = """
+Here's what you need to provide:
+1.  `concept_id`: Identify the SINGLE MOST RELEVANT concept ID from the provided list of `Available Concept IDs`. It is crucial to select an ID that directly relates to the core mathematical concept required to solve the problem. If the problem involves multiple concepts, choose the most foundational or primary one. If no perfect match, select the closest general concept.
+2.  `logical_path_text`: Provide a concise, step-by-step logical explanation or solution path for the problem. This should be clear enough for a student to understand the reasoning.
+3.  `vector_data`: Estimate the student's 4-axis capability model scores (0-100) based on the nature of this specific problem. Consider which axes are most challenged or demonstrated by solving this problem.
+    -   `axis1_geo`: Geometric reasoning (spatial/shape recognition)
+    -   `axis1_alg`: Algebraic manipulation (symbol/equation handling)
+    -   `axis1_ana`: Analytical reasoning (function/change inference)
+    -   `axis2_opt`: Optimization (finding efficient solutions)
+    -   `axis2_piv`: Pivoting (flexibility in switching solution approaches)
+    -   `axis2_dia`: Self-diagnosis (ability to identify own errors)
+    -   `axis3_con`: Conceptual knowledge (understanding definitions)
+    -   `axis3_pro`: Procedural knowledge (applying formulas/steps)
+    -   `axis3_ret`: Retrieval speed (speed of recalling facts/methods)
+    -   `axis4_acc`: Calculation accuracy (precision in computation)
+    -   `axis4_gri`: Difficulty tolerance (persistence with challenging problems)
+"""
+
+ANALYSIS_EXAMPLE_JSON = """{
+    "concept_id": "C-HCOM-004",
+    "logical_path_text": "To solve this quadratic equation, first identify the coefficients a, b, and c. Then, apply the quadratic formula x = [-b ± sqrt(b^2 - 4ac)] / 2a. Finally, simplify the results to find the two possible values for x.",
+    "vector_data": {
+        "axis1_geo": 40, "axis1_alg": 85, "axis1_ana": 60,
+        "axis2_opt": 70, "axis2_piv": 60, "axis2_dia": 75,
+        "axis3_con": 80, "axis3_pro": 85, "axis3_ret": 70,
+        "axis4_acc": 90, "axis4_gri": 80
+    }
+}"""
+
+def _build_analysis_prompt(problem_text: str, catalog: concept_catalog.ConceptCatalog) -> str:
+    return f"""
+You are an expert AI assistant for Project ATLAS, specializing in analyzing math problems and student capabilities.
+Your task is to analyze the given math problem and provide a structured JSON output.
+{ANALYSIS_FIELDS_PROMPT}
+Math Problem: "{problem_text}"
+
+Available Concept IDs (from ConceptsLibrary):
+{catalog.prompt_fragment}
+
+Your output MUST be a valid JSON object, formatted exactly as shown in the example below. Do NOT include any other text or markdown outside the JSON.
+
+Example JSON Output:
+```json
+{ANALYSIS_EXAMPLE_JSON}
+```
+"""
+
+def _build_packed_analysis_prompt(problem_texts: List[str], catalog: concept_catalog.ConceptCatalog) -> str:
+    numbered_problems = "\n".join(f'{i + 1}. "{text}"' for i, text in enumerate(problem_texts))
+    return f"""
+You are an expert AI assistant for Project ATLAS, specializing in analyzing math problems and student capabilities.
+Your task is to analyze EACH of the {len(problem_texts)} numbered math problems below and provide a structured JSON output.
+For every problem:
+{ANALYSIS_FIELDS_PROMPT}
+Math Problems:
+{numbered_problems}
+
+Available Concept IDs (from ConceptsLibrary):
+{catalog.prompt_fragment}
+
+Your output MUST be a valid JSON object with a single key `analyses`: an array with exactly {len(problem_texts)} analysis objects, in the same order as the numbered problems. Do NOT include any other text or markdown outside the JSON.
+
+Example analysis object:
+```json
+{ANALYSIS_EXAMPLE_JSON}
+```
+"""
+
+def _resolve_concept(llm_concept_id: Optional[str], problem_text: str, catalog: concept_catalog.ConceptCatalog) -> tuple:
+    """Maps the concept ID suggested by the LLM onto the catalog. Returns (concept_id, manim_data_path)."""
+    concept = catalog.get(llm_concept_id)
+    
+    if not concept:
+        logger.warning(f"Ollama suggested concept_id '{llm_concept_id}' not found in ConceptsLibrary. Attempting fallback.")
+        # Fallback logic...
+        if "이차방정식" in problem_text:
+            concept = catalog.find_by_name("이차방정식")
+        # ... other fallbacks
+        if not concept:
+            concept = catalog.default
+
+    if not concept:
+        raise HTTPException(status_code=500, detail="LLM analysis failed to identify a concept and no fallback found.")
+
+    manim_data_path = concept.manim_data_path if concept.manim_data_path else "https://www.youtube.com/watch?v=default_manim_video"
+    return concept.concept_id, manim_data_path
+
+def _resolve_llm_analysis(llm_analysis_data: dict, problem_text: str, catalog: concept_catalog.ConceptCatalog) -> dict:
+    """Validates one parsed LLM analysis and maps it onto a known concept."""
+    llm_concept_id = llm_analysis_data.get("concept_id")
+    if llm_concept_id:
+        llm_concept_id = llm_concept_id.strip()
+    logger.debug(f"Ollama extracted llm_concept_id: '{llm_concept_id}'")
+    logical_path_text = llm_analysis_data.get("logical_path_text")
+    vector_data = llm_analysis_data.get("vector_data")
+
+    if not llm_concept_id or not logical_path_text or not vector_data:
+        logger.error(f"Ollama response missing required fields: {llm_analysis_data}")
+        raise HTTPException(status_code=500, detail="Ollama response missing required fields.")
+
+    concept_id, manim_data_path = _resolve_concept(llm_concept_id, problem_text, catalog)
+    
+    for axis in vector_data:
+        vector_data[axis] = max(0, min(100, vector_data[axis]))
+
+    return {
+        "concept_id": concept_id,
+        "logical_path_text": logical_path_text,
+        "manim_data_path": manim_data_path,
+        "vector_data": vector_data
+    }
+
 def call_external_llm_for_analysis(db: Session, problem_text: str) -> dict:
     """
     Calls a local Ollama LLM to analyze the problem text and return
@@ -52,15 +221,11 @@ def call_external_llm_for_analysis(db: Session, problem_text: str) -> dict:
     if os.getenv("USE_MOCK_LLM", "false").lower() == "true":
         logger.info("Using mock LLM response for analysis.")
         mock_response = None
-        # Find a matching mock configuration
-        for config in llm_sim_configs:
-            for keyword in config["keywords"]:
-                if keyword in problem_text:
-                    logger.debug(f"Found matching LLM mock for keyword: {keyword}")
-                    mock_response = config["response"]
-                    break
-            if mock_response:
-                break
+        # Find a matching mock configuration; the first config with a matching keyword wins
+        config_index = llm_sim_matcher.find(problem_text)
+        if config_index is not None:
+            logger.debug(f"Found matching LLM mock config #{config_index}")
+            mock_response = llm_sim_configs[config_index]["response"]
         
         # Default mock response if no keyword matches
         if not mock_response:
@@ -77,10 +242,11 @@ def call_external_llm_for_analysis(db: Session, problem_text: str) -> dict:
             }
 
         # The mock response should also be processed to get the manim path
-        concept = db.query(models.ConceptsLibrary).filter(models.ConceptsLibrary.concept_id == mock_response["concept_id"]).first()
+        catalog = concept_catalog.get_catalog(db)
+        concept = catalog.get(mock_response["concept_id"])
         if not concept:
              # Fallback if concept in mock is not in DB
-            concept = db.query(models.ConceptsLibrary).first()
+            concept = catalog.default
             if not concept:
                  raise HTTPException(status_code=500, detail="Mock LLM concept not found and no fallback available.")
 
@@ -93,48 +259,15 @@ def call_external_llm_for_analysis(db: Session, problem_text: str) -> dict:
             "vector_data": mock_response["vector_data"]
         }
 
-    headers = {"Content-Type": "application/json"}
-    prompt = f"""
-You are an expert AI assistant for Project ATLAS, specializing in analyzing math problems and student capabilities.
-Your task is to analyze the given math problem and provide a structured JSON output.
+    catalog = concept_catalog.get_catalog(db)
+    cache_key = make_cache_key(problem_text, LLM_MODEL_NAME, catalog.fingerprint)
+    cached_analysis = analysis_cache.get(cache_key)
+    if cached_analysis:
+        logger.debug(f"Using cached LLM analysis for key {cache_key}.")
+        return cached_analysis
 
-Here's what you need to provide:
-1.  `concept_id`: Identify the SINGLE MOST RELEVANT concept ID from the provided list of `Available Concept IDs`. It is crucial to select an ID that directly relates to the core mathematical concept required to solve the problem. If the problem involves multiple concepts, choose the most foundational or primary one. If no perfect match, select the closest general concept.
-2.  `logical_path_text`: Provide a concise, step-by-step logical explanation or solution path for the problem. This should be clear enough for a student to understand the reasoning.
-3.  `vector_data`: Estimate the student's 4-axis capability model scores (0-100) based on the nature of this specific problem. Consider which axes are most challenged or demonstrated by solving this problem.
-    -   `axis1_geo`: Geometric reasoning (spatial/shape recognition)
-    -   `axis1_alg`: Algebraic manipulation (symbol/equation handling)
-    -   `axis1_ana`: Analytical reasoning (function/change inference)
-    -   `axis2_opt`: Optimization (finding efficient solutions)
-    -   `axis2_piv`: Pivoting (flexibility in switching solution approaches)
-    -   `axis2_dia`: Self-diagnosis (ability to identify own errors)
-    -   `axis3_con`: Conceptual knowledge (understanding definitions)
-    -   `axis3_pro`: Procedural knowledge (applying formulas/steps)
-    -   `axis3_ret`: Retrieval speed (speed of recalling facts/methods)
-    -   `axis4_acc`: Calculation accuracy (precision in computation)
-    -   `axis4_gri`: Difficulty tolerance (persistence with challenging problems)
-
-Math Problem: "{problem_text}"
-
-Available Concept IDs (from ConceptsLibrary):
-{', '.join([c.concept_id for c in db.query(models.ConceptsLibrary).all()])}
-
-Your output MUST be a valid JSON object, formatted exactly as shown in the example below. Do NOT include any other text or markdown outside the JSON.
-
-Example JSON Output:
-```json
-{{
-    "concept_id": "C-HCOM-004",
-    "logical_path_text": "To solve this quadratic equation, first identify the coefficients a, b, and c. Then, apply the quadratic formula x = [-b ± sqrt(b^2 - 4ac)] / 2a. Finally, simplify the results to find the two possible values for x.",
-    "vector_data": {{
-        "axis1_geo": 40, "axis1_alg": 85, "axis1_ana": 60,
-        "axis2_opt": 70, "axis2_piv": 60, "axis2_dia": 75,
-        "axis3_con": 80, "axis3_pro": 85, "axis3_ret": 70,
-        "axis4_acc": 90, "axis4_gri": 80
-    }}
-}}
-```
-"""
+    headers = {"Content-Type": "application/json"}
+    prompt = _build_analysis_prompt(problem_text, catalog)
     payload = {
         "model": LLM_MODEL_NAME,
         "prompt": prompt,
@@ -142,89 +275,222 @@ Example JSON Output:
         "format": "json"
     }
     
-    try:
-        response = requests.post(LLM_API_URL, headers=headers, json=payload, timeout=120)
-        response.raise_for_status()
-        ollama_response = response.json()
-        logger.debug(f"Raw Ollama response: {ollama_response}")
-        
-        raw_llm_output = ollama_response.get("response", ollama_response)
-        logger.debug(f"Extracted raw_llm_output: {raw_llm_output}")
-        
+    # Fails fast with 503 while Ollama is unhealthy or saturated.
+    with llm_guard.admit():
         try:
-            llm_analysis_data = json.loads(raw_llm_output)
-            logger.debug(f"Parsed llm_analysis_data: {llm_analysis_data}")
-        except json.JSONDecodeError as e:
-            logger.error(f"Ollama response was not valid JSON. Error: {e}. Response: {raw_llm_output}")
-            raise HTTPException(status_code=500, detail=f"Ollama did not return valid JSON: {raw_llm_output}")
-
-        llm_concept_id = llm_analysis_data.get("concept_id")
-        if llm_concept_id:
-            llm_concept_id = llm_concept_id.strip()
-        logger.debug(f"Ollama extracted llm_concept_id: '{llm_concept_id}'")
-        logical_path_text = llm_analysis_data.get("logical_path_text")
-        vector_data = llm_analysis_data.get("vector_data")
-
-        if not llm_concept_id or not logical_path_text or not vector_data:
-            logger.error(f"Ollama response missing required fields: {llm_analysis_data}")
-            raise HTTPException(status_code=500, detail="Ollama response missing required fields.")
-
-        concept = db.query(models.ConceptsLibrary).filter(models.ConceptsLibrary.concept_id == llm_concept_id).first()
+            response = http_client.default_client.post(LLM_API_URL, headers=headers, json=payload, timeout=LLM_READ_TIMEOUT)
+            response.raise_for_status()
+            ollama_response = response.json()
+            logger.debug(f"Raw Ollama response: {ollama_response}")
         
-        if not concept:
-            logger.warning(f"Ollama suggested concept_id '{llm_concept_id}' not found in ConceptsLibrary. Attempting fallback.")
-            # Fallback logic...
-            if "이차방정식" in problem_text:
-                concept = db.query(models.ConceptsLibrary).filter(models.ConceptsLibrary.concept_name == "이차방정식").first()
-            # ... other fallbacks
-            if not concept:
-                concept = db.query(models.ConceptsLibrary).first()
+            raw_llm_output = ollama_response.get("response", ollama_response)
+            logger.debug(f"Extracted raw_llm_output: {raw_llm_output}")
+        
+            try:
+                llm_analysis_data = json.loads(raw_llm_output)
+                logger.debug(f"Parsed llm_analysis_data: {llm_analysis_data}")
+            except json.JSONDecodeError as e:
+                logger.error(f"Ollama response was not valid JSON. Error: {e}. Response: {raw_llm_output}")
+                raise HTTPException(status_code=500, detail=f"Ollama did not return valid JSON: {raw_llm_output}")
+
+            llm_analysis_result = _resolve_llm_analysis(llm_analysis_data, problem_text, catalog)
+            analysis_cache.put(cache_key, llm_analysis_result)
+            return llm_analysis_result
+
+        except requests.exceptions.Timeout as e:
+            logger.error(f"Ollama API request timed out. URL: {LLM_API_URL}, Payload: {json.dumps(payload)}", exc_info=True)
+            raise HTTPException(status_code=504, detail="Ollama API request timed out")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error calling Ollama API. URL: {LLM_API_URL}, Error: {e}", exc_info=True)
+            raise HTTPException(status_code=503, detail=f"Failed to connect to Ollama service: {e}")
+        except Exception as e:
+            logger.error(f"An unexpected error occurred in LLM analysis. Error: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Error processing Ollama response: {e}")
+
+def stream_llm_analysis(db: Session, problem_text: str) -> Iterator[dict]:
+    """
+    Streaming variant of call_external_llm_for_analysis. Reads Ollama's token
+    stream, parses the JSON object as it is generated and yields events as soon
+    as fields are known:
 
-        if not concept:
-            raise HTTPException(status_code=500, detail="LLM analysis failed to identify a concept and no fallback found.")
+        {"event": "concept", "concept_id": ..., "manim_data_path": ...}
+        {"event": "logical_path_text", "logical_path_text": ...}
+        {"event": "analysis", "analysis": <same dict as call_external_llm_for_analysis>}
 
-        concept_id = concept.concept_id
-        manim_data_path = concept.manim_data_path if concept.manim_data_path else "https://www.youtube.com/watch?v=default_manim_video"
-        
-        for axis in vector_data:
-            vector_data[axis] = max(0, min(100, vector_data[axis]))
+    The connection is closed as soon as the object is complete, which stops
+    any further generation. Errors are raised as HTTPException.
+    """
+    # Mock and cached analyses are complete already; replay them as events.
+    if os.getenv("USE_MOCK_LLM", "false").lower() == "true":
+        known_analysis = call_external_llm_for_analysis(db, problem_text)
+    else:
+        catalog = concept_catalog.get_catalog(db)
+        cache_key = make_cache_key(problem_text, LLM_MODEL_NAME, catalog.fingerprint)
+        known_analysis = analysis_cache.get(cache_key)
 
-        return {
-            "concept_id": concept_id,
-            "logical_path_text": logical_path_text,
-            "manim_data_path": manim_data_path,
-            "vector_data": vector_data
-        }
+    if known_analysis:
+        yield {"event": "concept", "concept_id": known_analysis["concept_id"], "manim_data_path": known_analysis["manim_data_path"]}
+        yield {"event": "logical_path_text", "logical_path_text": known_analysis["logical_path_text"]}
+        yield {"event": "analysis", "analysis": known_analysis}
+        return
+
+    headers = {"Content-Type": "application/json"}
+    payload = {
+        "model": LLM_MODEL_NAME,
+        "prompt": _build_analysis_prompt(problem_text, catalog),
+        "stream": True,
+        "format": "json"
+    }
+    parser = llm_stream.IncrementalJSONObjectParser()
+
+    with llm_guard.admit():
+        try:
+            with http_client.default_client.post(LLM_API_URL, headers=headers, json=payload, timeout=LLM_READ_TIMEOUT, stream=True) as response:
+                response.raise_for_status()
+                for token in llm_stream.iter_ollama_tokens(response.iter_lines()):
+                    for key, value in parser.feed(token):
+                        if key == "concept_id" and isinstance(value, str):
+                            concept_id, manim_data_path = _resolve_concept(value.strip(), problem_text, catalog)
+                            yield {"event": "concept", "concept_id": concept_id, "manim_data_path": manim_data_path}
+                        elif key == "logical_path_text" and value:
+                            yield {"event": "logical_path_text", "logical_path_text": value}
+                    if parser.closed:
+                        break
+            if not parser.closed:
+                raise HTTPException(status_code=500, detail="Ollama stream ended before the JSON object was complete.")
+            llm_analysis_result = _resolve_llm_analysis(parser.result(), problem_text, catalog)
+        except requests.exceptions.Timeout as e:
+            logger.error(f"Ollama API stream timed out. URL: {LLM_API_URL}", exc_info=True)
+            raise HTTPException(status_code=504, detail="Ollama API request timed out")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error calling Ollama API. URL: {LLM_API_URL}, Error: {e}", exc_info=True)
+            raise HTTPException(status_code=503, detail=f"Failed to connect to Ollama service: {e}")
+        except Exception as e:
+            logger.error(f"An unexpected error occurred in streamed LLM analysis. Error: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Error processing Ollama response: {e}")
+
+    analysis_cache.put(cache_key, llm_analysis_result)
+    yield {"event": "analysis", "analysis": llm_analysis_result}
+
+def call_external_llm_for_packed_analysis(db: Session, problem_texts: List[str]) -> list:
+    """
+    Analyses several problems with a single Ollama prompt. Returns one entry
+    per problem, in order: the analysis dict, or the HTTPException raised for
+    that problem. Cached analyses are reused and not sent to the LLM again.
+    """
+    if os.getenv("USE_MOCK_LLM", "false").lower() == "true":
+        return [_analyze_or_error(db, problem_text) for problem_text in problem_texts]
+
+    catalog = concept_catalog.get_catalog(db)
+    results = [None] * len(problem_texts)
+    cache_keys = [make_cache_key(problem_text, LLM_MODEL_NAME, catalog.fingerprint) for problem_text in problem_texts]
+    pending = []
+    for i, cache_key in enumerate(cache_keys):
+        results[i] = analysis_cache.get(cache_key)
+        if results[i] is None:
+            pending.append(i)
+    if not pending:
+        return results
+
+    headers = {"Content-Type": "application/json"}
+    payload = {
+        "model": LLM_MODEL_NAME,
+        "prompt": _build_packed_analysis_prompt([problem_texts[i] for i in pending], catalog),
+        "stream": False,
+        "format": "json"
+    }
 
-    except requests.exceptions.Timeout as e:
-        logger.error(f"Ollama API request timed out. URL: {LLM_API_URL}, Payload: {json.dumps(payload)}", exc_info=True)
-        raise HTTPException(status_code=504, detail="Ollama API request timed out")
+    error = None
+    try:
+        with llm_guard.admit():
+            response = http_client.default_client.post(LLM_API_URL, headers=headers, json=payload, timeout=LLM_READ_TIMEOUT)
+            response.raise_for_status()
+        raw_llm_output = response.json().get("response")
+        analyses = json.loads(raw_llm_output).get("analyses")
+        if not isinstance(analyses, list):
+            raise ValueError(f"expected an 'analyses' list, got: {raw_llm_output}")
+    except HTTPException as e:
+        # Rejected by the LLM guard
+        error = e
+    except requests.exceptions.Timeout:
+        logger.error(f"Packed Ollama API request timed out. URL: {LLM_API_URL}", exc_info=True)
+        error = HTTPException(status_code=504, detail="Ollama API request timed out")
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error calling Ollama API. URL: {LLM_API_URL}, Error: {e}", exc_info=True)
-        raise HTTPException(status_code=503, detail=f"Failed to connect to Ollama service: {e}")
+        logger.error(f"Error calling Ollama API for packed analysis. URL: {LLM_API_URL}, Error: {e}", exc_info=True)
+        error = HTTPException(status_code=503, detail=f"Failed to connect to Ollama service: {e}")
     except Exception as e:
-        logger.error(f"An unexpected error occurred in LLM analysis. Error: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error processing Ollama response: {e}")
+        logger.error(f"Packed Ollama response could not be parsed. Error: {e}", exc_info=True)
+        error = HTTPException(status_code=500, detail=f"Error processing Ollama response: {e}")
+
+    if error is not None:
+        for i in pending:
+            results[i] = error
+        return results
+
+    if len(analyses) != len(pending):
+        logger.warning(f"Packed Ollama response has {len(analyses)} analyses for {len(pending)} problems.")
+    for position, i in enumerate(pending):
+        if position >= len(analyses) or not isinstance(analyses[position], dict):
+            results[i] = HTTPException(status_code=500, detail="Ollama response missing analysis for this problem.")
+            continue
+        try:
+            results[i] = _resolve_llm_analysis(analyses[position], problem_texts[i], catalog)
+        except HTTPException as e:
+            results[i] = e
+            continue
+        analysis_cache.put(cache_keys[i], results[i])
+    return results
+
+def _analyze_or_error(db: Session, problem_text: str):
+    try:
+        return call_external_llm_for_analysis(db, problem_text)
+    except HTTPException as e:
+        return e
+
+def _run_batch_analysis(session_factory, problem_texts: List[str], packed: bool) -> list:
+    # Each analysis thread reads the concept catalog through its own session.
+    db = session_factory()
+    try:
+        if packed:
+            return call_external_llm_for_packed_analysis(db, problem_texts)
+        return [_analyze_or_error(db, problem_texts[0])]
+    finally:
+        db.close()
+
+def analyze_problems(session_factory, problem_texts: List[str]) -> list:
+    """
+    Analyses problems on the batch executor, at most BATCH_ANALYSIS_CONCURRENCY
+    LLM requests at a time. With BATCH_PACK_PROMPTS, up to BATCH_PACK_SIZE
+    problems share one request. Returns one analysis dict or HTTPException per
+    problem, in order.
+    """
+    chunk_size = max(1, BATCH_PACK_SIZE) if BATCH_PACK_PROMPTS else 1
+    chunks = [problem_texts[i:i + chunk_size] for i in range(0, len(problem_texts), chunk_size)]
+    futures = [
+        batch_analysis_executor.submit(_run_batch_analysis, session_factory, chunk, BATCH_PACK_PROMPTS)
+        for chunk in chunks
+    ]
+    results = []
+    for future in futures:
+        results.extend(future.result())
+    return results
 
 def process_submission(db: Session, student_id: str, problem_text: str, manim_visualization_json: Optional[dict] = None):
     # 1. Call external LLM for analysis
     llm_analysis_result = call_external_llm_for_analysis(db, problem_text)
+    db_submission = store_analyzed_submission(db, student_id, problem_text, llm_analysis_result, manim_visualization_json)
+    return db_submission, db_submission.manim_data_path
 
-    concept_id = llm_analysis_result["concept_id"]
-    logical_path_text = llm_analysis_result["logical_path_text"]
-    manim_data_path = llm_analysis_result["manim_data_path"]
-    llm_vector_data = llm_analysis_result["vector_data"]
 
-    submission_id = f"sub_{uuid.uuid4().hex[:8]}"
-
-    audio_explanation_url = None
-    try:
-        audio_data = fish_speech_adapter.synthesize_speech(logical_path_text)
-        audio_explanation_url = f"https://audio.example.com/{uuid.uuid4().hex}.wav"
-        logger.info(f"Simulated audio generation for submission {submission_id}. Audio URL: {audio_explanation_url}")
-    except Exception as e:
-        logger.error(f"An unexpected error occurred during speech synthesis for submission {submission_id}: {e}")
-        audio_explanation_url = "https://audio.example.com/error.wav"
+def store_analyzed_submission(
+    db: Session,
+    student_id: str,
+    problem_text: str,
+    llm_analysis_result: dict,
+    manim_visualization_json: Optional[dict] = None,
+) -> models.Submission:
+    """Creates a completed submission from an LLM analysis and commits it with its assessment and vector."""
+    submission_id = ids.new_id(ids.SUBMISSION_PREFIX)
 
     # 2. Create a new submission record
     db_submission = models.Submission(
@@ -232,15 +498,211 @@ def process_submission(db: Session, student_id: str, problem_text: str, manim_vi
         student_id=student_id,
         problem_text=problem_text,
         submitted_at=datetime.now(UTC),
-        concept_id=concept_id,
-        logical_path_text=logical_path_text,
-        status="COMPLETE",
-        manim_data_path=manim_data_path,
-        audio_explanation_url=audio_explanation_url,
         manim_visualization_json=json.dumps(manim_visualization_json) if manim_visualization_json else None,
     )
     db.add(db_submission)
-    db.flush()
+
+    _apply_submission_analysis(db, db_submission, llm_analysis_result)
+
+    _commit_keeping_loaded_state(db)
+    return db_submission
+
+
+def _commit_keeping_loaded_state(db: Session):
+    """
+    Commits without expiring the session's objects. Everything the write path
+    returns was set in Python (including submitted_at), so reloading it
+    after the commit would only cost another SELECT per row.
+    """
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+
+def process_submission_batch(db: Session, student_id: str, items: List[schemas.SubmissionBatchItem]) -> list:
+    """
+    Analyses a worksheet of problems for one student and stores every
+    successful submission, assessment and vector in a single transaction.
+    Identical problems (after whitespace normalisation) are analysed once.
+
+    Returns (db_submission, error) per item, in request order; exactly one of
+    the two is set.
+    """
+    unique_texts = {}
+    for item in items:
+        unique_texts.setdefault(normalize_problem_text(item.problem_text), item.problem_text)
+
+    session_factory = create_session_factory(db.get_bind())
+    analyses = dict(zip(unique_texts, analyze_problems(session_factory, list(unique_texts.values()))))
+
+    outcomes = []
+    stages = {}
+    try:
+        for item in items:
+            key = normalize_problem_text(item.problem_text)
+            llm_analysis_result = analyses[key]
+            if isinstance(llm_analysis_result, HTTPException):
+                outcomes.append((None, str(llm_analysis_result.detail)))
+                continue
+
+            db_submission = models.Submission(
+                submission_id=ids.new_id(ids.SUBMISSION_PREFIX),
+                student_id=student_id,
+                problem_text=item.problem_text,
+                submitted_at=datetime.now(UTC),
+                manim_visualization_json=json.dumps(item.manim_visualization_json) if item.manim_visualization_json else None,
+            )
+            db.add(db_submission)
+            # Duplicate problems share the audio/video of the first occurrence.
+            if key not in stages:
+                stages[key] = _start_post_analysis_stages(db_submission.submission_id, llm_analysis_result)
+            _record_submission_analysis(db, db_submission, llm_analysis_result)
+            # Later problems of the same student read this one's vector and mastery rows.
+            db.flush()
+            outcomes.append((db_submission, None))
+
+        for db_submission, _ in outcomes:
+            if db_submission is not None:
+                _finish_post_analysis_stages(db_submission, stages[normalize_problem_text(db_submission.problem_text)])
+        _commit_keeping_loaded_state(db)
+    except Exception:
+        db.rollback()
+        raise
+    return outcomes
+
+
+def create_pending_submission(db: Session, student_id: str, problem_text: str, manim_visualization_json: Optional[dict] = None) -> models.Submission:
+    """
+    Stores a submission in the PENDING state so that its analysis can be
+    picked up by the background submission worker pool.
+    """
+    db_submission = models.Submission(
+        submission_id=ids.new_id(ids.SUBMISSION_PREFIX),
+        student_id=student_id,
+        problem_text=problem_text,
+        submitted_at=datetime.now(UTC),
+        status="PENDING",
+        manim_visualization_json=json.dumps(manim_visualization_json) if manim_visualization_json else None,
+    )
+    db.add(db_submission)
+    db.commit()
+    db.refresh(db_submission)
+    return db_submission
+
+
+def complete_pending_submission(db: Session, submission_id: str) -> Optional[models.Submission]:
+    """
+    Runs the LLM analysis, speech synthesis and vector/mastery update for a
+    submission created by create_pending_submission.
+    """
+    # Claimed with one conditional UPDATE, so that of several workers handed the same id only one proceeds.
+    claimed = db.execute(
+        update(models.Submission)
+        .where(models.Submission.submission_id == submission_id, models.Submission.status == "PENDING")
+        .values(status="PROCESSING", processing_started_at=datetime.now(UTC))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    db_submission = get_submission(db, submission_id)
+    if not db_submission:
+        logger.error(f"Pending submission {submission_id} not found.")
+        return None
+    if claimed != 1:
+        logger.warning(f"Submission {submission_id} is {db_submission.status}, not PENDING. Skipping.")
+        return db_submission
+
+    llm_analysis_result = call_external_llm_for_analysis(db, db_submission.problem_text)
+    _apply_submission_analysis(db, db_submission, llm_analysis_result)
+
+    _commit_keeping_loaded_state(db)
+    return db_submission
+
+
+def mark_submission_failed(db: Session, submission_id: str, detail: Optional[str] = None) -> Optional[models.Submission]:
+    db_submission = get_submission(db, submission_id)
+    if db_submission:
+        db_submission.status = "FAILED"
+        db_submission.error_detail = detail
+        db.commit()
+        db.refresh(db_submission)
+    return db_submission
+
+
+def reset_interrupted_submissions(
+    db: Session, now: Optional[datetime] = None, lease_seconds: int = SUBMISSION_PROCESSING_LEASE_SECONDS
+) -> List[str]:
+    """
+    Ids of the PENDING submissions, oldest first, after putting back to
+    PENDING those whose PROCESSING claim is older than `lease_seconds` (or
+    predates processing_started_at). Younger claims may belong to a worker
+    in another process that is still running, and are left alone; a PENDING
+    id queued elsewhere as well is only claimed once. The analysis is written
+    in a single commit at the end, so an abandoned one left nothing behind.
+    """
+    submission = models.Submission
+    cutoff = _as_utc(now or datetime.now(UTC)) - timedelta(seconds=lease_seconds)
+    reclaimed = db.execute(
+        update(submission)
+        .where(
+            submission.status == "PROCESSING",
+            or_(submission.processing_started_at < cutoff, submission.processing_started_at.is_(None)),
+        )
+        .values(status="PENDING", processing_started_at=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    if reclaimed:
+        logger.warning(f"Reclaimed {reclaimed} submission(s) whose processing lease expired.")
+    return list(db.scalars(
+        select(submission.submission_id)
+        .where(submission.status == "PENDING")
+        .order_by(submission.submitted_at, submission.submission_id)
+    ))
+
+
+def _apply_submission_analysis(db: Session, db_submission: models.Submission, llm_analysis_result: dict):
+    """
+    Fills in an analysed submission and records the resulting assessment,
+    vector history, LLM log and mastery updates. Nothing is flushed: the
+    caller's commit writes the rows in one flush, after the audio URL is
+    known, so the submission is inserted once instead of inserted and then
+    updated.
+    """
+    # Start the slow external stages first; the DB writes below run while they are in flight.
+    stages = _start_post_analysis_stages(db_submission.submission_id, llm_analysis_result)
+    _record_submission_analysis(db, db_submission, llm_analysis_result)
+    _finish_post_analysis_stages(db_submission, stages)
+
+
+def _start_post_analysis_stages(submission_id: str, llm_analysis_result: dict) -> dict:
+    """Submits the speech synthesis and (optional) Manim stages to the post-analysis executor."""
+    concept_id = llm_analysis_result["concept_id"]
+    logical_path_text = llm_analysis_result["logical_path_text"]
+    stages = {
+        "started_at": time.monotonic(),
+        "tts": post_analysis_executor.submit(_synthesize_explanation_audio, submission_id, logical_path_text),
+        "manim": None,
+    }
+    if MANIM_AGENT_ENABLED:
+        stages["manim"] = post_analysis_executor.submit(call_external_manim_agent, concept_id, logical_path_text)
+    return stages
+
+
+def _record_submission_analysis(db: Session, db_submission: models.Submission, llm_analysis_result: dict):
+    """Writes the analysis, assessment, vector history, LLM log and mastery rows without committing."""
+    submission_id = db_submission.submission_id
+    student_id = db_submission.student_id
+    concept_id = llm_analysis_result["concept_id"]
+    logical_path_text = llm_analysis_result["logical_path_text"]
+    llm_vector_data = llm_analysis_result["vector_data"]
+
+    db_submission.concept_id = concept_id
+    db_submission.logical_path_text = logical_path_text
+    db_submission.status = "COMPLETE"
+    db_submission.manim_data_path = llm_analysis_result["manim_data_path"]
 
     # 3. Fetch latest student vector and calculate the new vector
     latest_vector = get_latest_vector_for_student(db, student_id)
@@ -271,15 +733,17 @@ def process_submission(db: Session, student_id: str, problem_text: str, manim_vi
         notes="Generated from LLM analysis of submission, updated with weighted average.",
         vector_data=updated_vector_data,
     )
-    db_assessment, db_vector = create_assessment_and_vector(db, assessment_schema)
+    db_assessment, db_vector = create_assessment_and_vector(db, assessment_schema, commit=False)
 
     # Create an LLMLog to track the AI analysis for future review
     db_llm_log = models.LLMLog(
+        submission=db_submission,
         source_submission_id=submission_id,
         decision="pending_review",
         model_version=LLM_MODEL_NAME,
         coach_feedback=None, # Initially no feedback
         reason_code=None,
+        created_at=datetime.now(UTC),  # see create_student
     )
     db.add(db_llm_log)
 
@@ -301,12 +765,44 @@ def process_submission(db: Session, student_id: str, problem_text: str, manim_vi
             mastery_score=new_mastery_score,
             status="IN_PROGRESS",
         )
-        create_student_mastery(db, mastery_schema)
+        create_student_mastery(db, mastery_schema, commit=False)
 
-    db.commit()
-    db.refresh(db_submission)
 
-    return db_submission, manim_data_path
+def _finish_post_analysis_stages(db_submission: models.Submission, stages: dict):
+    """Collects the external stages, each bounded by its own deadline."""
+    submission_id = db_submission.submission_id
+    db_submission.audio_explanation_url = _await_stage(
+        "tts", stages["tts"], stages["started_at"] + TTS_STAGE_DEADLINE, AUDIO_ERROR_URL, submission_id
+    )
+    if stages["manim"] is not None:
+        manim_video_url = _await_stage(
+            "manim", stages["manim"], stages["started_at"] + MANIM_STAGE_DEADLINE, MANIM_AGENT_ERROR_URL, submission_id
+        )
+        if manim_video_url != MANIM_AGENT_ERROR_URL:
+            db_submission.manim_data_path = manim_video_url
+
+
+def _synthesize_explanation_audio(submission_id: str, logical_path_text: str) -> str:
+    try:
+        audio_hash = audio_store.get_or_synthesize(logical_path_text, fish_speech_adapter.synthesize_speech)
+        audio_explanation_url = f"{AUDIO_PUBLIC_BASE_URL}/audio/{audio_hash}"
+        logger.info(f"Audio explanation for submission {submission_id} stored at {audio_explanation_url}")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred during speech synthesis for submission {submission_id}: {e}")
+        audio_explanation_url = AUDIO_ERROR_URL
+    return audio_explanation_url
+
+
+def _await_stage(stage: str, future, deadline: float, fallback, submission_id: str):
+    """Waits for a post-analysis stage until its deadline, returning `fallback` if it is late or fails."""
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FuturesTimeoutError:
+        future.cancel()
+        logger.warning(f"Post-analysis stage '{stage}' missed its deadline for submission {submission_id}.")
+    except Exception as e:
+        logger.error(f"Post-analysis stage '{stage}' failed for submission {submission_id}: {e}")
+    return fallback
 
 
 # Helper function to get a student
@@ -317,11 +813,40 @@ def get_student(db: Session, student_id: str):
 def get_coach(db: Session, coach_id: str):
     return db.query(models.Coach).filter(models.Coach.coach_id == coach_id).first()
 
+# Keyset pagination orders: a timestamp (where the table has one) then the unique id.
+STUDENT_PAGE_KEY = (models.Student.created_at, models.Student.student_id)
+COACH_PAGE_KEY = (models.Coach.coach_id,)
+SUBMISSION_PAGE_KEY = (models.Submission.submitted_at, models.Submission.submission_id)
+VECTOR_HISTORY_PAGE_KEY = (models.StudentVectorHistory.created_at, models.StudentVectorHistory.vector_id)
+VECTOR_ROLLUP_PAGE_KEY = (models.StudentVectorRollup.last_created_at, models.StudentVectorRollup.last_vector_id)
+ANKI_CARD_PAGE_KEY = (models.AnkiCard.next_review_date, models.AnkiCard.card_id)
+COACH_MEMO_PAGE_KEY = (models.CoachMemo.created_at, models.CoachMemo.memo_id)
+REPORT_PAGE_KEY = (models.WeeklyReport.created_at, models.WeeklyReport.report_id)
+
+# The *_statement builders below are shared with the async read path (backend.async_crud).
+def students_statement(limit: Optional[int] = None, after: Optional[tuple] = None):
+    return apply_keyset(select(models.Student), STUDENT_PAGE_KEY, after, limit)
+
+def get_students(db: Session, limit: Optional[int] = None, after: Optional[tuple] = None) -> List[models.Student]:
+    return db.scalars(students_statement(limit, after)).all()
+
+def coaches_statement(limit: Optional[int] = None, after: Optional[tuple] = None):
+    return apply_keyset(select(models.Coach), COACH_PAGE_KEY, after, limit)
+
+def get_coaches(db: Session, limit: Optional[int] = None, after: Optional[tuple] = None) -> List[models.Coach]:
+    return db.scalars(coaches_statement(limit, after)).all()
+
+def students_by_coach_statement(coach_id: str):
+    relation = models.student_coach_relation
+    return (
+        select(models.Student)
+        .join(relation, relation.c.student_id == models.Student.student_id)
+        .where(relation.c.coach_id == coach_id)
+    )
+
 def get_students_by_coach(db: Session, coach_id: str) -> List[models.Student]:
-    coach = get_coach(db, coach_id)
-    if coach:
-        return coach.students
-    return []
+    # Empty if the coach has no students or does not exist.
+    return db.scalars(students_by_coach_statement(coach_id)).all()
 
 # Helper function to get a parent
 def get_parent(db: Session, parent_id: int):
@@ -335,21 +860,54 @@ def get_assessment(db: Session, assessment_id: str):
 def get_submission(db: Session, submission_id: str):
     return db.query(models.Submission).filter(models.Submission.submission_id == submission_id).first()
 
-def get_submissions_by_coach(db: Session, coach_id: str, status: Optional[str] = None) -> List[models.Submission]:
-    coach = get_coach(db, coach_id)
-    if not coach:
-        return []
-    
-    student_ids = [student.student_id for student in coach.students]
-    if not student_ids:
-        return []
-        
-    query = db.query(models.Submission).filter(models.Submission.student_id.in_(student_ids))
-    
+def submissions_by_student_statement(student_id: str, limit: Optional[int] = None, after: Optional[tuple] = None):
+    query = select(models.Submission).where(models.Submission.student_id == student_id)
+    return apply_keyset(query, SUBMISSION_PAGE_KEY, after, limit)
+
+def get_submissions_by_student(
+    db: Session, student_id: str, limit: Optional[int] = None, after: Optional[tuple] = None
+) -> List[models.Submission]:
+    return db.scalars(submissions_by_student_statement(student_id, limit, after)).all()
+
+def submissions_by_coach_statement(
+    coach_id: str,
+    status: Optional[str] = None,
+    submitted_from: Optional[datetime] = None,
+    submitted_to: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    after: Optional[tuple] = None,
+):
+    relation = models.student_coach_relation
+    query = (
+        select(models.Submission)
+        .join(relation, relation.c.student_id == models.Submission.student_id)
+        .where(relation.c.coach_id == coach_id)
+        .options(joinedload(models.Submission.concept))
+    )
     if status:
-        query = query.filter(models.Submission.status == status)
-        
-    return query.order_by(models.Submission.submitted_at.desc()).all()
+        query = query.where(models.Submission.status == status)
+    if submitted_from:
+        query = query.where(models.Submission.submitted_at >= submitted_from)
+    if submitted_to:
+        query = query.where(models.Submission.submitted_at < submitted_to)
+    return apply_keyset(query, SUBMISSION_PAGE_KEY, after, limit, descending=True)
+
+def get_submissions_by_coach(
+    db: Session,
+    coach_id: str,
+    status: Optional[str] = None,
+    submitted_from: Optional[datetime] = None,
+    submitted_to: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    after: Optional[tuple] = None,
+) -> List[models.Submission]:
+    """
+    The submissions of a coach's students, newest first, in a single query:
+    joined through student_coach_relation, with each submission's concept
+    loaded in the same statement. `submitted_to` is exclusive.
+    """
+    statement = submissions_by_coach_statement(coach_id, status, submitted_from, submitted_to, limit, after)
+    return db.scalars(statement).all()
 
 # Helper function to get a concept
 def get_concept(db: Session, concept_id: str):
@@ -360,7 +918,7 @@ def get_report(db: Session, report_id: int):
     return db.query(models.WeeklyReport).filter(models.WeeklyReport.report_id == report_id).first()
 
 # Student Mastery
-def create_student_mastery(db: Session, mastery: schemas.StudentMastery):
+def create_student_mastery(db: Session, mastery: schemas.StudentMastery, commit: bool = True):
     db_mastery = models.StudentMastery(
         student_id=mastery.student_id,
         concept_id=mastery.concept_id,
@@ -369,6 +927,8 @@ def create_student_mastery(db: Session, mastery: schemas.StudentMastery):
         last_updated=datetime.now(UTC), # Explicitly set last_updated
     )
     db.add(db_mastery)
+    if not commit:
+        return db_mastery
     db.commit()
     db.refresh(db_mastery)
     return db_mastery
@@ -391,7 +951,9 @@ def update_student_mastery(db: Session, student_id: str, concept_id: str, master
 
 # Student CRUD operations
 def create_student(db: Session, student: schemas.StudentCreate):
-    db_student = models.Student(student_id=student.student_id, student_name=student.student_name)
+    # Stamped here rather than by the server default, which has one-second resolution on SQLite
+    # and would not compare correctly with keyset cursors (see migrations.normalize_timestamps).
+    db_student = models.Student(student_id=student.student_id, student_name=student.student_name, created_at=datetime.now(UTC))
     db.add(db_student)
     db.commit()
     db.refresh(db_student)
@@ -419,8 +981,13 @@ def create_assessment_and_vector(
     assessment: schemas.AssessmentCreate,
     ai_model_version: Optional[str] = None,
     ai_reason_code: Optional[str] = None,
+    commit: bool = True,
 ):
-    assessment_id = f"asmt_{uuid.uuid4().hex[:8]}"
+    """
+    Creates an assessment and its vector history row. With commit=False the
+    rows are only added to the session and written by the caller's commit.
+    """
+    assessment_id = ids.new_id(ids.ASSESSMENT_PREFIX)
     db_assessment = models.Assessment(
         assessment_id=assessment_id,
         student_id=assessment.student_id,
@@ -431,11 +998,11 @@ def create_assessment_and_vector(
         ai_reason_code=ai_reason_code,
     )
     db.add(db_assessment)
-    db.flush() # Use flush to get assessment_id before commit
 
-    vector_id = f"vec_{uuid.uuid4().hex[:8]}"
+    vector_id = ids.new_id(ids.VECTOR_PREFIX)
     db_vector = models.StudentVectorHistory( # Corrected here
         vector_id=vector_id,
+        assessment=db_assessment,
         assessment_id=assessment_id,
         student_id=assessment.student_id,
         axis1_geo=assessment.vector_data["axis1_geo"],
@@ -449,22 +1016,483 @@ def create_assessment_and_vector(
         axis3_ret=assessment.vector_data["axis3_ret"],
         axis4_acc=assessment.vector_data["axis4_acc"],
         axis4_gri=assessment.vector_data["axis4_gri"],
+        # Set explicitly: several vectors written in one transaction must keep their order,
+        # and the server default only has one-second resolution on SQLite.
+        created_at=datetime.now(UTC),
     )
     db.add(db_vector)
+    _update_current_vector(db, db_vector)
+    if not commit:
+        return db_assessment, db_vector
     db.commit()
-    db.refresh(db_assessment)
     db.refresh(db_vector)
     return db_assessment, db_vector
 
-def get_latest_vector_for_student(db: Session, student_id: str) -> Optional[models.StudentVectorHistory]:
-    return db.query(models.StudentVectorHistory).filter( # Corrected here
-        models.StudentVectorHistory.student_id == student_id
-    ).order_by(models.StudentVectorHistory.created_at.desc()).first()
+VECTOR_AXES = (
+    "axis1_geo", "axis1_alg", "axis1_ana",
+    "axis2_opt", "axis2_piv", "axis2_dia",
+    "axis3_con", "axis3_pro", "axis3_ret",
+    "axis4_acc", "axis4_gri",
+)
+CURRENT_VECTOR_COLUMNS = ("vector_id", "assessment_id", "created_at") + VECTOR_AXES
+
+_PENDING_CURRENT_VECTORS_KEY = "pending_current_vectors"
+
+def _update_current_vector(db: Session, db_vector: models.StudentVectorHistory):
+    # The projection row references the vector, so it is written once the next flush has
+    # inserted the vector (_write_pending_current_vectors) rather than by flushing here,
+    # which would also write the rest of the session early (e.g. a submission still being filled in).
+    pending = db.info.setdefault(_PENDING_CURRENT_VECTORS_KEY, {})
+    queued = pending.get(db_vector.student_id)
+    if queued is None or db_vector.created_at >= queued.created_at:
+        pending[db_vector.student_id] = db_vector
+
+@event.listens_for(Session, "after_flush_postexec")
+def _write_pending_current_vectors(session, flush_context):
+    pending = session.info.pop(_PENDING_CURRENT_VECTORS_KEY, None)
+    if pending:
+        _upsert_current_vectors(session, [
+            {"student_id": student_id, **{column: getattr(vector, column) for column in CURRENT_VECTOR_COLUMNS}}
+            for student_id, vector in pending.items()
+        ])
+
+@event.listens_for(Session, "after_rollback")
+def _forget_pending_current_vectors(session):
+    session.info.pop(_PENDING_CURRENT_VECTORS_KEY, None)
+
+CURRENT_VECTOR_UPSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+def _upsert_current_vectors(db: Session, rows: list):
+    """
+    Writes projection rows with a single INSERT ... ON CONFLICT DO UPDATE, so
+    that concurrent writers for the same student cannot both insert. A row
+    only replaces a projection that is not newer, so the latest vector wins
+    whatever order the transactions commit in.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect not in CURRENT_VECTOR_UPSERTS:
+        raise RuntimeError(f"Cannot upsert student_current_vector on {dialect}.")
+    table = models.StudentCurrentVector.__table__
+    statement = CURRENT_VECTOR_UPSERTS[dialect](table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.student_id],
+        set_={column: statement.excluded[column] for column in CURRENT_VECTOR_COLUMNS},
+        where=statement.excluded.created_at >= table.c.created_at,
+    )
+    db.connection().execute(statement, rows)
+    # The statement bypasses the unit of work; reload projections this session already holds.
+    for row in rows:
+        current = db.identity_map.get(db.identity_key(models.StudentCurrentVector, row["student_id"]))
+        if current is not None:
+            db.expire(current)
+
+def _chunks(values: list, size: int = IN_CLAUSE_CHUNK):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def _existing_ids(db: Session, column, candidates) -> set:
+    found = set()
+    for chunk in _chunks(list(candidates)):
+        found.update(db.scalars(select(column).where(column.in_(chunk))))
+    return found
+
+def _vector_values(vector_data: dict) -> dict:
+    values = {}
+    for axis in VECTOR_AXES:
+        value = vector_data.get(axis)
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"vector_data.{axis} must be an integer.")
+        if not 0 <= value <= 100:
+            raise ValueError(f"vector_data.{axis} must be between 0 and 100.")
+        values[axis] = value
+    return values
+
+def bulk_create_assessments(db: Session, assessments: List[schemas.AssessmentCreate]) -> List[tuple]:
+    """
+    Writes many assessments and their vector history rows in one transaction,
+    with one multi-row INSERT per table, and moves the students' current
+    vectors along in bulk. Items for unknown students or with incomplete or
+    out-of-range vector_data are skipped instead of failing the whole batch.
+
+    Returns one (assessment_id, vector_id, error) tuple per item, in order.
+    """
+    known_students = _existing_ids(db, models.Student.student_id, {item.student_id for item in assessments})
+    assessment_ids = ids.new_ids(ids.ASSESSMENT_PREFIX, len(assessments))
+    vector_ids = ids.new_ids(ids.VECTOR_PREFIX, len(assessments))
+    now = datetime.now(UTC)
+
+    outcomes = []
+    assessment_rows, vector_rows = [], []
+    latest = {}
+    for index, item in enumerate(assessments):
+        if item.student_id not in known_students:
+            outcomes.append((None, None, f"Student {item.student_id} not found."))
+            continue
+        try:
+            values = _vector_values(item.vector_data)
+        except ValueError as e:
+            outcomes.append((None, None, str(e)))
+            continue
+        assessment_id, vector_id = assessment_ids[index], vector_ids[index]
+        assessment_rows.append({
+            "assessment_id": assessment_id,
+            "student_id": item.student_id,
+            "assessment_type": item.assessment_type,
+            "source_ref_id": item.source_ref_id,
+            "notes": item.notes,
+            "ai_model_version": item.ai_model_version,
+            "ai_reason_code": item.ai_reason_code,
+        })
+        vector_row = {
+            "vector_id": vector_id,
+            "assessment_id": assessment_id,
+            "student_id": item.student_id,
+            # One microsecond apart, so several vectors of a student keep the request's order.
+            "created_at": now + timedelta(microseconds=len(vector_rows)),
+            **values,
+        }
+        vector_rows.append(vector_row)
+        latest[item.student_id] = vector_row
+        outcomes.append((assessment_id, vector_id, None))
+
+    if vector_rows:
+        db.execute(insert(models.Assessment), assessment_rows)
+        db.execute(insert(models.StudentVectorHistory), vector_rows)
+        _bulk_update_current_vectors(db, latest)
+        db.commit()
+    logger.info(f"Bulk assessment insert: {len(vector_rows)} written, {len(assessments) - len(vector_rows)} rejected.")
+    return outcomes
+
+def _bulk_update_current_vectors(db: Session, latest: dict):
+    """Bulk counterpart of _update_current_vector for {student_id: vector row}."""
+    _upsert_current_vectors(db, [
+        {"student_id": student_id, **{column: row[column] for column in CURRENT_VECTOR_COLUMNS}}
+        for student_id, row in latest.items()
+    ])
 
-def get_vector_history_by_student(db: Session, student_id: str) -> List[models.StudentVectorHistory]:
-    return db.query(models.StudentVectorHistory).filter( # Corrected here
+def get_latest_vector_for_student(db: Session, student_id: str):
+    """
+    Returns the student's most recent vector: the StudentCurrentVector
+    projection (a primary-key lookup), or the newest StudentVectorHistory row
+    for students whose projection has not been built yet.
+    """
+    # A vector written in this session whose projection row waits for the next flush
+    queued = db.info.get(_PENDING_CURRENT_VECTORS_KEY, {}).get(student_id)
+    if queued is not None:
+        return queued
+    current = db.get(models.StudentCurrentVector, student_id)
+    if current is not None:
+        return current
+    return db.scalars(latest_vector_history_statement(student_id)).first()
+
+def latest_vector_history_statement(student_id: str):
+    return select(models.StudentVectorHistory).where( # Corrected here
         models.StudentVectorHistory.student_id == student_id
-    ).order_by(models.StudentVectorHistory.created_at.asc()).all()
+    ).order_by(models.StudentVectorHistory.created_at.desc()).limit(1)
+
+def rebuild_student_current_vectors(db: Session, student_id: Optional[str] = None) -> int:
+    """
+    Recomputes the StudentCurrentVector projection from StudentVectorHistory,
+    for one student or for everyone. Returns the number of projected rows.
+    """
+    history = models.StudentVectorHistory.__table__
+    current = models.StudentCurrentVector.__table__
+    newer = history.alias("newer")
+    latest = select(history.c.student_id, *[history.c[column] for column in CURRENT_VECTOR_COLUMNS]).where(
+        ~exists().where(
+            newer.c.student_id == history.c.student_id,
+            or_(
+                newer.c.created_at > history.c.created_at,
+                and_(newer.c.created_at == history.c.created_at, newer.c.vector_id > history.c.vector_id),
+            ),
+        )
+    )
+    delete_stmt = current.delete()
+    if student_id is not None:
+        latest = latest.where(history.c.student_id == student_id)
+        delete_stmt = delete_stmt.where(current.c.student_id == student_id)
+
+    db.execute(delete_stmt)
+    result = db.execute(current.insert().from_select(["student_id", *CURRENT_VECTOR_COLUMNS], latest))
+    db.commit()
+    db.expire_all()
+    return result.rowcount
+
+def vector_history_by_student_statement(student_id: str, limit: Optional[int] = None, after: Optional[tuple] = None):
+    """
+    A student's history, oldest first, merging the raw vectors with the
+    day/week rollups compact_vector_history left for older periods. A rollup
+    reads as its period's last vector. Each tier is paged on its own index
+    before the two are merged, so a page never scans the whole history.
+    """
+    history = models.StudentVectorHistory
+    rollup = models.StudentVectorRollup
+    raw = select(
+        history.vector_id, history.assessment_id, history.student_id, history.created_at,
+        *[getattr(history, axis) for axis in VECTOR_AXES],
+        literal_column("'raw'", String).label("granularity"),
+        literal_column("1", Integer).label("vector_count"),
+    ).where(history.student_id == student_id)
+    rolled = select(
+        rollup.last_vector_id.label("vector_id"), rollup.last_assessment_id.label("assessment_id"),
+        rollup.student_id, rollup.last_created_at.label("created_at"),
+        *[getattr(rollup, axis) for axis in VECTOR_AXES],
+        rollup.granularity, rollup.vector_count,
+    ).where(rollup.student_id == student_id)
+    raw = apply_keyset(raw, VECTOR_HISTORY_PAGE_KEY, after, limit).subquery("raw_history")
+    rolled = apply_keyset(rolled, VECTOR_ROLLUP_PAGE_KEY, after, limit).subquery("rolled_history")
+    merged = union_all(select(raw), select(rolled)).subquery("history")
+    return apply_keyset(select(merged), (merged.c.created_at, merged.c.vector_id), limit=limit)
+
+def vector_axes_statement(student_id: str):
+    """
+    (created_at, *VECTOR_AXES) of a student's history, oldest first, for
+    backend.vector_stats; rolled-up periods contribute their mean vector.
+    """
+    history = models.StudentVectorHistory
+    rollup = models.StudentVectorRollup
+    raw = select(
+        history.created_at, history.vector_id, *[getattr(history, axis) for axis in VECTOR_AXES]
+    ).where(history.student_id == student_id)
+    rolled = select(
+        rollup.last_created_at.label("created_at"), rollup.last_vector_id.label("vector_id"),
+        *[getattr(rollup, f"{axis}_mean").label(axis) for axis in VECTOR_AXES],
+    ).where(rollup.student_id == student_id)
+    merged = union_all(raw, rolled).subquery("history")
+    return (
+        select(merged.c.created_at, *[merged.c[axis] for axis in VECTOR_AXES])
+        .order_by(merged.c.created_at, merged.c.vector_id)
+    )
+
+def student_names_statement(student_ids: list):
+    return select(models.Student.student_id, models.Student.student_name).where(models.Student.student_id.in_(student_ids))
+
+def current_vectors_statement(student_ids: Optional[list] = None):
+    """(student_id, *VECTOR_AXES) from the current-vector projection, for backend.similarity_index."""
+    current = models.StudentCurrentVector
+    query = select(current.student_id, *[getattr(current, axis) for axis in VECTOR_AXES])
+    if student_ids is not None:
+        query = query.where(current.student_id.in_(student_ids))
+    return query
+
+def cohort_vectors_statement(coach_id: str, student_ids: Optional[list] = None):
+    """
+    (student_id, *VECTOR_AXES) of the coach's students from the current-vector
+    projection; the axes are NULL for students without a vector yet.
+    """
+    relation = models.student_coach_relation
+    current = models.StudentCurrentVector
+    query = (
+        select(relation.c.student_id, *[getattr(current, axis) for axis in VECTOR_AXES])
+        .select_from(relation)
+        .outerjoin(current, current.student_id == relation.c.student_id)
+        .where(relation.c.coach_id == coach_id)
+    )
+    if student_ids is not None:
+        query = query.where(relation.c.student_id.in_(student_ids))
+    return query
+
+def _export_source(dataset: str) -> tuple:
+    """(select of the dataset's columns, its unique key, its timestamp, its student id column)"""
+    if dataset == "vector-history":
+        table = models.StudentVectorHistory.__table__
+        return select(table), table.c.vector_id, table.c.created_at, table.c.student_id
+    if dataset == "submissions":
+        table = models.Submission.__table__
+        return select(table), table.c.submission_id, table.c.submitted_at, table.c.student_id
+    if dataset == "llm-logs":
+        # Logs carry no student id of their own; it comes from the source submission.
+        log, submission = models.LLMLog.__table__, models.Submission.__table__
+        query = select(log, submission.c.student_id).select_from(
+            log.outerjoin(submission, log.c.source_submission_id == submission.c.submission_id)
+        )
+        return query, log.c.log_id, log.c.created_at, submission.c.student_id
+    raise ValueError(f"Unknown export dataset '{dataset}'.")
+
+def export_columns(dataset: str) -> list:
+    """Column names of an export chunk; the first is the dataset's unique key."""
+    return [column.key for column in _export_source(dataset)[0].selected_columns]
+
+def export_chunk_statement(
+    dataset: str,
+    after=None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    student_ids: Optional[list] = None,
+    limit: int = EXPORT_CHUNK_ROWS,
+):
+    """
+    Up to `limit` rows of an EXPORT_DATASETS table whose key comes after
+    `after`, in key order, with the timestamp in [start, end) and the
+    student among `student_ids` when those are given. backend.exports walks
+    a table chunk by chunk, each in its own short read transaction.
+    """
+    query, key, timestamp, student_id = _export_source(dataset)
+    if after is not None:
+        query = query.where(key > after)
+    if start is not None:
+        query = query.where(timestamp >= start)
+    if end is not None:
+        query = query.where(timestamp < end)
+    if student_ids:
+        query = query.where(student_id.in_(student_ids))
+    return query.order_by(key).limit(limit)
+
+def get_vector_history_by_student(
+    db: Session, student_id: str, limit: Optional[int] = None, after: Optional[tuple] = None
+) -> list:
+    """
+    Rows shaped like schemas.VectorHistoryEntry, oldest first, raw and
+    rolled-up tiers merged. `limit`/`after` select one keyset page (see backend.pagination).
+    """
+    return db.execute(vector_history_by_student_statement(student_id, limit, after)).all()
+
+def _as_utc(moment: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are UTC.
+    return moment.replace(tzinfo=UTC) if moment.tzinfo is None else moment
+
+def _rollup_period(moment: datetime, granularity: str) -> tuple:
+    start = _as_utc(moment).replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return start, start + timedelta(days=1)
+    start -= timedelta(days=start.weekday())  # weeks start on Monday
+    return start, start + timedelta(days=7)
+
+class _RollupGroup:
+    """Running count, per-axis sums and last vector of one rollup period."""
+
+    def __init__(self):
+        self.count = 0
+        self.sums = [0.0] * len(VECTOR_AXES)
+        self.last = None  # (created_at, vector_id, assessment_id, axes)
+
+    def add(self, count: int, sums, created_at: datetime, vector_id: str, assessment_id: str, axes):
+        self.count += count
+        self.sums = [total + value for total, value in zip(self.sums, sums)]
+        last = (_as_utc(created_at), vector_id, assessment_id, list(axes))
+        if self.last is None or last[:2] > self.last[:2]:
+            self.last = last
+
+    def add_rollup(self, rollup: models.StudentVectorRollup):
+        self.add(
+            rollup.vector_count,
+            [getattr(rollup, f"{axis}_mean") * rollup.vector_count for axis in VECTOR_AXES],
+            rollup.last_created_at, rollup.last_vector_id, rollup.last_assessment_id,
+            [getattr(rollup, axis) for axis in VECTOR_AXES],
+        )
+
+def _protected_vector_ids(db: Session, student_id: str) -> set:
+    """Vectors compaction must keep: the latest one and those the projection or reports point at."""
+    protected = set(db.scalars(select(models.StudentCurrentVector.vector_id).where(models.StudentCurrentVector.student_id == student_id)))
+    latest = db.scalars(latest_vector_history_statement(student_id).with_only_columns(models.StudentVectorHistory.vector_id)).first()
+    if latest is not None:
+        protected.add(latest)
+    for start_id, end_id in db.execute(
+        select(models.WeeklyReport.vector_start_id, models.WeeklyReport.vector_end_id).where(models.WeeklyReport.student_id == student_id)
+    ):
+        protected.update(vector_id for vector_id in (start_id, end_id) if vector_id)
+    return protected
+
+def _compact_student_history(db: Session, student_id: str, raw_cutoff: datetime, daily_cutoff: datetime) -> dict:
+    history = models.StudentVectorHistory
+    rollup = models.StudentVectorRollup
+    protected = _protected_vector_ids(db, student_id)
+    raw_rows = [
+        row for row in db.execute(
+            select(history.vector_id, history.assessment_id, history.created_at, *[getattr(history, axis) for axis in VECTOR_AXES])
+            .where(history.student_id == student_id, history.created_at < raw_cutoff)
+        )
+        if row.vector_id not in protected
+    ]
+    daily_rollups = db.scalars(
+        select(rollup).where(rollup.student_id == student_id, rollup.granularity == "day", rollup.period_start < daily_cutoff)
+    ).all()
+
+    groups = {}
+    for row in raw_rows:
+        granularity = "day" if _as_utc(row.created_at) >= daily_cutoff else "week"
+        key = (granularity, _rollup_period(row.created_at, granularity)[0])
+        axes = [getattr(row, axis) for axis in VECTOR_AXES]
+        groups.setdefault(key, _RollupGroup()).add(1, axes, row.created_at, row.vector_id, row.assessment_id, axes)
+    for daily in daily_rollups:
+        groups.setdefault(("week", _rollup_period(daily.period_start, "week")[0]), _RollupGroup()).add_rollup(daily)
+        db.delete(daily)
+
+    existing = {
+        (current.granularity, _as_utc(current.period_start)): current
+        for current in db.scalars(select(rollup).where(
+            rollup.student_id == student_id,
+            rollup.period_start.in_([period_start for _, period_start in groups]),
+        ))
+        if current not in daily_rollups
+    }
+    for (granularity, period_start), group in groups.items():
+        current = existing.get((granularity, period_start))
+        if current is None:
+            current = models.StudentVectorRollup(
+                student_id=student_id, granularity=granularity, period_start=period_start,
+                period_end=_rollup_period(period_start, granularity)[1],
+            )
+            db.add(current)
+        else:
+            group.add_rollup(current)
+        last_created_at, last_vector_id, last_assessment_id, last_axes = group.last
+        current.vector_count = group.count
+        current.last_vector_id, current.last_assessment_id, current.last_created_at = last_vector_id, last_assessment_id, last_created_at
+        for axis, total, value in zip(VECTOR_AXES, group.sums, last_axes):
+            setattr(current, axis, value)
+            setattr(current, f"{axis}_mean", total / group.count)
+
+    vector_ids = [row.vector_id for row in raw_rows]
+    assessment_ids = list({row.assessment_id for row in raw_rows})
+    # Named, so that backend.vector_stats only drops this student's cached stats.
+    options = {VECTOR_STUDENT_IDS_OPTION: (student_id,)}
+    for chunk in _chunks(vector_ids):
+        db.execute(delete(history).where(history.vector_id.in_(chunk)).execution_options(synchronize_session=False, **options))
+    for chunk in _chunks(assessment_ids):
+        db.execute(delete(models.Assessment).where(
+            models.Assessment.assessment_id.in_(chunk),
+            ~exists().where(history.assessment_id == models.Assessment.assessment_id),
+        ).execution_options(synchronize_session=False))
+    db.commit()
+    return {"vectors": len(vector_ids), "rollups": len(groups), "promoted": len(daily_rollups)}
+
+def compact_vector_history(
+    db: Session,
+    now: Optional[datetime] = None,
+    student_id: Optional[str] = None,
+    raw_days: int = VECTOR_HISTORY_RAW_DAYS,
+    daily_days: int = VECTOR_HISTORY_DAILY_DAYS,
+) -> dict:
+    """
+    Rolls vectors older than `raw_days` into per-day rollups, and vectors and
+    daily rollups older than `daily_days` into per-week rollups, merging into
+    rollups an earlier run left. The rolled-up vectors and their assessments
+    are deleted. A student's latest vector and vectors referenced by the
+    current-vector projection or weekly reports stay raw. Commits per student;
+    returns totals.
+    """
+    now = _as_utc(now or datetime.now(UTC))
+    raw_cutoff = now - timedelta(days=raw_days)
+    daily_cutoff = now - timedelta(days=daily_days)
+    history = models.StudentVectorHistory
+    rollup = models.StudentVectorRollup
+    if student_id is not None:
+        student_ids = [student_id]
+    else:
+        student_ids = sorted(set(db.scalars(select(history.student_id).where(history.created_at < raw_cutoff).distinct())) | set(
+            db.scalars(select(rollup.student_id).where(rollup.granularity == "day", rollup.period_start < daily_cutoff).distinct())
+        ))
+
+    totals = {"students": 0, "vectors": 0, "rollups": 0, "promoted": 0}
+    for current_student_id in student_ids:
+        counts = _compact_student_history(db, current_student_id, raw_cutoff, daily_cutoff)
+        if any(counts.values()):
+            totals["students"] += 1
+        for key, value in counts.items():
+            totals[key] += value
+    logger.info(f"Compacted vector history: {totals}.")
+    return totals
 
 # Coach Memo
 def create_coach_memo(db: Session, memo: schemas.CoachMemoCreate):
@@ -472,19 +1500,27 @@ def create_coach_memo(db: Session, memo: schemas.CoachMemoCreate):
         coach_id=memo.coach_id,
         student_id=memo.student_id,
         memo_text=memo.memo_text,
+        created_at=datetime.now(UTC),  # see create_student
     )
     db.add(db_memo)
     db.commit()
     db.refresh(db_memo)
     return db_memo
 
-def get_coach_memos(db: Session, student_id: Optional[str] = None, coach_id: Optional[str] = None) -> List[models.CoachMemo]:
+def get_coach_memos(
+    db: Session,
+    student_id: Optional[str] = None,
+    coach_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[tuple] = None,
+) -> List[models.CoachMemo]:
+    """Newest first."""
     query = db.query(models.CoachMemo)
     if student_id:
         query = query.filter(models.CoachMemo.student_id == student_id)
     if coach_id:
         query = query.filter(models.CoachMemo.coach_id == coach_id)
-    return query.order_by(models.CoachMemo.created_at.desc()).all()
+    return apply_keyset(query, COACH_MEMO_PAGE_KEY, after, limit, descending=True).all()
 
 # LLM Log and Feedback
 def create_llm_log_feedback(
@@ -500,6 +1536,7 @@ def create_llm_log_feedback(
         model_version=model_version,
         coach_feedback=feedback.coach_feedback,
         reason_code=feedback.reason_code,
+        created_at=datetime.now(UTC),  # see create_student
     )
     db.add(db_llm_log)
     db.commit()
@@ -521,8 +1558,9 @@ def update_llm_log_feedback(
     return db_llm_log
 
 # Reports
-def get_report_drafts(db: Session) -> List[models.WeeklyReport]:
-    return db.query(models.WeeklyReport).filter(models.WeeklyReport.status == "DRAFT").all()
+def get_report_drafts(db: Session, limit: Optional[int] = None, after: Optional[tuple] = None) -> List[models.WeeklyReport]:
+    query = db.query(models.WeeklyReport).filter(models.WeeklyReport.status == "DRAFT")
+    return apply_keyset(query, REPORT_PAGE_KEY, after, limit).all()
 
 def finalize_report(db: Session, report_id: int, coach_comment: str):
     db_report = get_report(db, report_id)
@@ -615,11 +1653,24 @@ def update_anki_card_sm2(db: Session, card_id: int, grade: int):
         logger.debug(f"SM2 Update: After - repetitions={db_anki_card.repetitions}, ease_factor={db_anki_card.ease_factor}, interval_days={db_anki_card.interval_days}, next_review_date={db_anki_card.next_review_date}")
     return db_anki_card
 
-def get_anki_cards_by_student(db: Session, student_id: str) -> List[models.AnkiCard]:
-    return db.query(models.AnkiCard).filter(models.AnkiCard.student_id == student_id).all()
+def anki_cards_by_student_statement(student_id: str, limit: Optional[int] = None, after: Optional[tuple] = None):
+    query = select(models.AnkiCard).where(models.AnkiCard.student_id == student_id)
+    return apply_keyset(query, ANKI_CARD_PAGE_KEY, after, limit)
+
+def get_anki_cards_by_student(
+    db: Session, student_id: str, limit: Optional[int] = None, after: Optional[tuple] = None
+) -> List[models.AnkiCard]:
+    """Cards due soonest first."""
+    return db.scalars(anki_cards_by_student_statement(student_id, limit, after)).all()
+
+def student_mastery_by_student_statement(student_id: str):
+    return select(models.StudentMastery).where(models.StudentMastery.student_id == student_id)
 
 def get_student_mastery_by_student(db: Session, student_id: str) -> List[models.StudentMastery]:
-    return db.query(models.StudentMastery).filter(models.StudentMastery.student_id == student_id).all()
+    return db.scalars(student_mastery_by_student_statement(student_id)).all()
+
+def reports_by_student_statement(student_id: str):
+    return select(models.WeeklyReport).where(models.WeeklyReport.student_id == student_id)
 
 def calculate_sm2_params(
     repetitions: int, ease_factor: float, interval_days: int, grade: int
@@ -666,25 +1717,25 @@ def call_external_manim_agent(concept_id: str, logical_path_text: str) -> str:
     Calls an external Manim Agent API to generate a video based on the concept and logical path.
     Returns a URL to the generated Manim video.
     """
-    headers = {"X-API-Key": "your_manim_agent_api_key", "Content-Type": "application/json"}
+    headers = {"X-API-Key": MANIM_AGENT_API_KEY, "Content-Type": "application/json"}
     payload = {
         "concept_id": concept_id,
         "logical_path_text": logical_path_text
     }
 
     try:
-        response = requests.post("http://your_manim_agent_api_url/generate", headers=headers, json=payload)
+        response = http_client.default_client.post(MANIM_AGENT_API_URL, headers=headers, json=payload, timeout=MANIM_AGENT_READ_TIMEOUT)
         response.raise_for_status() # Raise an exception for HTTP errors
         manim_response = response.json()
-        return manim_response.get("video_url", "https://youtube.com/watch?v=default_manim_video")
+        return manim_response.get("video_url", MANIM_AGENT_DEFAULT_URL)
 
     except requests.exceptions.RequestException as e:
         logger.error(f"Error calling external Manim Agent API: {e}")
         # Fallback to a default video or raise an exception
-        return "https://youtube.com/watch?v=error_manim_video"
+        return MANIM_AGENT_ERROR_URL
     except Exception as e:
         logger.error(f"Error processing Manim Agent response: {e}")
-        return "https://youtube.com/watch?v=error_manim_video"
+        return MANIM_AGENT_ERROR_URL
 
 def add_coach_review_to_submission(db: Session, submission_id: str, review: schemas.SubmissionReviewCreate) -> Optional[models.LLMLog]:
     """
@@ -0,0 +1,190 @@
+"""
+Engine factory shared by the API, the worker pool and every script.
+
+The database comes from DATABASE_URL. The tuning profile is picked from the
+URL's dialect ("sqlite" or "postgres"), or forced with DATABASE_PROFILE.
+
+    from backend.database import create_db_engine, create_session_factory
+    engine = create_db_engine()
+    SessionLocal = create_session_factory(engine)
+
+Read-heavy async endpoints use create_async_db_engine(), which maps the same
+URL onto an async driver (aiosqlite for SQLite, asyncpg for Postgres) with
+the same profile settings.
+"""
+import logging
+import os
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./atlas.db")
+DATABASE_PROFILE = os.getenv("DATABASE_PROFILE", "")  # "", "sqlite", "postgres" or "none"
+DATABASE_ECHO = os.getenv("DATABASE_ECHO", "false").lower() == "true"
+# Defaults to DATABASE_URL with its driver swapped for an async one.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "")
+
+# SQLite profile: WAL lets readers run while a writer commits; NORMAL sync is durable in WAL mode
+# except for the last transactions before a power loss.
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))  # page cache per connection
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+# Postgres profile
+PG_POOL_SIZE = int(os.getenv("PG_POOL_SIZE", "10"))
+PG_MAX_OVERFLOW = int(os.getenv("PG_MAX_OVERFLOW", "20"))
+PG_POOL_TIMEOUT = float(os.getenv("PG_POOL_TIMEOUT", "30"))  # seconds to wait for a pooled connection
+PG_POOL_RECYCLE = int(os.getenv("PG_POOL_RECYCLE", "1800"))  # seconds
+PG_STATEMENT_TIMEOUT_MS = int(os.getenv("PG_STATEMENT_TIMEOUT_MS", "30000"))
+PG_LOCK_TIMEOUT_MS = int(os.getenv("PG_LOCK_TIMEOUT_MS", "5000"))
+PG_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.getenv("PG_IDLE_IN_TRANSACTION_TIMEOUT_MS", "60000"))
+PG_APPLICATION_NAME = os.getenv("PG_APPLICATION_NAME", "atlas-backend")
+
+SQLITE = "sqlite"
+POSTGRES = "postgres"
+NO_PROFILE = "none"
+
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def resolve_profile(url: str, profile: Optional[str] = None) -> str:
+    profile = profile or DATABASE_PROFILE
+    if profile:
+        if profile not in (SQLITE, POSTGRES, NO_PROFILE):
+            raise ValueError(f"Unknown database profile '{profile}'. Use '{SQLITE}', '{POSTGRES}' or '{NO_PROFILE}'.")
+        return profile
+    backend_name = make_url(url).get_backend_name()
+    if backend_name == "sqlite":
+        return SQLITE
+    if backend_name == "postgresql":
+        return POSTGRES
+    return NO_PROFILE
+
+
+def _sqlite_pragmas(database: Optional[str]) -> list:
+    pragmas = [
+        f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+    ]
+    if database and database != ":memory:":
+        # Neither applies to in-memory databases.
+        pragmas.insert(0, f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        pragmas.append(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    return pragmas
+
+
+def _install_sqlite_pragmas(engine: Engine, url: str):
+    pragmas = _sqlite_pragmas(make_url(url).database)
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def _sqlite_engine(url: str, engine_kwargs: dict) -> Engine:
+    connect_args = engine_kwargs.pop("connect_args", {})
+    # Sessions are handed between FastAPI's threadpool threads.
+    connect_args.setdefault("check_same_thread", False)
+    engine = create_engine(url, connect_args=connect_args, **engine_kwargs)
+    _install_sqlite_pragmas(engine, url)
+    return engine
+
+
+def _postgres_timeouts() -> dict:
+    return {
+        "statement_timeout": PG_STATEMENT_TIMEOUT_MS,
+        "lock_timeout": PG_LOCK_TIMEOUT_MS,
+        "idle_in_transaction_session_timeout": PG_IDLE_IN_TRANSACTION_TIMEOUT_MS,
+    }
+
+
+def _postgres_pool_kwargs(engine_kwargs: dict):
+    engine_kwargs.setdefault("pool_size", PG_POOL_SIZE)
+    engine_kwargs.setdefault("max_overflow", PG_MAX_OVERFLOW)
+    engine_kwargs.setdefault("pool_timeout", PG_POOL_TIMEOUT)
+    engine_kwargs.setdefault("pool_recycle", PG_POOL_RECYCLE)
+    engine_kwargs.setdefault("pool_pre_ping", True)
+
+
+def _postgres_engine(url: str, engine_kwargs: dict) -> Engine:
+    connect_args = engine_kwargs.pop("connect_args", {})
+    connect_args.setdefault("application_name", PG_APPLICATION_NAME)
+    connect_args.setdefault("options", " ".join(f"-c {name}={value}" for name, value in _postgres_timeouts().items()))
+    _postgres_pool_kwargs(engine_kwargs)
+    return create_engine(url, connect_args=connect_args, **engine_kwargs)
+
+
+def create_db_engine(url: Optional[str] = None, profile: Optional[str] = None, **engine_kwargs) -> Engine:
+    """
+    Creates an engine for `url` (default DATABASE_URL) tuned by its profile.
+    Extra keyword arguments go to sqlalchemy.create_engine and take
+    precedence over the profile's settings.
+    """
+    url = url or DATABASE_URL
+    profile = resolve_profile(url, profile)
+    engine_kwargs.setdefault("echo", DATABASE_ECHO)
+    if profile == SQLITE:
+        engine = _sqlite_engine(url, engine_kwargs)
+    elif profile == POSTGRES:
+        engine = _postgres_engine(url, engine_kwargs)
+    else:
+        engine = create_engine(url, **engine_kwargs)
+    logger.info(f"Created {profile} database engine for {engine.url.render_as_string(hide_password=True)}.")
+    return engine
+
+
+def create_session_factory(engine: Engine) -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def to_async_url(url: str) -> str:
+    """sqlite:///./atlas.db -> sqlite+aiosqlite:///./atlas.db, postgresql://... -> postgresql+asyncpg://..."""
+    parsed = make_url(url)
+    backend_name = parsed.get_backend_name()
+    if backend_name not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend_name}'. Set ASYNC_DATABASE_URL explicitly.")
+    return parsed.set(drivername=f"{backend_name}+{ASYNC_DRIVERS[backend_name]}").render_as_string(hide_password=False)
+
+
+def create_async_db_engine(url: Optional[str] = None, profile: Optional[str] = None, **engine_kwargs) -> AsyncEngine:
+    """
+    Async counterpart of create_db_engine. `url` defaults to
+    ASYNC_DATABASE_URL, or else DATABASE_URL mapped onto its async driver.
+    """
+    url = url or ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+    profile = resolve_profile(url, profile)
+    engine_kwargs.setdefault("echo", DATABASE_ECHO)
+    if profile == SQLITE:
+        engine = create_async_engine(url, **engine_kwargs)
+        _install_sqlite_pragmas(engine.sync_engine, url)
+    elif profile == POSTGRES:
+        connect_args = engine_kwargs.pop("connect_args", {})
+        # asyncpg takes session settings as server_settings instead of libpq options.
+        server_settings = connect_args.setdefault("server_settings", {})
+        server_settings.setdefault("application_name", PG_APPLICATION_NAME)
+        for name, value in _postgres_timeouts().items():
+            server_settings.setdefault(name, str(value))
+        _postgres_pool_kwargs(engine_kwargs)
+        engine = create_async_engine(url, connect_args=connect_args, **engine_kwargs)
+    else:
+        engine = create_async_engine(url, **engine_kwargs)
+    logger.info(f"Created async {profile} database engine for {engine.url.render_as_string(hide_password=True)}.")
+    return engine
+
+
+def create_async_session_factory(engine: AsyncEngine) -> async_sessionmaker:
+    # Async sessions cannot lazy-load after a commit, so loaded objects are not expired.
+    return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
@@ -0,0 +1,118 @@
+"""
+Streaming bulk exports of student_vector_history, submissions and llm_logs
+as NDJSON or CSV, for offline modelling.
+
+A table is walked in keyset chunks of EXPORT_CHUNK_ROWS rows ordered by its
+unique key (crud.export_chunk_statement). Each chunk is read in its own
+short session, fetched from the driver EXPORT_FETCH_ROWS at a time
+(yield_per, a server-side cursor on Postgres), encoded, and the session is
+closed before the chunk is handed to the client. Memory therefore stays at
+one chunk whatever the table size, and a slow client never holds a read
+transaction open: on SQLite in WAL mode readers do not block writers, and
+short readers also let checkpoints reset the WAL; on Postgres no export
+runs into PG_IDLE_IN_TRANSACTION_TIMEOUT_MS or holds back vacuum.
+
+Rows committed during an export show up if their key sorts after the
+current chunk, so an export is not a point-in-time snapshot. Only raw
+vectors are exported; periods compacted by crud.compact_vector_history live
+in student_vector_rollups.
+"""
+import csv
+import io
+import json
+import logging
+import os
+from datetime import datetime, UTC
+from typing import Iterator, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import sessionmaker
+
+from . import crud
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FETCH_ROWS = int(os.getenv("EXPORT_FETCH_ROWS", "500"))  # rows per driver fetch within a chunk
+EXPORT_MAX_STUDENT_IDS = crud.IN_CLAUSE_CHUNK
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+class ExportFilters(NamedTuple):
+    start: Optional[datetime] = None  # inclusive
+    end: Optional[datetime] = None  # exclusive
+    student_ids: Tuple[str, ...] = ()
+
+
+def to_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """Filter bounds are compared with stored UTC timestamps; naive input is taken to be UTC."""
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone(UTC).replace(tzinfo=None)
+
+
+def _value(value):
+    if isinstance(value, datetime):
+        # SQLite hands back naive datetimes; they are UTC.
+        return (value.replace(tzinfo=UTC) if value.tzinfo is None else value).isoformat()
+    return value
+
+
+class _CsvEncoder:
+    def __init__(self, columns: list):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, lineterminator="\n")
+        self.writer.writerow(columns)
+
+    def write(self, row):
+        self.writer.writerow([_value(value) for value in row])
+
+    def take(self) -> str:
+        text = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return text
+
+
+class _NdjsonEncoder:
+    def __init__(self, columns: list):
+        self.columns = columns
+        self.lines = []
+
+    def write(self, row):
+        record = {column: _value(value) for column, value in zip(self.columns, row)}
+        self.lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def take(self) -> str:
+        text, self.lines = "".join(self.lines), []
+        return text
+
+
+def stream_export(
+    session_factory: sessionmaker,
+    dataset: str,
+    format: str,
+    filters: ExportFilters = ExportFilters(),
+    chunk_rows: int = crud.EXPORT_CHUNK_ROWS,
+) -> Iterator[str]:
+    """Yields the encoded export one chunk at a time; CSV starts with a header row."""
+    columns = crud.export_columns(dataset)
+    encoder = _CsvEncoder(columns) if format == "csv" else _NdjsonEncoder(columns)
+    start, end = to_utc(filters.start), to_utc(filters.end)
+    after, total = None, 0
+    while True:
+        count = 0
+        with session_factory() as db:
+            statement = crud.export_chunk_statement(
+                dataset, after, start, end, list(filters.student_ids), limit=chunk_rows
+            ).execution_options(yield_per=EXPORT_FETCH_ROWS)
+            for row in db.execute(statement):
+                encoder.write(row)
+                after = row[0]
+                count += 1
+        total += count
+        text = encoder.take()
+        if text:
+            yield text
+        if count < chunk_rows:
+            break
+    logger.info(f"Exported {total} {dataset} row(s) as {format}.")
@@ -1,18 +1,27 @@
 import requests
 import logging
 import os
+from typing import Optional
 from fastapi import HTTPException
+from . import http_client
 
 logger = logging.getLogger(__name__)
 
 # Configuration for the fish-speech API server
 FISH_SPEECH_API_URL = os.getenv("FISH_SPEECH_API_URL", "http://localhost:8003/synthesize")
 FISH_SPEECH_API_KEY = os.getenv("FISH_SPEECH_API_KEY", "your_fish_speech_api_key")
+FISH_SPEECH_READ_TIMEOUT = float(os.getenv("FISH_SPEECH_READ_TIMEOUT", "30"))
 
 class FishSpeechAdapter:
-    def __init__(self, api_url: str = FISH_SPEECH_API_URL, api_key: str = FISH_SPEECH_API_KEY):
+    def __init__(
+        self,
+        api_url: str = FISH_SPEECH_API_URL,
+        api_key: str = FISH_SPEECH_API_KEY,
+        client: Optional[http_client.OutboundClient] = None,
+    ):
         self.api_url = api_url
         self.api_key = api_key
+        self.client = client or http_client.default_client
         logger.info(f"FishSpeechAdapter initialized with API URL: {self.api_url}")
 
     def synthesize_speech(self, text: str, speaker_id: str = "default", output_format: str = "wav") -> bytes:
@@ -41,7 +50,7 @@ class FishSpeechAdapter:
         }
 
         try:
-            response = requests.post(self.api_url, headers=headers, json=payload, timeout=30)
+            response = self.client.post(self.api_url, headers=headers, json=payload, timeout=FISH_SPEECH_READ_TIMEOUT)
             response.raise_for_status()  # Raise an exception for HTTP errors (4xx or 5xx)
 
             if response.headers.get("Content-Type") not in ["audio/wav", "audio/mpeg", "audio/x-wav"]:
@@ -52,7 +61,7 @@ class FishSpeechAdapter:
             return response.content
 
         except requests.exceptions.Timeout:
-            logger.error(f"Fish-speech API request timed out after 30 seconds for text: {text[:50]}...")
+            logger.error(f"Fish-speech API request timed out after {FISH_SPEECH_READ_TIMEOUT} seconds for text: {text[:50]}...")
             raise HTTPException(status_code=504, detail="Fish-speech API request timed out")
         except requests.exceptions.RequestException as e:
             logger.error(f"Error calling fish-speech API: {e} for text: {text[:50]}...")
@@ -0,0 +1,151 @@
+import logging
+import os
+import threading
+import time
+from typing import Optional, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# Configuration for outbound HTTP calls (Ollama, fish-speech, Manim agent)
+OUTBOUND_CONNECT_TIMEOUT = float(os.getenv("OUTBOUND_CONNECT_TIMEOUT", "5"))
+OUTBOUND_READ_TIMEOUT = float(os.getenv("OUTBOUND_READ_TIMEOUT", "60"))
+OUTBOUND_POOL_CONNECTIONS = int(os.getenv("OUTBOUND_POOL_CONNECTIONS", "10"))  # hosts with a cached pool
+OUTBOUND_POOL_MAXSIZE = int(os.getenv("OUTBOUND_POOL_MAXSIZE", "20"))  # keep-alive connections per host
+OUTBOUND_POOL_BLOCK = os.getenv("OUTBOUND_POOL_BLOCK", "false").lower() == "true"
+
+
+class HostMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.connections_opened = 0
+        self.connections_checked_out = 0
+        self.total_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "connections_opened": self.connections_opened,
+            "connections_reused": max(0, self.connections_checked_out - self.connections_opened),
+            "avg_latency_ms": round(self.total_latency_ms / self.requests, 3) if self.requests else 0.0,
+            "max_latency_ms": round(self.max_latency_ms, 3),
+        }
+
+
+def _counting_pool(base_pool, client: "OutboundClient"):
+    """Wraps a urllib3 pool class so new and reused connections are counted per host."""
+
+    class CountingConnectionPool(base_pool):
+        def _new_conn(self):
+            client._record(f"{self.host}:{self.port}", opened=1)
+            return super()._new_conn()
+
+        def _get_conn(self, timeout=None):
+            conn = super()._get_conn(timeout=timeout)
+            client._record(f"{self.host}:{self.port}", checked_out=1)
+            return conn
+
+    return CountingConnectionPool
+
+
+class _CountingAdapter(HTTPAdapter):
+    def __init__(self, client: "OutboundClient", **kwargs):
+        self._client = client
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self._client),
+            "https": _counting_pool(HTTPSConnectionPool, self._client),
+        }
+
+
+class OutboundClient:
+    """
+    Shared outbound HTTP client with per-host keep-alive connection pools,
+    default connect/read timeouts and per-host request metrics.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = OUTBOUND_CONNECT_TIMEOUT,
+        read_timeout: float = OUTBOUND_READ_TIMEOUT,
+        pool_connections: int = OUTBOUND_POOL_CONNECTIONS,
+        pool_maxsize: int = OUTBOUND_POOL_MAXSIZE,
+        pool_block: bool = OUTBOUND_POOL_BLOCK,
+    ):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._lock = threading.Lock()
+        self._metrics: dict[str, HostMetrics] = {}
+        self._session = requests.Session()
+        adapter = _CountingAdapter(
+            self,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=0,
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def _record(self, host: str, opened: int = 0, checked_out: int = 0, latency_ms: Optional[float] = None, error: bool = False):
+        with self._lock:
+            metrics = self._metrics.setdefault(host, HostMetrics())
+            metrics.connections_opened += opened
+            metrics.connections_checked_out += checked_out
+            if latency_ms is not None:
+                metrics.requests += 1
+                metrics.total_latency_ms += latency_ms
+                metrics.max_latency_ms = max(metrics.max_latency_ms, latency_ms)
+            if error:
+                metrics.errors += 1
+
+    def request(self, method: str, url: str, timeout: Union[float, tuple, None] = None, **kwargs) -> requests.Response:
+        """
+        Sends a request over the pooled session.
+
+        `timeout` may be a read timeout in seconds (the configured connect
+        timeout is used) or a (connect, read) tuple. Exceptions are the usual
+        requests.exceptions types.
+        """
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        elif not isinstance(timeout, tuple):
+            timeout = (self.connect_timeout, timeout)
+
+        parts = urlsplit(url)
+        host = f"{parts.hostname}:{parts.port or (443 if parts.scheme == 'https' else 80)}"
+        start = time.perf_counter()
+        try:
+            response = self._session.request(method, url, timeout=timeout, **kwargs)
+        except requests.exceptions.RequestException:
+            self._record(host, latency_ms=(time.perf_counter() - start) * 1000, error=True)
+            raise
+        self._record(host, latency_ms=(time.perf_counter() - start) * 1000, error=response.status_code >= 500)
+        return response
+
+    def post(self, url: str, timeout: Union[float, tuple, None] = None, **kwargs) -> requests.Response:
+        return self.request("POST", url, timeout=timeout, **kwargs)
+
+    def get(self, url: str, timeout: Union[float, tuple, None] = None, **kwargs) -> requests.Response:
+        return self.request("GET", url, timeout=timeout, **kwargs)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {host: metrics.as_dict() for host, metrics in self._metrics.items()}
+
+    def close(self):
+        self._session.close()
+
+
+# Shared by every outbound adapter in the process
+default_client = OutboundClient()
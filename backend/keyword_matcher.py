@@ -0,0 +1,87 @@
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a set of keywords, each tagged with a priority.
+
+    `find()` scans the text once and returns the lowest priority of any keyword
+    occurring in it, so the result does not depend on where in the text the
+    keywords appear. With priorities taken from the position of a rule in its
+    config list, this gives the same answer as checking the rules in order.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, int]]):
+        self._goto: List[dict] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[Optional[int]] = [None]  # lowest priority ending at this state (incl. suffixes)
+        self.keyword_count = 0
+
+        for keyword, priority in keywords:
+            if not keyword:
+                continue
+            self.keyword_count += 1
+            state = 0
+            for ch in keyword:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                state = next_state
+            self._best[state] = priority if self._best[state] is None else min(self._best[state], priority)
+
+        self._min_priority = min((p for p in self._best if p is not None), default=None)
+        self._alphabet = frozenset(ch for edges in self._goto for ch in edges)
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        # Breadth-first, so a state's failure target is final before its children are visited.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                inherited = self._best[self._fail[child]]
+                if inherited is not None and (self._best[child] is None or inherited < self._best[child]):
+                    self._best[child] = inherited
+
+    @classmethod
+    def from_configs(cls, configs: List[dict], keywords_field: str = "keywords") -> "KeywordMatcher":
+        """Compiles simulation configs; a config's priority is its index, so earlier configs win."""
+        return cls(
+            (keyword, index)
+            for index, config in enumerate(configs)
+            for keyword in config.get(keywords_field, [])
+        )
+
+    def find(self, text: str) -> Optional[int]:
+        """Returns the lowest priority among the keywords found in `text`, or None."""
+        goto, fail, best, alphabet = self._goto, self._fail, self._best, self._alphabet
+        found = None
+        state = 0
+        for ch in text:
+            if ch not in alphabet:
+                # No keyword contains this character, so every partial match ends here.
+                state = 0
+                continue
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            priority = best[state]
+            if priority is not None and (found is None or priority < found):
+                found = priority
+                if found == self._min_priority:
+                    break
+        return found
+
+    def __len__(self):
+        return self.keyword_count
@@ -0,0 +1,105 @@
+import json
+import logging
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalJSONObjectParser:
+    """
+    Parses a JSON object that arrives in arbitrary text chunks (e.g. LLM tokens).
+
+    `feed()` returns the top-level fields whose values were completed by the
+    chunk, in document order, so callers can act on early fields before the
+    rest of the object has been generated. Text before the opening brace
+    (such as a markdown fence) is skipped, and anything after the closing
+    brace is ignored; `closed` tells the caller it can stop reading.
+    """
+
+    def __init__(self):
+        self._chars: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._object_start: Optional[int] = None
+        self._object_end: Optional[int] = None
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+        self.fields: dict = {}
+
+    @property
+    def closed(self) -> bool:
+        return self._object_end is not None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        completed = []
+        for ch in chunk:
+            if self.closed:
+                break
+            i = len(self._chars)
+            self._chars.append(ch)
+
+            if self._object_start is None:
+                if ch == "{":
+                    self._object_start = i
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key_start is not None and self._key is None:
+                        self._key = json.loads("".join(self._chars[self._key_start:i + 1]))
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None:
+                    self._key_start = i
+            elif ch == ":" and self._depth == 1:
+                self._value_start = i + 1
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete_field(i, completed)
+                    self._object_end = i + 1
+            elif ch == "," and self._depth == 1:
+                self._complete_field(i, completed)
+        return completed
+
+    def _complete_field(self, end: int, completed: list):
+        if self._key is not None and self._value_start is not None:
+            value = json.loads("".join(self._chars[self._value_start:end]))
+            self.fields[self._key] = value
+            completed.append((self._key, value))
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+
+    def result(self) -> dict:
+        """Returns the complete object. Raises ValueError if it has not been closed yet."""
+        if not self.closed:
+            raise ValueError("JSON object is not complete")
+        return json.loads("".join(self._chars[self._object_start:self._object_end]))
+
+
+def iter_ollama_tokens(lines: Iterable[bytes]) -> Iterator[str]:
+    """Yields the generated text of an Ollama `/api/generate` NDJSON stream until it reports done."""
+    for line in lines:
+        if not line:
+            continue
+        message = json.loads(line)
+        if message.get("error"):
+            raise ValueError(f"Ollama stream error: {message['error']}")
+        token = message.get("response")
+        if token:
+            yield token
+        if message.get("done"):
+            return
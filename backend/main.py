@@ -1,25 +1,63 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware # New import
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from backend import models
+from backend import models, submission_worker
+from backend.database import (
+    DATABASE_URL,
+    create_async_db_engine,
+    create_async_session_factory,
+    create_db_engine,
+    create_session_factory,
+    to_async_url,
+)
+from backend.migrations import ensure_columns, ensure_indexes, normalize_timestamps
+from backend.pagination import NEXT_CURSOR_HEADER
+from backend.replicas import DATABASE_REPLICA_URL, ReplicaRouter
 
 # Database setup
-# Using a file-based SQLite DB for local development.
-# The production environment would use PostgreSQL or MySQL.
-SQLALCHEMY_DATABASE_URL = "sqlite:///./atlas.db"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# DATABASE_URL defaults to a file-based SQLite DB for local development;
+# production points it at PostgreSQL. See backend/database.py for the profiles.
+SQLALCHEMY_DATABASE_URL = DATABASE_URL
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
+SessionLocal = create_session_factory(engine)
+# Async engine on the same database (aiosqlite / asyncpg) for read-heavy async endpoints
+async_engine = create_async_db_engine()
+AsyncSessionLocal = create_async_session_factory(async_engine)
+
+# Optional read replica for the dashboard read endpoints (see backend/replicas.py)
+if DATABASE_REPLICA_URL:
+    replica_engine = create_db_engine(DATABASE_REPLICA_URL)
+    async_replica_engine = create_async_db_engine(to_async_url(DATABASE_REPLICA_URL))
+    replica_router = ReplicaRouter(
+        SessionLocal,
+        AsyncSessionLocal,
+        replica_factory=create_session_factory(replica_engine),
+        async_replica_factory=create_async_session_factory(async_replica_engine),
+        replica_engine=replica_engine,
+    )
+else:
+    replica_router = ReplicaRouter(SessionLocal, AsyncSessionLocal)
 
 # Create DB tables
 models.Base.metadata.create_all(bind=engine)
+# Add columns and indexes declared after the tables were first created
+ensure_columns(engine)
+ensure_indexes(engine)
+# Give server-default SQLite timestamps the fraction keyset cursors compare against
+normalize_timestamps(engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pick up the async submissions the previous process did not finish
+    await run_in_threadpool(submission_worker.pool.recover, SessionLocal)
+    yield
 
 app = FastAPI(
     title="Project: ATLAS - AI Coaching Platform API (V1)",
     description="학생의 4축 잠재 공간 모델을 기반으로 코칭 활동을 지원하는 통합 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 import logging
@@ -38,8 +76,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+@app.middleware("http")
+async def pin_reads_after_writes(request: Request, call_next):
+    response = await call_next(request)
+    replica_router.pin_after_write(request, response)
+    return response
+
 # Dependency to get DB session
 def get_db():
     db = SessionLocal()
@@ -48,11 +93,31 @@ def get_db():
     finally:
         db.close()
 
+# Dependency to get an async DB session, for `async def` endpoints
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Read-only dependencies: the replica when it is configured, current enough and the client is not pinned
+def get_read_db(request: Request):
+    db = replica_router.session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request):
+    if replica_router.lag_check_due():
+        # The lag probe is a blocking query; keep it off the event loop.
+        await run_in_threadpool(replica_router.replica_lag)
+    async with replica_router.async_session_factory(request)() as db:
+        yield db
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Project: ATLAS API"}
 
-from .routers import anki_cards, assessments, coach_memos, coaches, llm_logs, reports, students, submissions, auth, notifications, users
+from .routers import anki_cards, assessments, coach_memos, coaches, exports, llm_logs, reports, students, submissions, auth, notifications, users, system, audio
 app.include_router(assessments.router)
 app.include_router(submissions.router)
 app.include_router(auth.router)
@@ -64,3 +129,6 @@ app.include_router(coach_memos.router)
 app.include_router(llm_logs.router)
 app.include_router(coaches.router) # Added coaches router
 app.include_router(anki_cards.router) # Added anki_cards router
+app.include_router(system.router)
+app.include_router(audio.router)
+app.include_router(exports.router)
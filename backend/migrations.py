@@ -0,0 +1,199 @@
+"""
+Schema upgrades for existing databases.
+
+`Base.metadata.create_all()` only creates missing tables; it does not add
+columns or indexes declared later on tables that already exist.
+`ensure_columns()` and `ensure_indexes()` fill that gap and are safe to run
+on every startup.
+
+`rekey_legacy_ids()` replaces the random `uuid4().hex[:8]` ids of
+submissions, assessments and vector history rows with time-ordered ids
+(backend/ids.py) and repoints every foreign key to them, as well as the
+`source_ref_id` of the assessments generated from a submission. It is opt-in: old
+ids that were handed out (links, exports) stop resolving, so run it in a
+maintenance window.
+
+`normalize_timestamps()` rewrites SQLite timestamps that the
+CURRENT_TIMESTAMP server default stored without a fraction
+('YYYY-MM-DD HH:MM:SS') in the 'YYYY-MM-DD HH:MM:SS.ffffff' form SQLAlchemy
+binds, so that keyset cursors and range filters, which SQLite compares as
+text, treat both alike. It is also safe to run on every startup.
+
+    python -m backend.migrations [database_url] [--rekey-ids]
+"""
+import argparse
+import logging
+import time
+from typing import Dict, List
+
+from sqlalchemy import String, bindparam, func, inspect, select, type_coerce
+from sqlalchemy.engine import Engine
+
+from . import ids, models
+
+logger = logging.getLogger(__name__)
+
+
+def missing_columns(engine: Engine) -> list:
+    """Declared columns that do not exist yet on existing tables."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in models.Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend(column for column in table.columns if column.name not in existing)
+    return missing
+
+
+def ensure_columns(engine: Engine) -> List[str]:
+    """
+    Adds every missing declared column and returns their "table.column"
+    names. Only nullable columns without a server default can be added to
+    populated tables this way; any other missing column raises RuntimeError.
+    """
+    columns = missing_columns(engine)
+    for column in columns:
+        if not column.nullable or column.primary_key or column.server_default is not None:
+            raise RuntimeError(f"Cannot add column {column.table.name}.{column.name} to an existing table automatically.")
+    added = []
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.begin() as conn:
+        for column in columns:
+            column_type = column.type.compile(dialect=engine.dialect)
+            conn.exec_driver_sql(f"ALTER TABLE {quote(column.table.name)} ADD COLUMN {quote(column.name)} {column_type}")
+            added.append(f"{column.table.name}.{column.name}")
+            logger.info(f"Added column {column.name} to {column.table.name}.")
+    return added
+
+
+def missing_indexes(engine: Engine) -> list:
+    """Declared indexes that do not exist yet on existing tables."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in models.Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in table.indexes if index.name not in existing)
+    return missing
+
+
+def ensure_indexes(engine: Engine) -> List[str]:
+    """Creates every missing declared index and returns their names."""
+    created = []
+    for index in missing_indexes(engine):
+        started = time.perf_counter()
+        index.create(bind=engine, checkfirst=True)
+        created.append(index.name)
+        logger.info(f"Created index {index.name} on {index.table.name} in {time.perf_counter() - started:.2f} s.")
+    return created
+
+
+# Keyset page keys and export filters whose rows may carry server-default timestamps.
+NORMALIZED_TIMESTAMP_COLUMNS = (
+    models.Student.created_at,
+    models.CoachMemo.created_at,
+    models.WeeklyReport.created_at,
+    models.LLMLog.created_at,
+)
+_SQLITE_SECONDS_LENGTH = len("YYYY-MM-DD HH:MM:SS")
+
+
+def normalize_timestamps(engine: Engine) -> Dict[str, int]:
+    """Appends '.000000' to SQLite timestamps stored without a fraction; returns the rows updated per column."""
+    if engine.dialect.name != "sqlite":
+        return {}
+    counts = {}
+    with engine.begin() as conn:
+        for column in NORMALIZED_TIMESTAMP_COLUMNS:
+            table = column.table
+            result = conn.execute(
+                table.update()
+                .where(func.length(column) == _SQLITE_SECONDS_LENGTH)
+                .values({column.name: type_coerce(column, String).concat(".000000")})
+            )
+            counts[f"{table.name}.{column.name}"] = result.rowcount
+            if result.rowcount:
+                logger.info(f"Normalized {result.rowcount} {table.name}.{column.name} timestamp(s).")
+    return counts
+
+
+# Parents before children, so that a child row copied later already carries its parent's new id.
+REKEYED_TABLES = (
+    (models.Assessment, ids.ASSESSMENT_PREFIX, "assessment_date"),
+    (models.StudentVectorHistory, ids.VECTOR_PREFIX, "created_at"),
+    (models.Submission, ids.SUBMISSION_PREFIX, "submitted_at"),
+)
+REKEY_BATCH_SIZE = 1000
+# Columns that hold ids of a re-keyed table without a ForeignKey declaring it.
+REKEY_EXTRA_REFERENCES = {
+    models.Submission.__tablename__: (models.Assessment.__table__.c.source_ref_id,),
+}
+
+
+def _referencing_columns(table) -> list:
+    return [
+        fk.parent
+        for other in models.Base.metadata.sorted_tables
+        for fk in other.foreign_keys
+        if fk.column.table is table
+    ]
+
+
+def rekey_legacy_ids(engine: Engine, batch_size: int = REKEY_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Gives every row of REKEYED_TABLES whose id predates backend/ids.py a
+    time-ordered id derived from its timestamp. Each batch copies the rows
+    under their new ids, repoints the referencing columns (foreign keys and
+    REKEY_EXTRA_REFERENCES) and deletes the old
+    rows in one transaction, so foreign keys hold throughout, also where they
+    are enforced and not deferrable. Returns the number of re-keyed rows per table.
+    """
+    counts = {}
+    for model, prefix, timestamp_column in REKEYED_TABLES:
+        table = model.__table__
+        pk = next(iter(table.primary_key.columns))
+        references = _referencing_columns(table) + list(REKEY_EXTRA_REFERENCES.get(table.name, ()))
+        # Time-ordered ids are prefix + "_" + 26 characters; anything shorter is a legacy id.
+        legacy = select(table).where(func.length(pk) < len(prefix) + 1 + ids.ULID_LENGTH).limit(batch_size)
+        counts[table.name] = 0
+        started = time.perf_counter()
+        while True:
+            with engine.begin() as conn:
+                rows = [dict(row) for row in conn.execute(legacy).mappings()]
+                if not rows:
+                    break
+                mapping = [{"old_id": row[pk.name], "new_id": ids.id_for_datetime(prefix, row[timestamp_column])} for row in rows]
+                for row, pair in zip(rows, mapping):
+                    row[pk.name] = pair["new_id"]
+                conn.execute(table.insert(), rows)
+                for column in references:
+                    conn.execute(
+                        column.table.update().where(column == bindparam("old_id")).values({column.name: bindparam("new_id")}),
+                        mapping,
+                    )
+                conn.execute(table.delete().where(pk == bindparam("old_id")), mapping)
+            counts[table.name] += len(rows)
+        logger.info(f"Re-keyed {counts[table.name]} {table.name} row(s) in {time.perf_counter() - started:.2f} s.")
+    return counts
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    from .database import create_db_engine
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("database_url", nargs="?", default=None)
+    parser.add_argument("--rekey-ids", action="store_true", help="Replace legacy random ids with time-ordered ones")
+    args = parser.parse_args()
+    target_engine = create_db_engine(args.database_url)
+    added = ensure_columns(target_engine)
+    print(f"Added {len(added)} column(s): {', '.join(added) or '-'}")
+    names = ensure_indexes(target_engine)
+    print(f"Created {len(names)} index(es): {', '.join(names) or '-'}")
+    normalize_timestamps(target_engine)
+    if args.rekey_ids:
+        counts = rekey_legacy_ids(target_engine)
+        print("Re-keyed " + ", ".join(f"{count} {name}" for name, count in counts.items()) + ".")
@@ -9,6 +9,7 @@ from sqlalchemy import (
     Table,
     CheckConstraint,
     Float, # Added Float
+    Index,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
@@ -41,6 +42,11 @@ class Student(Base):
     coaches = relationship("Coach", secondary=student_coach_relation, back_populates="students")
     parents = relationship("Parent", secondary=student_parent_association, back_populates="students")
 
+    __table_args__ = (
+        # Keyset pagination of GET /students/
+        Index("ix_students_created_at_student_id", "created_at", "student_id"),
+    )
+
 
 class Coach(Base):
     __tablename__ = "coaches"
@@ -70,6 +76,10 @@ class Assessment(Base):
     ai_model_version = Column(String(50), nullable=True)
     ai_reason_code = Column(String(50), nullable=True)
 
+    __table_args__ = (
+        Index("ix_assessments_student_id_assessment_date", "student_id", "assessment_date"),
+    )
+
 
 class StudentVectorHistory(Base):
     __tablename__ = "student_vector_history"
@@ -89,6 +99,84 @@ class StudentVectorHistory(Base):
     axis4_acc = Column(Integer, CheckConstraint("axis4_acc BETWEEN 0 AND 100"), nullable=False)
     axis4_gri = Column(Integer, CheckConstraint("axis4_gri BETWEEN 0 AND 100"), nullable=False)
 
+    # Lets a single flush order the INSERTs by foreign key (assessment before its vector).
+    assessment = relationship("Assessment")
+
+    __table_args__ = (
+        # Latest vector / history / weekly report lookups per student
+        Index("ix_student_vector_history_student_id_created_at", "student_id", "created_at"),
+    )
+
+
+class StudentCurrentVector(Base):
+    """
+    Projection of each student's most recent StudentVectorHistory row, kept up
+    to date by crud.create_assessment_and_vector in the same transaction.
+    """
+    __tablename__ = "student_current_vector"
+    student_id = Column(String(50), ForeignKey("students.student_id"), primary_key=True)
+    vector_id = Column(String(50), ForeignKey("student_vector_history.vector_id"), nullable=False)
+    assessment_id = Column(String(50), ForeignKey("assessments.assessment_id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    axis1_geo = Column(Integer, nullable=False)
+    axis1_alg = Column(Integer, nullable=False)
+    axis1_ana = Column(Integer, nullable=False)
+    axis2_opt = Column(Integer, nullable=False)
+    axis2_piv = Column(Integer, nullable=False)
+    axis2_dia = Column(Integer, nullable=False)
+    axis3_con = Column(Integer, nullable=False)
+    axis3_pro = Column(Integer, nullable=False)
+    axis3_ret = Column(Integer, nullable=False)
+    axis4_acc = Column(Integer, nullable=False)
+    axis4_gri = Column(Integer, nullable=False)
+
+    vector = relationship("StudentVectorHistory")
+
+
+class StudentVectorRollup(Base):
+    """
+    Older vector history rolled up per student and day or week by
+    crud.compact_vector_history. The axis columns hold the last vector of the
+    period, the *_mean columns the average over its vector_count vectors.
+    """
+    __tablename__ = "student_vector_rollups"
+    student_id = Column(String(50), ForeignKey("students.student_id"), primary_key=True)
+    granularity = Column(String(10), primary_key=True)  # "day" or "week"
+    period_start = Column(DateTime(timezone=True), primary_key=True)
+    period_end = Column(DateTime(timezone=True), nullable=False)
+    vector_count = Column(Integer, nullable=False)
+    # The last rolled-up vector; its rows are gone, the ids keep history pagination keys stable.
+    last_vector_id = Column(String(50), nullable=False)
+    last_assessment_id = Column(String(50), nullable=False)
+    last_created_at = Column(DateTime(timezone=True), nullable=False)
+    axis1_geo = Column(Integer, nullable=False)
+    axis1_alg = Column(Integer, nullable=False)
+    axis1_ana = Column(Integer, nullable=False)
+    axis2_opt = Column(Integer, nullable=False)
+    axis2_piv = Column(Integer, nullable=False)
+    axis2_dia = Column(Integer, nullable=False)
+    axis3_con = Column(Integer, nullable=False)
+    axis3_pro = Column(Integer, nullable=False)
+    axis3_ret = Column(Integer, nullable=False)
+    axis4_acc = Column(Integer, nullable=False)
+    axis4_gri = Column(Integer, nullable=False)
+    axis1_geo_mean = Column(Float, nullable=False)
+    axis1_alg_mean = Column(Float, nullable=False)
+    axis1_ana_mean = Column(Float, nullable=False)
+    axis2_opt_mean = Column(Float, nullable=False)
+    axis2_piv_mean = Column(Float, nullable=False)
+    axis2_dia_mean = Column(Float, nullable=False)
+    axis3_con_mean = Column(Float, nullable=False)
+    axis3_pro_mean = Column(Float, nullable=False)
+    axis3_ret_mean = Column(Float, nullable=False)
+    axis4_acc_mean = Column(Float, nullable=False)
+    axis4_gri_mean = Column(Float, nullable=False)
+
+    __table_args__ = (
+        # Merged history pages (see crud.vector_history_by_student_statement)
+        Index("ix_student_vector_rollups_student_id_last_created_at", "student_id", "last_created_at"),
+    )
+
 
 class Curriculum(Base):
     __tablename__ = "curriculums"
@@ -138,6 +226,14 @@ class Submission(Base):
     audio_explanation_url = Column(String(255), nullable=True) # New field for audio explanation URL
     manim_visualization_json = Column(Text, nullable=True)
     student_answer = Column(Text, nullable=True)
+    error_detail = Column(Text, nullable=True)  # why a FAILED submission failed
+    processing_started_at = Column(DateTime(timezone=True), nullable=True)  # when a worker claimed it
+
+    concept = relationship("ConceptsLibrary")
+
+    __table_args__ = (
+        Index("ix_submissions_student_id_submitted_at", "student_id", "submitted_at"),
+    )
 
 
 class CoachMemo(Base):
@@ -148,6 +244,11 @@ class CoachMemo(Base):
     memo_text = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_coach_memos_student_id_created_at", "student_id", "created_at"),
+        Index("ix_coach_memos_coach_id_created_at", "coach_id", "created_at"),
+    )
+
 
 class LLMLog(Base):
     __tablename__ = "llm_logs"
@@ -160,6 +261,12 @@ class LLMLog(Base):
     reason_code = Column(String(50), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    submission = relationship("Submission")
+
+    __table_args__ = (
+        Index("ix_llm_logs_source_submission_id", "source_submission_id"),
+    )
+
 
 class AnkiCard(Base):
     __tablename__ = "anki_cards"
@@ -174,6 +281,10 @@ class AnkiCard(Base):
     ease_factor = Column(Float, default=2.5)
     repetitions = Column(Integer, default=0)
 
+    __table_args__ = (
+        Index("ix_anki_cards_student_id_next_review_date", "student_id", "next_review_date"),
+    )
+
 
 class WeeklyReport(Base):
     __tablename__ = "weekly_reports"
@@ -189,3 +300,8 @@ class WeeklyReport(Base):
     coach_comment = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     finalized_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_weekly_reports_student_id_period_start", "student_id", "period_start"),
+        Index("ix_weekly_reports_status", "status"),
+    )
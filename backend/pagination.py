@@ -0,0 +1,92 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A page is ordered by a fixed tuple of columns ending in a unique id, e.g.
+(submitted_at, submission_id). The next page starts strictly after the last
+row's key, so every page costs the same index range scan however deep the
+client has paged, unlike OFFSET.
+
+The key is handed to the client as an opaque token in the X-Next-Cursor
+response header; the header is absent on the last page.
+"""
+import base64
+import binascii
+import json
+import os
+from datetime import datetime
+from typing import Optional, Sequence
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import DateTime, tuple_
+
+DEFAULT_PAGE_LIMIT = int(os.getenv("DEFAULT_PAGE_LIMIT", "100"))
+MAX_PAGE_LIMIT = int(os.getenv("MAX_PAGE_LIMIT", "500"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def page_limit(limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT)) -> int:
+    return limit
+
+
+def page_cursor(cursor: Optional[str] = Query(None, description="Value of the previous page's X-Next-Cursor header")) -> Optional[tuple]:
+    return decode_cursor(cursor)
+
+
+def encode_cursor(values: Sequence) -> str:
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[tuple]:
+    """Returns the raw key values of a cursor token; apply_keyset converts them to column types."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+    if not isinstance(values, list) or not values:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+    return tuple(values)
+
+
+def _key_values(columns: Sequence, after: tuple) -> list:
+    if len(after) != len(columns):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+    values = []
+    for column, value in zip(columns, after):
+        if value is not None and isinstance(column.type, DateTime):
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+        values.append(value)
+    return values
+
+
+def apply_keyset(query, columns: Sequence, after: Optional[tuple] = None, limit: Optional[int] = None, descending: bool = False):
+    """
+    Orders `query` by `columns` and, given the decoded cursor `after`, keeps
+    only the rows that come after it. Fetches one row more than `limit` so
+    that finish_page can tell whether there is a next page.
+    """
+    if after is not None:
+        key = tuple_(*columns)
+        values = tuple_(*_key_values(columns, after))
+        query = query.filter(key < values if descending else key > values)
+    query = query.order_by(*(column.desc() if descending else column.asc() for column in columns))
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return query
+
+
+def finish_page(response: Response, rows: list, limit: int, columns: Sequence) -> list:
+    """Trims the look-ahead row and sets X-Next-Cursor when there is a next page."""
+    if len(rows) <= limit:
+        return rows
+    rows = rows[:limit]
+    last = rows[-1]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(last, column.key) for column in columns])
+    return rows
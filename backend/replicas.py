@@ -0,0 +1,162 @@
+"""
+Read-replica routing.
+
+Read-only requests (GET/HEAD) of the dashboard endpoints are served from
+DATABASE_REPLICA_URL; everything else uses the primary. A request goes to
+the primary instead when
+
+- the same client made a successful write in the last
+  READ_YOUR_WRITES_SECONDS (read-your-writes pinning through a cookie), or
+- the replica is more than REPLICA_MAX_LAG_SECONDS behind, or its lag
+  cannot be measured.
+
+Without DATABASE_REPLICA_URL every request uses the primary.
+"""
+import logging
+import math
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL", "")
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "2"))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "1"))  # seconds a measurement is reused
+
+PRIMARY_PIN_COOKIE = "atlas_primary_until"
+READ_METHODS = ("GET", "HEAD")
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+# An idle primary sends no WAL, so the replay timestamp ages without any real lag;
+# only count it while received WAL is still waiting to be replayed.
+POSTGRES_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+def default_lag_probe(conn: Connection) -> float:
+    """
+    Replica lag in seconds. Postgres reports it from the WAL replay position;
+    SQLite has no built-in replication, so a copied SQLite replica counts as
+    current unless the router is given a probe of its own.
+    """
+    if conn.dialect.name == "postgresql":
+        return float(conn.exec_driver_sql(POSTGRES_LAG_QUERY).scalar() or 0.0)
+    return 0.0
+
+
+class ReplicaRouter:
+    """Picks the primary or replica session factory for each request."""
+
+    def __init__(
+        self,
+        primary_factory,
+        async_primary_factory,
+        replica_factory=None,
+        async_replica_factory=None,
+        replica_engine: Optional[Engine] = None,
+        lag_probe: Callable[[Connection], float] = default_lag_probe,
+        max_lag: float = REPLICA_MAX_LAG_SECONDS,
+        check_interval: float = REPLICA_LAG_CHECK_INTERVAL,
+        pin_seconds: float = READ_YOUR_WRITES_SECONDS,
+    ):
+        self.primary_factory = primary_factory
+        self.async_primary_factory = async_primary_factory
+        self.replica_factory = replica_factory
+        self.async_replica_factory = async_replica_factory
+        self.replica_engine = replica_engine
+        self.lag_probe = lag_probe
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.pin_seconds = pin_seconds
+        self._lag: Optional[float] = None
+        self._checked_at = -math.inf
+        self._lock = threading.Lock()
+        self._counters = {"replica_reads": 0, "primary_reads": 0, "pinned_reads": 0, "lagging_reads": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.replica_engine is not None
+
+    def lag_check_due(self) -> bool:
+        with self._lock:
+            return self.enabled and time.monotonic() - self._checked_at >= self.check_interval
+
+    def replica_lag(self, probe: bool = True) -> Optional[float]:
+        """
+        Latest lag measurement in seconds, or None if the replica could not be
+        reached. With `probe=False` the last measurement is returned even if it
+        is due for a refresh, so that the call never blocks.
+        """
+        with self._lock:
+            if not probe or time.monotonic() - self._checked_at < self.check_interval:
+                return self._lag
+        try:
+            with self.replica_engine.connect() as conn:
+                lag = self.lag_probe(conn)
+        except Exception as e:
+            logger.warning(f"Could not measure replica lag; reading from the primary: {e}")
+            lag = None
+        with self._lock:
+            self._lag = lag
+            self._checked_at = time.monotonic()
+        return lag
+
+    def is_pinned(self, request: Request) -> bool:
+        try:
+            return float(request.cookies.get(PRIMARY_PIN_COOKIE, "0")) > time.time()
+        except ValueError:
+            return False
+
+    def use_replica(self, request: Request, probe: bool = True) -> bool:
+        if not self.enabled or request.method not in READ_METHODS:
+            self._count("primary_reads")
+            return False
+        if self.is_pinned(request):
+            self._count("pinned_reads")
+            return False
+        lag = self.replica_lag(probe)
+        if lag is None or lag > self.max_lag:
+            self._count("lagging_reads")
+            return False
+        self._count("replica_reads")
+        return True
+
+    def session_factory(self, request: Request):
+        return self.replica_factory if self.use_replica(request) else self.primary_factory
+
+    def async_session_factory(self, request: Request):
+        """Runs on the event loop, so it only reads the lag measured by the caller in a worker thread."""
+        return self.async_replica_factory if self.use_replica(request, probe=False) else self.async_primary_factory
+
+    def pin_after_write(self, request: Request, response: Response):
+        """Sends the client's reads to the primary for a while after one of its writes succeeded."""
+        if not self.enabled or request.method not in WRITE_METHODS or response.status_code >= 400:
+            return
+        until = time.time() + self.pin_seconds
+        response.set_cookie(
+            PRIMARY_PIN_COOKIE, f"{until:.3f}", max_age=math.ceil(self.pin_seconds), httponly=True, samesite="lax"
+        )
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "replica_lag_seconds": self._lag,
+                "max_lag_seconds": self.max_lag,
+                **self._counters,
+            }
@@ -0,0 +1,269 @@
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+import requests
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+# Circuit breaker: opens when too many of the recent calls failed or were too slow.
+LLM_BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", "20"))  # most recent calls considered
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+LLM_BREAKER_FAILURE_RATE = float(os.getenv("LLM_BREAKER_FAILURE_RATE", "0.5"))
+LLM_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("LLM_BREAKER_SLOW_CALL_SECONDS", "60"))
+LLM_BREAKER_OPEN_SECONDS = float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "30"))
+
+# Adaptive (AIMD) concurrency limit for calls in flight.
+LLM_LIMIT_INITIAL = int(os.getenv("LLM_LIMIT_INITIAL", "8"))
+LLM_LIMIT_MIN = int(os.getenv("LLM_LIMIT_MIN", "1"))
+LLM_LIMIT_MAX = int(os.getenv("LLM_LIMIT_MAX", "32"))
+LLM_LIMIT_LATENCY_TARGET = float(os.getenv("LLM_LIMIT_LATENCY_TARGET", "20"))  # seconds
+LLM_LIMIT_BACKOFF = float(os.getenv("LLM_LIMIT_BACKOFF", "0.7"))
+LLM_LIMIT_RETRY_AFTER = int(os.getenv("LLM_LIMIT_RETRY_AFTER", "2"))
+
+CLOSED = "CLOSED"
+OPEN = "OPEN"
+HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitBreaker:
+    """
+    Count-based circuit breaker.
+
+    CLOSED: calls pass; once at least `min_calls` of the last `window` calls
+    are recorded and the share of failed or slow ones reaches `failure_rate`,
+    the breaker opens. OPEN: calls are rejected for `open_seconds`. HALF_OPEN:
+    a single probe call is let through; its outcome closes or re-opens the
+    breaker.
+    """
+
+    def __init__(
+        self,
+        window: int = LLM_BREAKER_WINDOW,
+        min_calls: int = LLM_BREAKER_MIN_CALLS,
+        failure_rate: float = LLM_BREAKER_FAILURE_RATE,
+        slow_call_seconds: float = LLM_BREAKER_SLOW_CALL_SECONDS,
+        open_seconds: float = LLM_BREAKER_OPEN_SECONDS,
+    ):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self._outcomes: deque = deque(maxlen=window)  # True = failed or slow
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> Optional[float]:
+        """Returns None if the call may proceed, otherwise the seconds until the breaker will let a probe through."""
+        with self._lock:
+            if self._state == OPEN:
+                remaining = self._opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    return remaining
+                self._state = HALF_OPEN
+                logger.info("LLM circuit breaker is half-open; sending a probe call.")
+            if self._state == HALF_OPEN:
+                if self._probe_in_flight:
+                    return 1.0
+                self._probe_in_flight = True
+            return None
+
+    def record(self, latency: float, failed: bool):
+        bad = failed or latency >= self.slow_call_seconds
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probe_in_flight = False
+                self._outcomes.clear()
+                if bad:
+                    self._open()
+                else:
+                    self._state = CLOSED
+                    logger.info("LLM circuit breaker closed after a successful probe.")
+                return
+            self._outcomes.append(bad)
+            if self._state == CLOSED and len(self._outcomes) >= self.min_calls and self._bad_rate() >= self.failure_rate:
+                self._open()
+
+    def release_probe(self):
+        # For calls that ended without a usable outcome (e.g. the client went away).
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        logger.warning(f"LLM circuit breaker opened for {self.open_seconds} s.")
+
+    def _bad_rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            retry_in = 0.0
+            if self._state == OPEN:
+                retry_in = max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+            return {
+                "state": self._state,
+                "window_calls": len(self._outcomes),
+                "failure_rate": round(self._bad_rate(), 3),
+                "retry_in_seconds": round(retry_in, 3),
+            }
+
+
+class AIMDLimiter:
+    """
+    Adaptive concurrency limit. Every call that finishes within
+    `latency_target` without failing raises the limit by 1/limit (about +1 per
+    round trip at full load). A failed or slow call multiplies it by
+    `backoff`, at most once per `latency_target` so that a burst of slow
+    calls started together only counts once.
+    """
+
+    def __init__(
+        self,
+        initial: int = LLM_LIMIT_INITIAL,
+        minimum: int = LLM_LIMIT_MIN,
+        maximum: int = LLM_LIMIT_MAX,
+        latency_target: float = LLM_LIMIT_LATENCY_TARGET,
+        backoff: float = LLM_LIMIT_BACKOFF,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self._limit = float(max(minimum, min(maximum, initial)))
+        self._in_flight = 0
+        self._last_decrease = -math.inf
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._in_flight >= int(self._limit):
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, latency: float, failed: bool):
+        with self._lock:
+            self._in_flight -= 1
+            if failed or latency > self.latency_target:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.latency_target:
+                    self._limit = max(self.minimum, self._limit * self.backoff)
+                    self._last_decrease = now
+                    logger.info(f"LLM concurrency limit lowered to {int(self._limit)}.")
+            else:
+                self._limit = min(self.maximum, self._limit + 1 / self._limit)
+
+    def release_unmeasured(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "min": self.minimum,
+                "max": self.maximum,
+                "latency_target_seconds": self.latency_target,
+            }
+
+
+def is_dependency_failure(exc: BaseException) -> bool:
+    """Transport errors and gateway-style errors count against the dependency; bad model output does not."""
+    if isinstance(exc, requests.exceptions.RequestException):
+        return True
+    return isinstance(exc, HTTPException) and exc.status_code in (502, 503, 504)
+
+
+class OutboundGuard:
+    """Circuit breaker plus adaptive concurrency limit in front of one external dependency."""
+
+    def __init__(
+        self,
+        name: str,
+        breaker: Optional[CircuitBreaker] = None,
+        limiter: Optional[AIMDLimiter] = None,
+        retry_after: int = LLM_LIMIT_RETRY_AFTER,
+    ):
+        self.name = name
+        self.breaker = breaker or CircuitBreaker()
+        self.limiter = limiter or AIMDLimiter()
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._counters = {"admitted": 0, "rejected_open": 0, "rejected_limit": 0, "failures": 0}
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    @contextmanager
+    def admit(self):
+        """
+        Runs the body as one guarded call.
+
+        Raises:
+            HTTPException: 503 with Retry-After, without running the body, if
+            the breaker is open or the concurrency limit is reached.
+        """
+        retry_in = self.breaker.try_acquire()
+        if retry_in is not None:
+            self._count("rejected_open")
+            raise HTTPException(
+                status_code=503,
+                detail=f"{self.name} is unavailable (circuit open). Please retry later.",
+                headers={"Retry-After": str(max(1, math.ceil(retry_in)))},
+            )
+        if not self.limiter.try_acquire():
+            self.breaker.release_probe()
+            self._count("rejected_limit")
+            raise HTTPException(
+                status_code=503,
+                detail=f"Too many concurrent {self.name} requests. Please retry later.",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        self._count("admitted")
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            failed = is_dependency_failure(e)
+            if failed:
+                self._count("failures")
+            latency = time.monotonic() - started
+            self.breaker.record(latency, failed)
+            self.limiter.release(latency, failed)
+            raise
+        except BaseException:
+            # Abandoned call (e.g. a closed stream): free the slot without judging the dependency.
+            self.breaker.release_probe()
+            self.limiter.release_unmeasured()
+            raise
+        else:
+            latency = time.monotonic() - started
+            self.breaker.record(latency, False)
+            self.limiter.release(latency, False)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "name": self.name,
+            "breaker": self.breaker.snapshot(),
+            "limiter": self.limiter.snapshot(),
+            **counters,
+        }
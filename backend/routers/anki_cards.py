@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from backend import schemas, crud
 from backend.main import get_db
+from backend.pagination import finish_page, page_cursor, page_limit
 from typing import Optional
 
 import logging # Added import
@@ -28,6 +29,12 @@ def review_anki_card(
     return db_anki_card
 
 @router.get("/student/{student_id}", response_model=list[schemas.AnkiCard])
-def get_anki_cards_for_student(student_id: str, db: Session = Depends(get_db)):
-    anki_cards = crud.get_anki_cards_by_student(db, student_id)
-    return anki_cards
+def get_anki_cards_for_student(
+    student_id: str,
+    response: Response,
+    limit: int = Depends(page_limit),
+    after: Optional[tuple] = Depends(page_cursor),
+    db: Session = Depends(get_db),
+):
+    anki_cards = crud.get_anki_cards_by_student(db, student_id, limit=limit, after=after)
+    return finish_page(response, anki_cards, limit, crud.ANKI_CARD_PAGE_KEY)
@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends, HTTPException
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.orm import Session
 from backend import schemas, crud
 from backend.main import get_db
 import uuid
+from typing import Any, List
 
 router = APIRouter(
     prefix="/assessments",
     tags=["4-Axis Model"],
 )
 
+# Bulk items are validated one by one, so that a malformed item fails alone instead of the whole request.
+assessment_adapter = TypeAdapter(schemas.AssessmentCreate)
+
+def _validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'item'}: {detail['msg']}" for detail in error.errors()
+    )
+
 @router.post("/", response_model=schemas.VectorHistoryEntry, status_code=201)
 def create_assessment(
     assessment: schemas.AssessmentCreate, db: Session = Depends(get_db)
@@ -21,3 +31,41 @@ def create_assessment(
         ai_reason_code=assessment.ai_reason_code,
     )
     return db_vector_history
+
+@router.post("/bulk", response_model=schemas.AssessmentBulkResult, status_code=201)
+def create_assessments_bulk(
+    items: List[Any] = Body(..., description="AssessmentCreate objects; invalid ones are reported per item"),
+    db: Session = Depends(get_db),
+):
+    if not items:
+        raise HTTPException(status_code=400, detail="At least one assessment is required.")
+    if len(items) > crud.ASSESSMENT_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A bulk request may contain at most {crud.ASSESSMENT_BULK_MAX_ITEMS} assessments.",
+        )
+
+    results = [None] * len(items)
+    valid = []  # (index, AssessmentCreate)
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, assessment_adapter.validate_python(item)))
+        except ValidationError as e:
+            student_id = item.get("student_id") if isinstance(item, dict) else None
+            results[index] = schemas.AssessmentBulkItemResult(
+                index=index,
+                student_id=student_id if isinstance(student_id, str) else None,
+                error=_validation_error(e),
+            )
+
+    outcomes = crud.bulk_create_assessments(db=db, assessments=[assessment for _, assessment in valid]) if valid else []
+    for (index, assessment), (assessment_id, vector_id, error) in zip(valid, outcomes):
+        results[index] = schemas.AssessmentBulkItemResult(
+            index=index,
+            student_id=assessment.student_id,
+            assessment_id=assessment_id,
+            vector_id=vector_id,
+            error=error,
+        )
+    succeeded = sum(1 for item in results if item.error is None)
+    return schemas.AssessmentBulkResult(succeeded=succeeded, failed=len(results) - succeeded, items=results)
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from backend import crud
+
+router = APIRouter(
+    prefix="/audio",
+    tags=["Audio"],
+)
+
+@router.get("/{audio_hash}")
+def get_audio(audio_hash: str):
+    path = crud.audio_store.get_path(audio_hash)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+
+    # FileResponse streams the file and answers Range requests with 206 Partial Content.
+    # The content never changes for a given hash, so clients may cache it indefinitely.
+    return FileResponse(
+        path,
+        media_type=crud.audio_store.media_type(path),
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
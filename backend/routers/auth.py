@@ -1,11 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional, Literal
 
 from .. import schemas, crud
-from ..main import get_db # Corrected import
 
 router = APIRouter(
     prefix="/auth",
@@ -14,7 +12,7 @@ router = APIRouter(
 )
 
 @router.post("/login", response_model=schemas.Token)
-async def login_for_access_token(form_data: schemas.UserLogin, db: Session = Depends(get_db)):
+async def login_for_access_token(form_data: schemas.UserLogin):
     # Placeholder for actual authentication logic
     # In a real application, you would verify credentials against a database
     # and hash passwords.
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from backend import schemas, crud
 from backend.main import get_db
+from backend.pagination import finish_page, page_cursor, page_limit
 
 router = APIRouter(
     prefix="/coach-memos",
@@ -11,12 +12,15 @@ router = APIRouter(
 
 @router.get("/", response_model=List[schemas.CoachMemoResponse])
 def read_coach_memos(
+    response: Response,
     student_id: Optional[str] = None,
     coach_id: Optional[str] = None,
+    limit: int = Depends(page_limit),
+    after: Optional[tuple] = Depends(page_cursor),
     db: Session = Depends(get_db)
 ):
-    memos = crud.get_coach_memos(db=db, student_id=student_id, coach_id=coach_id)
-    return memos
+    memos = crud.get_coach_memos(db=db, student_id=student_id, coach_id=coach_id, limit=limit, after=after)
+    return finish_page(response, memos, limit, crud.COACH_MEMO_PAGE_KEY)
 
 @router.post("/", response_model=schemas.CoachMemoResponse, status_code=201)
 def create_coach_memo(
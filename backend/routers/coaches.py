@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from backend import schemas, crud, models
-from backend.main import get_db
+from datetime import datetime
+import json
+from backend import async_crud, cohort_stats, schemas, crud
+from backend.main import get_async_db, get_async_read_db
+from backend.pagination import finish_page, page_cursor, page_limit
 
 router = APIRouter(
     prefix="/coaches",
@@ -10,30 +13,61 @@ router = APIRouter(
 )
 
 @router.get("/", response_model=List[schemas.Coach])
-def read_coaches(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    coaches = db.query(models.Coach).offset(skip).limit(limit).all()
-    return coaches
+async def read_coaches(
+    response: Response,
+    limit: int = Depends(page_limit),
+    after: Optional[tuple] = Depends(page_cursor),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    coaches = await async_crud.get_coaches(db, limit=limit, after=after)
+    return finish_page(response, coaches, limit, crud.COACH_PAGE_KEY)
 
 @router.get("/{coach_id}", response_model=schemas.Coach)
-def read_coach(coach_id: str, db: Session = Depends(get_db)):
-    db_coach = crud.get_coach(db, coach_id=coach_id)
+async def read_coach(coach_id: str, db: AsyncSession = Depends(get_async_read_db)):
+    db_coach = await async_crud.get_coach(db, coach_id=coach_id)
     if db_coach is None:
         raise HTTPException(status_code=404, detail="Coach not found")
     return db_coach
 
 @router.get("/{coach_id}/students", response_model=List[schemas.Student])
-def read_coach_students(coach_id: str, db: Session = Depends(get_db)):
-    students = crud.get_students_by_coach(db, coach_id=coach_id)
+async def read_coach_students(coach_id: str, db: AsyncSession = Depends(get_async_read_db)):
+    students = await async_crud.get_students_by_coach(db, coach_id=coach_id)
     # The crud function returns an empty list if the coach has no students,
     # or if the coach is not found. This is acceptable.
     return students
 
+@router.get("/{coach_id}/cohort-stats", response_model=schemas.CohortStats)
+async def read_coach_cohort_stats(coach_id: str, db: AsyncSession = Depends(get_async_db)):
+    # The primary: stale rows are unmarked once re-read, so a lagging replica would freeze old vectors in the cache.
+    stats = await cohort_stats.get_cohort_stats(db, coach_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Coach not found")
+    return stats
+
 @router.get("/{coach_id}/submissions", response_model=List[schemas.SubmissionResult])
-def read_coach_submissions(coach_id: str, status: Optional[str] = None, db: Session = Depends(get_db)):
-    submissions = crud.get_submissions_by_coach(db, coach_id=coach_id, status=status)
+async def read_coach_submissions(
+    coach_id: str,
+    response: Response,
+    status: Optional[str] = None,
+    submitted_from: Optional[datetime] = None,
+    submitted_to: Optional[datetime] = None,
+    limit: int = Depends(page_limit),
+    after: Optional[tuple] = Depends(page_cursor),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    submissions = await async_crud.get_submissions_by_coach(
+        db,
+        coach_id=coach_id,
+        status=status,
+        submitted_from=submitted_from,
+        submitted_to=submitted_to,
+        limit=limit,
+        after=after,
+    )
+    submissions = finish_page(response, submissions, limit, crud.SUBMISSION_PAGE_KEY)
     results = []
     for sub in submissions:
-        concept = crud.get_concept(db, sub.concept_id)
+        concept = sub.concept  # loaded with the feed query
         manim_content_url = concept.manim_data_path if concept else "https://youtube.com/watch?v=default_video"
         
         manim_json_output = None
@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from backend import exports
+from backend.database import create_session_factory
+from backend.main import get_read_db
+
+router = APIRouter(
+    prefix="/admin/exports",
+    tags=["Admin"],
+)
+
+ExportFormat = Literal["ndjson", "csv"]
+
+
+def export_filters(
+    start: Optional[datetime] = Query(None, alias="from", description="Inclusive lower bound on the row timestamp"),
+    end: Optional[datetime] = Query(None, alias="to", description="Exclusive upper bound on the row timestamp"),
+    student_id: List[str] = Query([], description="Repeat to export several students; all students when absent"),
+) -> exports.ExportFilters:
+    if start is not None and end is not None and exports.to_utc(start) >= exports.to_utc(end):
+        raise HTTPException(status_code=400, detail="'from' must be earlier than 'to'.")
+    student_ids = tuple(dict.fromkeys(student_id))
+    if len(student_ids) > exports.EXPORT_MAX_STUDENT_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"An export may filter on at most {exports.EXPORT_MAX_STUDENT_IDS} students.",
+        )
+    return exports.ExportFilters(start, end, student_ids)
+
+
+def _export_response(dataset: str, format: str, filters: exports.ExportFilters, db: Session) -> StreamingResponse:
+    # The stream outlives the request's session; every chunk opens its own on the same (possibly replica) engine.
+    session_factory = create_session_factory(db.get_bind())
+    return StreamingResponse(
+        exports.stream_export(session_factory, dataset, format, filters),
+        media_type=exports.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{format}"'},
+    )
+
+
+@router.get("/vector-history")
+def export_vector_history(
+    format: ExportFormat = "ndjson",
+    filters: exports.ExportFilters = Depends(export_filters),
+    db: Session = Depends(get_read_db),
+):
+    return _export_response("vector-history", format, filters, db)
+
+
+@router.get("/submissions")
+def export_submissions(
+    format: ExportFormat = "ndjson",
+    filters: exports.ExportFilters = Depends(export_filters),
+    db: Session = Depends(get_read_db),
+):
+    return _export_response("submissions", format, filters, db)
+
+
+@router.get("/llm-logs")
+def export_llm_logs(
+    format: ExportFormat = "ndjson",
+    filters: exports.ExportFilters = Depends(export_filters),
+    db: Session = Depends(get_read_db),
+):
+    return _export_response("llm-logs", format, filters, db)
@@ -1,10 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, status
 from datetime import datetime, timedelta
 from typing import List, Optional, Literal
 
 from .. import schemas
-from ..main import get_db
 
 router = APIRouter(
     prefix="/notifications",
@@ -57,13 +55,13 @@ dummy_notifications = [
 ]
 
 @router.get("/", response_model=List[schemas.Notification])
-async def get_notifications(db: Session = Depends(get_db)):
+async def get_notifications():
     # In a real application, this would fetch notifications from the database
     # filtered by the authenticated user.
     return dummy_notifications
 
 @router.put("/{notification_id}/read")
-async def mark_notification_as_read(notification_id: str, db: Session = Depends(get_db)):
+async def mark_notification_as_read(notification_id: str):
     # Placeholder logic: find notification and mark as read
     for notif in dummy_notifications:
         if notif.notification_id == notification_id:
@@ -72,7 +70,7 @@ async def mark_notification_as_read(notification_id: str, db: Session = Depends(
     raise HTTPException(status_code=404, detail="Notification not found")
 
 @router.put("/mark-all-read")
-async def mark_all_notifications_as_read(db: Session = Depends(get_db)):
+async def mark_all_notifications_as_read():
     # Placeholder logic: mark all notifications for the user as read
     for notif in dummy_notifications:
         notif.is_read = True
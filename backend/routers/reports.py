@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from backend import schemas, crud
-from backend.main import get_db
+from backend.main import get_db, get_read_db
+from backend.pagination import finish_page, page_cursor, page_limit
 
 router = APIRouter(
     prefix="/reports",
@@ -10,9 +11,14 @@ router = APIRouter(
 )
 
 @router.get("/drafts", response_model=List[schemas.WeeklyReport])
-def get_report_drafts(db: Session = Depends(get_db)):
-    drafts = crud.get_report_drafts(db=db)
-    return drafts
+def get_report_drafts(
+    response: Response,
+    limit: int = Depends(page_limit),
+    after: Optional[tuple] = Depends(page_cursor),
+    db: Session = Depends(get_read_db),
+):
+    drafts = crud.get_report_drafts(db=db, limit=limit, after=after)
+    return finish_page(response, drafts, limit, crud.REPORT_PAGE_KEY)
 
 @router.put("/{report_id}/finalize", response_model=schemas.WeeklyReport)
 def finalize_report(
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from backend import schemas, crud, models
-from backend.main import get_db
+from typing import List, Optional
+from backend import async_crud, schemas, crud, similarity_index, vector_stats
+from backend.main import get_async_db, get_async_read_db, get_db
+from backend.pagination import finish_page, page_cursor, page_limit
 
 router = APIRouter(
     prefix="/students",
@@ -17,38 +19,100 @@ def create_student(student: schemas.StudentCreate, db: Session = Depends(get_db)
     return crud.create_student(db=db, student=student)
 
 @router.get("/", response_model=List[schemas.Student])
-def get_all_students(db: Session = Depends(get_db)):
-    students = db.query(models.Student).all()
-    return students
+async def get_all_students(
+    response: Response,
+    limit: int = Depends(page_limit),
+    after: Optional[tuple] = Depends(page_cursor),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    students = await async_crud.get_students(db, limit=limit, after=after)
+    return finish_page(response, students, limit, crud.STUDENT_PAGE_KEY)
 
 @router.get("/{student_id}/vector-history", response_model=List[schemas.VectorHistoryEntry])
-def get_vector_history(student_id: str, db: Session = Depends(get_db)):
-    history = crud.get_vector_history_by_student(db=db, student_id=student_id)
-    return history
+async def get_vector_history(
+    student_id: str,
+    response: Response,
+    limit: int = Depends(page_limit),
+    after: Optional[tuple] = Depends(page_cursor),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    history = await async_crud.get_vector_history_by_student(db=db, student_id=student_id, limit=limit, after=after)
+    return finish_page(response, history, limit, crud.VECTOR_HISTORY_PAGE_KEY)
+
+@router.get("/{student_id}/vector-stats", response_model=schemas.VectorStats)
+async def get_vector_stats(
+    student_id: str,
+    windows: Optional[str] = Query(None, description="Comma-separated window sizes in vectors, e.g. 3,5,10"),
+    # The primary: a lagging replica would refill the cache with the history it was just invalidated for.
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        window_sizes = vector_stats.parse_windows(windows)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    cached = vector_stats.cache.get(student_id, window_sizes)
+    if cached is not None:
+        return cached
+    generation = vector_stats.cache.generation(student_id)
+    rows = await async_crud.get_vector_axes_by_student(db, student_id)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Vector history not found for student")
+    stats = vector_stats.compute_vector_stats(student_id, rows, window_sizes)
+    vector_stats.cache.put(student_id, window_sizes, stats, generation)
+    return stats
+
+@router.get("/{student_id}/similar", response_model=List[schemas.SimilarStudent])
+async def get_similar_students(
+    student_id: str,
+    k: int = Query(5, ge=1, le=similarity_index.SIMILAR_STUDENTS_MAX_K),
+    # The primary: pending students are re-read once, so a lagging replica would freeze old vectors in the index.
+    db: AsyncSession = Depends(get_async_db),
+):
+    """The k students whose latest vectors are closest (Euclidean distance over the 11 axes)."""
+    neighbours = await similarity_index.index.nearest(db, student_id, k)
+    if neighbours is None:
+        raise HTTPException(status_code=404, detail="Latest vector not found for student")
+    names = await async_crud.get_student_names(db, [peer_id for peer_id, _ in neighbours])
+    return [
+        schemas.SimilarStudent(student_id=peer_id, student_name=names.get(peer_id), distance=distance)
+        for peer_id, distance in neighbours
+    ]
 
 @router.get("/{student_id}/mastery", response_model=List[schemas.StudentMastery])
-def get_student_mastery(student_id: str, db: Session = Depends(get_db)):
-    mastery_entries = crud.get_student_mastery_by_student(db=db, student_id=student_id)
+async def get_student_mastery(student_id: str, db: AsyncSession = Depends(get_async_read_db)):
+    mastery_entries = await async_crud.get_student_mastery_by_student(db=db, student_id=student_id)
     return mastery_entries
 
 @router.get("/{student_id}/reports", response_model=List[schemas.WeeklyReport])
-def get_student_reports(student_id: str, db: Session = Depends(get_db)):
-    reports = db.query(models.WeeklyReport).filter(models.WeeklyReport.student_id == student_id).all()
+async def get_student_reports(student_id: str, db: AsyncSession = Depends(get_async_read_db)):
+    reports = await async_crud.get_reports_by_student(db, student_id)
     return reports
 
 @router.get("/{student_id}/latest_vector", response_model=schemas.VectorHistoryEntry)
-def get_student_latest_vector(student_id: str, db: Session = Depends(get_db)):
-    vector = crud.get_latest_vector_for_student(db, student_id)
+async def get_student_latest_vector(student_id: str, db: AsyncSession = Depends(get_async_read_db)):
+    vector = await async_crud.get_latest_vector_for_student(db, student_id)
     if not vector:
         raise HTTPException(status_code=404, detail="Latest vector not found for student")
     return vector
 
 @router.get("/{student_id}/submissions", response_model=List[schemas.SubmissionResult])
-def get_student_submissions(student_id: str, db: Session = Depends(get_db)):
-    submissions = db.query(models.Submission).filter(models.Submission.student_id == student_id).all()
-    return submissions
+async def get_student_submissions(
+    student_id: str,
+    response: Response,
+    limit: int = Depends(page_limit),
+    after: Optional[tuple] = Depends(page_cursor),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    submissions = await async_crud.get_submissions_by_student(db, student_id, limit=limit, after=after)
+    return finish_page(response, submissions, limit, crud.SUBMISSION_PAGE_KEY)
 
 @router.get("/{student_id}/anki-cards", response_model=List[schemas.AnkiCard])
-def get_student_anki_cards(student_id: str, db: Session = Depends(get_db)):
-    anki_cards = crud.get_anki_cards_by_student(db, student_id)
-    return anki_cards
+async def get_student_anki_cards(
+    student_id: str,
+    response: Response,
+    limit: int = Depends(page_limit),
+    after: Optional[tuple] = Depends(page_cursor),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    anki_cards = await async_crud.get_anki_cards_by_student(db, student_id, limit=limit, after=after)
+    return finish_page(response, anki_cards, limit, crud.ANKI_CARD_PAGE_KEY)
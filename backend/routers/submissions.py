@@ -1,15 +1,38 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from backend import schemas, crud, models
+from backend import schemas, crud, models, submission_worker
+from backend.database import create_session_factory
 from backend.main import get_db
 import uuid
 import json # Import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/submissions",
     tags=["Submissions"],
 )
 
+def _to_submission_result(db_submission: models.Submission) -> schemas.SubmissionResult:
+    manim_json_output = None
+    if db_submission.manim_visualization_json:
+        manim_json_output = json.loads(db_submission.manim_visualization_json)
+
+    return schemas.SubmissionResult(
+        submission_id=db_submission.submission_id,
+        student_id=db_submission.student_id,
+        problem_text=db_submission.problem_text,
+        status=db_submission.status,
+        logical_path_text=db_submission.logical_path_text,
+        concept_id=db_submission.concept_id,
+        manim_content_url=db_submission.manim_data_path,
+        audio_explanation_url=db_submission.audio_explanation_url, # Include audio URL
+        manim_visualization_json=manim_json_output,
+        submitted_at=db_submission.submitted_at,
+    )
+
 @router.post("/", response_model=schemas.SubmissionResult, status_code=201)
 def create_submission(
     submission: schemas.SubmissionCreate, db: Session = Depends(get_db)
@@ -24,46 +47,131 @@ def create_submission(
     if not db_submission:
         raise HTTPException(status_code=400, detail="Submission could not be created.")
 
-    manim_json_output = None
-    if db_submission.manim_visualization_json:
-        manim_json_output = json.loads(db_submission.manim_visualization_json)
+    return _to_submission_result(db_submission)
 
-    return schemas.SubmissionResult(
+@router.post("/async", response_model=schemas.SubmissionJob, status_code=202)
+def create_submission_async(
+    submission: schemas.SubmissionCreate, db: Session = Depends(get_db)
+):
+    db_submission = crud.create_pending_submission(
+        db=db,
+        student_id=submission.student_id,
+        problem_text=submission.problem_text,
+        manim_visualization_json=submission.manim_visualization_json,
+    )
+
+    # Workers open their own sessions on the same database as this request.
+    session_factory = create_session_factory(db.get_bind())
+    try:
+        submission_worker.pool.submit(session_factory, db_submission.submission_id)
+    except HTTPException as e:
+        crud.mark_submission_failed(db, db_submission.submission_id, str(e.detail))
+        raise
+
+    return schemas.SubmissionJob(
+        job_id=db_submission.submission_id,
         submission_id=db_submission.submission_id,
-        student_id=db_submission.student_id,
-        problem_text=db_submission.problem_text,
         status=db_submission.status,
-        logical_path_text=db_submission.logical_path_text,
-        concept_id=db_submission.concept_id,
-        manim_content_url=db_submission.manim_data_path,
-        audio_explanation_url=db_submission.audio_explanation_url, # Include audio URL
-        manim_visualization_json=manim_json_output,
-        submitted_at=db_submission.submitted_at,
+        status_url=f"/submissions/{db_submission.submission_id}/status",
     )
 
-@router.get("/{submission_id}", response_model=schemas.SubmissionResult)
-def get_submission_by_id(submission_id: str, db: Session = Depends(get_db)):
+@router.post("/stream")
+def create_submission_stream(
+    submission: schemas.SubmissionCreate, db: Session = Depends(get_db)
+):
+    """
+    Analyses a submission and streams the result as NDJSON: `concept` and
+    `logical_path_text` events as soon as the LLM has produced them, then a
+    final `submission` event (or an `error` event).
+    """
+    # The stream outlives this request's session, so it opens its own.
+    session_factory = create_session_factory(db.get_bind())
+
+    def events():
+        stream_db = session_factory()
+        try:
+            llm_analysis_result = None
+            for event in crud.stream_llm_analysis(stream_db, submission.problem_text):
+                if event["event"] == "analysis":
+                    llm_analysis_result = event["analysis"]
+                    continue
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+
+            db_submission = crud.store_analyzed_submission(
+                stream_db,
+                student_id=submission.student_id,
+                problem_text=submission.problem_text,
+                llm_analysis_result=llm_analysis_result,
+                manim_visualization_json=submission.manim_visualization_json,
+            )
+            result = _to_submission_result(db_submission)
+            yield json.dumps({"event": "submission", "submission": result.model_dump(mode="json")}, ensure_ascii=False) + "\n"
+        except HTTPException as e:
+            stream_db.rollback()
+            yield json.dumps({"event": "error", "status_code": e.status_code, "detail": e.detail}, ensure_ascii=False) + "\n"
+        except Exception as e:
+            # The 200 status is already sent; a terminal error event tells the client the stream did not just break off.
+            logger.exception(f"Streaming submission for student {submission.student_id} failed: {e}")
+            stream_db.rollback()
+            yield json.dumps({"event": "error", "status_code": 500, "detail": "Failed to store the submission."}, ensure_ascii=False) + "\n"
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@router.post("/batch", response_model=schemas.SubmissionBatchResult, status_code=201)
+def create_submission_batch(
+    batch: schemas.SubmissionBatchCreate, db: Session = Depends(get_db)
+):
+    if len(batch.problems) > crud.SUBMISSION_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch may contain at most {crud.SUBMISSION_BATCH_MAX_ITEMS} problems.",
+        )
+
+    outcomes = crud.process_submission_batch(db=db, student_id=batch.student_id, items=batch.problems)
+
+    items = []
+    for index, (item, (db_submission, error)) in enumerate(zip(batch.problems, outcomes)):
+        items.append(schemas.SubmissionBatchItemResult(
+            index=index,
+            problem_text=item.problem_text,
+            submission=_to_submission_result(db_submission) if db_submission else None,
+            error=error,
+        ))
+    succeeded = sum(1 for item in items if item.submission)
+    return schemas.SubmissionBatchResult(
+        student_id=batch.student_id,
+        succeeded=succeeded,
+        failed=len(items) - succeeded,
+        items=items,
+    )
+
+@router.get("/{submission_id}/status", response_model=schemas.SubmissionStatus)
+def get_submission_status(submission_id: str, db: Session = Depends(get_db)):
     db_submission = crud.get_submission(db, submission_id=submission_id)
     if db_submission is None:
         raise HTTPException(status_code=404, detail="Submission not found")
-    
-    manim_json_output = None
-    if db_submission.manim_visualization_json:
-        manim_json_output = json.loads(db_submission.manim_visualization_json)
 
-    return schemas.SubmissionResult(
+    result = None
+    if db_submission.status in ("COMPLETE", "REVIEWED"):
+        result = _to_submission_result(db_submission)
+
+    return schemas.SubmissionStatus(
         submission_id=db_submission.submission_id,
-        student_id=db_submission.student_id,
-        problem_text=db_submission.problem_text,
         status=db_submission.status,
-        logical_path_text=db_submission.logical_path_text,
-        concept_id=db_submission.concept_id,
-        manim_content_url=db_submission.manim_data_path,
-        audio_explanation_url=db_submission.audio_explanation_url, # Include audio URL
-        manim_visualization_json=manim_json_output,
-        submitted_at=db_submission.submitted_at,
+        error=db_submission.error_detail if db_submission.status == "FAILED" else None,
+        result=result,
     )
 
+@router.get("/{submission_id}", response_model=schemas.SubmissionResult)
+def get_submission_by_id(submission_id: str, db: Session = Depends(get_db)):
+    db_submission = crud.get_submission(db, submission_id=submission_id)
+    if db_submission is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+
+    return _to_submission_result(db_submission)
+
 @router.post("/{submission_id}/review", response_model=schemas.SubmissionReviewResponse)
 def review_submission(
     submission_id: str,
@@ -76,4 +184,4 @@ def review_submission(
     )
     if not db_review:
         raise HTTPException(status_code=404, detail="Submission not found or review could not be added.")
-    return db_review
\ No newline at end of file
+    return db_review
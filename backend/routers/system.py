@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+from backend import crud, http_client
+
+router = APIRouter(
+    prefix="/system",
+    tags=["System"],
+)
+
+@router.get("/analysis-cache")
+def get_analysis_cache_stats():
+    return crud.analysis_cache.stats()
+
+@router.get("/outbound")
+def get_outbound_http_metrics():
+    return http_client.default_client.metrics()
+
+@router.get("/audio-store")
+def get_audio_store_stats():
+    return crud.audio_store.stats()
+
+@router.get("/replica")
+def get_replica_routing_state():
+    from backend.main import replica_router
+    return replica_router.snapshot()
+
+@router.get("/llm-guard")
+def get_llm_guard_state():
+    return crud.llm_guard.snapshot()
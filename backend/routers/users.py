@@ -1,9 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, status
 from typing import Optional, Literal
 
 from .. import schemas
-from ..main import get_db
 
 router = APIRouter(
     prefix="/users",
@@ -34,7 +32,7 @@ dummy_notification_settings = schemas.UserNotificationUpdate(
 )
 
 @router.get("/me", response_model=schemas.UserMe)
-async def get_current_user_profile(db: Session = Depends(get_db)):
+async def get_current_user_profile():
     # In a real app, this would get the authenticated user's ID
     # and fetch their profile from the database.
     # For now, we'll return a dummy user based on a hypothetical user type.
@@ -47,7 +45,7 @@ async def get_current_user_profile(db: Session = Depends(get_db)):
     raise HTTPException(status_code=401, detail="Not authenticated")
 
 @router.put("/me", response_model=schemas.UserMe)
-async def update_current_user_profile(user_update: schemas.UserUpdate, db: Session = Depends(get_db)):
+async def update_current_user_profile(user_update: schemas.UserUpdate):
     # Placeholder for updating user profile
     current_user_type = "student" # This would come from the auth token
     if current_user_type == "student":
@@ -65,7 +63,7 @@ async def update_current_user_profile(user_update: schemas.UserUpdate, db: Sessi
     raise HTTPException(status_code=401, detail="Not authenticated")
 
 @router.put("/me/password")
-async def update_current_user_password(password_update: schemas.UserPasswordUpdate, db: Session = Depends(get_db)):
+async def update_current_user_password(password_update: schemas.UserPasswordUpdate):
     # Placeholder for password update logic
     if password_update.new_password != password_update.confirm_new_password:
         raise HTTPException(status_code=400, detail="New passwords do not match")
@@ -74,7 +72,7 @@ async def update_current_user_password(password_update: schemas.UserPasswordUpda
     return {"message": "Password updated successfully"}
 
 @router.put("/me/notifications", response_model=schemas.UserNotificationUpdate)
-async def update_current_user_notifications(notification_update: schemas.UserNotificationUpdate, db: Session = Depends(get_db)):
+async def update_current_user_notifications(notification_update: schemas.UserNotificationUpdate):
     # Placeholder for updating notification preferences
     dummy_notification_settings.new_assignments = notification_update.new_assignments
     dummy_notification_settings.feedback_from_coach = notification_update.feedback_from_coach
@@ -82,7 +80,7 @@ async def update_current_user_notifications(notification_update: schemas.UserNot
     return dummy_notification_settings
 
 @router.delete("/me")
-async def deactivate_current_user_account(db: Session = Depends(get_db)):
+async def deactivate_current_user_account():
     # Placeholder for account deactivation logic
     print("User account deactivated.")
     return {"message": "Account deactivated successfully"}
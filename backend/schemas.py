@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Literal
+from typing import Dict, List, Optional, Literal
 from datetime import datetime
 
 class StudentCreate(BaseModel):
@@ -30,6 +30,47 @@ class VectorHistoryEntry(BaseModel):
     axis3_ret: int = Field(..., ge=0, le=100)
     axis4_acc: int = Field(..., ge=0, le=100)
     axis4_gri: int = Field(..., ge=0, le=100)
+    # "raw" for a single vector; "day"/"week" for rolled-up older history,
+    # whose axes are the period's last vector (see crud.compact_vector_history).
+    granularity: str = "raw"
+    vector_count: int = 1
+
+class AxisStats(BaseModel):
+    latest: float
+    min: float
+    max: float
+    mean: float
+    volatility: float
+    moving_average: Dict[int, Optional[float]]
+    slope_per_day: Dict[int, Optional[float]]
+
+class VectorStats(BaseModel):
+    student_id: str
+    count: int
+    first_at: Optional[datetime] = None
+    last_at: Optional[datetime] = None
+    windows: List[int]
+    axes: Dict[str, AxisStats]
+
+class CohortAxisStats(BaseModel):
+    mean: float
+    std: float
+    quantiles: Dict[str, float]
+    histogram: List[int]
+
+class CohortStats(BaseModel):
+    coach_id: str
+    roster_size: int
+    students_with_vectors: int
+    axis_order: List[str]
+    histogram_edges: List[float]
+    axes: Dict[str, CohortAxisStats]
+    correlation: List[List[Optional[float]]]
+
+class SimilarStudent(BaseModel):
+    student_id: str
+    student_name: Optional[str] = None
+    distance: float
 
 class AssessmentCreate(BaseModel):
     student_id: str
@@ -58,7 +99,7 @@ class SubmissionResult(BaseModel):
     student_id: str
     problem_text: str
     status: str
-    logical_path_text: str
+    logical_path_text: Optional[str] = None
     concept_id: Optional[str] = None
     manim_content_url: Optional[str] = None
     audio_explanation_url: Optional[str] = None # New field for audio explanation URL
@@ -66,6 +107,50 @@ class SubmissionResult(BaseModel):
     submitted_at: Optional[datetime] = None
     model_config = ConfigDict(from_attributes=True)
 
+class SubmissionJob(BaseModel):
+    job_id: str
+    submission_id: str
+    status: str
+    status_url: str
+
+class SubmissionStatus(BaseModel):
+    submission_id: str
+    status: str
+    error: Optional[str] = None
+    result: Optional[SubmissionResult] = None
+
+class AssessmentBulkItemResult(BaseModel):
+    index: int
+    student_id: Optional[str] = None  # None for an item that is not a valid assessment
+    assessment_id: Optional[str] = None
+    vector_id: Optional[str] = None
+    error: Optional[str] = None
+
+class AssessmentBulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    items: List[AssessmentBulkItemResult]
+
+class SubmissionBatchItem(BaseModel):
+    problem_text: str
+    manim_visualization_json: Optional[dict] = None
+
+class SubmissionBatchCreate(BaseModel):
+    student_id: str
+    problems: List[SubmissionBatchItem] = Field(..., min_length=1)
+
+class SubmissionBatchItemResult(BaseModel):
+    index: int
+    problem_text: str
+    submission: Optional[SubmissionResult] = None
+    error: Optional[str] = None
+
+class SubmissionBatchResult(BaseModel):
+    student_id: str
+    succeeded: int
+    failed: int
+    items: List[SubmissionBatchItemResult]
+
 class CoachMemoCreate(BaseModel):
     coach_id: str
     student_id: str
@@ -0,0 +1,77 @@
+"""
+Measures SQLite throughput of bulk assessment ingestion (POST /assessments/bulk)
+against the one-at-a-time path (POST /assessments/).
+
+Both runs include validating the request items into AssessmentCreate.
+
+    python -m backend.scripts.bench_bulk_assessments [--vectors 10000] [--students 500]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from backend import crud, models, schemas
+from backend.database import create_db_engine, create_session_factory
+
+
+def _items(count: int, students: int) -> list:
+    rng = random.Random(0)
+    return [
+        {
+            "student_id": f"std_{i % students:05d}",
+            "assessment_type": "MOCK_EXAM",
+            "vector_data": {axis: rng.randint(0, 100) for axis in crud.VECTOR_AXES},
+        }
+        for i in range(count)
+    ]
+
+
+def _fresh_db(workdir: str, name: str, students: int):
+    engine = create_db_engine(f"sqlite:///{os.path.join(workdir, name)}")
+    models.Base.metadata.create_all(bind=engine)
+    session_factory = create_session_factory(engine)
+    with session_factory() as db:
+        db.add_all(models.Student(student_id=f"std_{i:05d}", student_name=f"Student {i}") for i in range(students))
+        db.commit()
+    return engine, session_factory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=10000)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--single", type=int, default=500, help="Vectors written one at a time for comparison")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_bulk_assessments_")
+    try:
+        engine, session_factory = _fresh_db(workdir, "bulk.db", args.students)
+        items = _items(args.vectors, args.students)
+        with session_factory() as db:
+            started = time.perf_counter()
+            assessments = [schemas.AssessmentCreate.model_validate(item) for item in items]
+            outcomes = crud.bulk_create_assessments(db, assessments)
+            bulk_elapsed = time.perf_counter() - started
+        engine.dispose()
+        failed = sum(1 for _, _, error in outcomes if error)
+        print(f"bulk:   {args.vectors} vectors in {bulk_elapsed:.2f} s "
+              f"({args.vectors / bulk_elapsed:.0f} vectors/s, {failed} failed)")
+
+        engine, session_factory = _fresh_db(workdir, "single.db", args.students)
+        items = _items(args.single, args.students)
+        with session_factory() as db:
+            started = time.perf_counter()
+            for item in items:
+                crud.create_assessment_and_vector(db, schemas.AssessmentCreate.model_validate(item))
+            single_elapsed = time.perf_counter() - started
+        engine.dispose()
+        print(f"single: {args.single} vectors in {single_elapsed:.2f} s ({args.single / single_elapsed:.0f} vectors/s)")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
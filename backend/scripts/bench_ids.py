@@ -0,0 +1,110 @@
+"""
+Compares the legacy random ids (`sub_` + uuid4().hex[:8]) with the
+time-ordered ids of backend/ids.py on a SQLite copy of the submissions and
+llm_logs tables: insert throughput as the tables grow, file size, primary-key
+lookups and foreign-key joins, plus the collisions the legacy scheme runs
+into at that volume.
+
+    python -m backend.scripts.bench_ids [--rows 300000] [--batch 1000] [--lookups 20000]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, UTC
+
+from sqlalchemy import bindparam, func, insert, select
+
+from backend import ids, models
+from backend.database import create_db_engine
+
+SCHEMES = {
+    "legacy": lambda: f"sub_{uuid.uuid4().hex[:8]}",
+    "time-ordered": lambda: ids.new_id(ids.SUBMISSION_PREFIX),
+}
+
+
+def run(workdir: str, scheme: str, rows: int, batch: int, lookups: int) -> dict:
+    path = os.path.join(workdir, f"{scheme}.db")
+    engine = create_db_engine(f"sqlite:///{path}")
+    tables = [models.Student.__table__, models.Submission.__table__, models.LLMLog.__table__]
+    models.Base.metadata.create_all(bind=engine, tables=tables)
+    make_id = SCHEMES[scheme]
+    started_at = datetime(2026, 1, 1, tzinfo=UTC)
+
+    seen, collisions = set(), 0
+    with engine.begin() as conn:
+        conn.execute(insert(models.Student), [{"student_id": f"std_{i:04d}", "student_name": f"Student {i}"} for i in range(100)])
+
+    insert_seconds = 0.0
+    for start in range(0, rows, batch):
+        submissions = []
+        for i in range(start, min(start + batch, rows)):
+            submission_id = make_id()
+            if submission_id in seen:
+                collisions += 1  # would have been an IntegrityError in production
+                continue
+            seen.add(submission_id)
+            submissions.append({
+                "submission_id": submission_id, "student_id": f"std_{i % 100:04d}", "status": "COMPLETED",
+                "problem_text": "x^2 - 4x + 3 = 0", "submitted_at": started_at + timedelta(seconds=i),
+            })
+        logs = [{"source_submission_id": row["submission_id"], "decision": "AUTO", "model_version": "mock"} for row in submissions]
+        t0 = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(insert(models.Submission), submissions)
+            conn.execute(insert(models.LLMLog), logs)
+        insert_seconds += time.perf_counter() - t0
+
+    sample = random.Random(0).sample(sorted(seen), min(lookups, len(seen)))
+    submission = models.Submission.__table__
+    log = models.LLMLog.__table__
+    by_id = select(submission.c.status).where(submission.c.submission_id == bindparam("submission_id"))
+    joined = (
+        select(func.count())
+        .select_from(log.join(submission, log.c.source_submission_id == submission.c.submission_id))
+        .where(submission.c.student_id == "std_0007")
+    )
+    with engine.connect() as conn:
+        t0 = time.perf_counter()
+        for submission_id in sample:
+            conn.execute(by_id, {"submission_id": submission_id}).scalar()
+        lookup_seconds = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        conn.execute(joined).scalar()
+        join_seconds = time.perf_counter() - t0
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    engine.dispose()
+    return {
+        "inserted": len(seen),
+        "collisions": collisions,
+        "insert_rate": len(seen) / insert_seconds,
+        "lookup_us": lookup_seconds / len(sample) * 1e6,
+        "join_ms": join_seconds * 1000,
+        "size_mb": os.path.getsize(path) / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=300000)
+    parser.add_argument("--batch", type=int, default=1000, help="Rows per transaction")
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_ids_")
+    try:
+        print(f"{'scheme':<14}{'rows/s':>10}{'lookup us':>11}{'join ms':>9}{'size MB':>9}{'collisions':>12}")
+        for scheme in SCHEMES:
+            result = run(workdir, scheme, args.rows, args.batch, args.lookups)
+            print(f"{scheme:<14}{result['insert_rate']:>10.0f}{result['lookup_us']:>11.1f}"
+                  f"{result['join_ms']:>9.1f}{result['size_mb']:>9.1f}{result['collisions']:>12}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Benchmark for the per-student composite indexes.
+
+Fills a scratch database with `--rows` rows in each hot table, drops the
+declared indexes to mimic a database created before they existed, and runs
+the real crud queries. It then applies `ensure_indexes()` and runs them
+again. For every query it prints the plan and the median latency.
+
+    python -m backend.scripts.bench_indexes [--rows 1000000] [--students 10000] [--database-url sqlite:///./bench_indexes.db]
+
+The default database is a temporary SQLite file that is removed afterwards.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, UTC
+
+from sqlalchemy import event
+
+from backend import crud, models
+from backend.database import create_db_engine, create_session_factory
+from backend.migrations import ensure_indexes
+
+AXES = ["axis1_geo", "axis1_alg", "axis1_ana", "axis2_opt", "axis2_piv", "axis2_dia",
+        "axis3_con", "axis3_pro", "axis3_ret", "axis4_acc", "axis4_gri"]
+CHUNK = 20000
+
+
+def populate(engine, rows: int, students: int, rng: random.Random):
+    now = datetime.now(UTC)
+    t = models.Base.metadata.tables
+
+    def timestamp():
+        return now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+
+    def insert(table, make_row, count):
+        with engine.begin() as conn:
+            for start in range(0, count, CHUNK):
+                conn.execute(table.insert(), [make_row(i) for i in range(start, min(count, start + CHUNK))])
+
+    started = time.perf_counter()
+    insert(t["students"], lambda i: {"student_id": f"std_{i:06d}", "student_name": f"Student {i}"}, students)
+    insert(t["coaches"], lambda i: {"coach_id": "coach_bench", "coach_name": "Bench Coach"}, 1)
+    insert(t["student_coach_relation"], lambda i: {"student_id": f"std_{i:06d}", "coach_id": "coach_bench"}, min(students, 20))
+    insert(t["assessments"], lambda i: {
+        "assessment_id": f"asmt_{i:08d}", "student_id": f"std_{i % students:06d}",
+        "assessment_type": "llm_analysis", "assessment_date": timestamp(),
+    }, rows)
+    insert(t["student_vector_history"], lambda i: {
+        "vector_id": f"vec_{i:08d}", "assessment_id": f"asmt_{i:08d}", "student_id": f"std_{i % students:06d}",
+        "created_at": timestamp(), **{axis: rng.randint(0, 100) for axis in AXES},
+    }, rows)
+    insert(t["submissions"], lambda i: {
+        "submission_id": f"sub_{i:08d}", "student_id": f"std_{rng.randrange(students):06d}",
+        "submitted_at": timestamp(), "problem_text": "x^2 - 4 = 0", "status": rng.choice(["COMPLETE", "REVIEWED"]),
+    }, rows)
+    insert(t["llm_logs"], lambda i: {
+        "source_submission_id": f"sub_{i:08d}", "decision": "pending_review", "model_version": "llama2",
+    }, rows)
+    insert(t["anki_cards"], lambda i: {
+        "student_id": f"std_{rng.randrange(students):06d}", "llm_log_id": i + 1, "question": "Q", "answer": "A",
+        "next_review_date": timestamp().replace(tzinfo=None), "interval_days": 1, "ease_factor": 2.5, "repetitions": 0,
+    }, rows)
+    print(f"Inserted {rows} rows per table for {students} students in {time.perf_counter() - started:.1f} s.")
+
+
+def benchmark_queries(students: int, rows: int, rng: random.Random):
+    def student():
+        return f"std_{rng.randrange(students):06d}"
+
+    return [
+        ("latest vector", lambda db: crud.get_latest_vector_for_student(db, student())),
+        ("vector history", lambda db: crud.get_vector_history_by_student(db, student())),
+        ("coach submissions feed", lambda db: crud.get_submissions_by_coach(db, "coach_bench", status="COMPLETE", limit=100)),
+        ("anki cards by student", lambda db: crud.get_anki_cards_by_student(db, student())),
+        ("llm log by submission", lambda db: db.query(models.LLMLog).filter(
+            models.LLMLog.source_submission_id == f"sub_{rng.randrange(rows):08d}").first()),
+        ("coach memos by student", lambda db: crud.get_coach_memos(db, student_id=student())),
+    ]
+
+
+def explain(engine, statement, parameters) -> str:
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+    return " | ".join(str(row[-1]) for row in rows)
+
+
+def run_queries(engine, session_factory, queries, repeat: int) -> dict:
+    results = {}
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    for name, query in queries:
+        db = session_factory()
+        try:
+            query(db)  # warm-up, and capture the SQL of the last statement
+            captured.clear()
+            event.listen(engine, "before_cursor_execute", capture)
+            try:
+                query(db)
+            finally:
+                event.remove(engine, "before_cursor_execute", capture)
+            statement, parameters = captured[-1]
+
+            timings = []
+            for _ in range(repeat):
+                db.expunge_all()
+                started = time.perf_counter()
+                query(db)
+                timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            db.close()
+        results[name] = (statistics.median(timings), explain(engine, statement, parameters))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    scratch = None
+    url = args.database_url
+    if url is None:
+        fd, scratch = tempfile.mkstemp(suffix=".db", prefix="bench_indexes_")
+        os.close(fd)
+        url = f"sqlite:///{scratch}"
+
+    engine = create_db_engine(url)
+    session_factory = create_session_factory(engine)
+    rng = random.Random(args.seed)
+    try:
+        models.Base.metadata.drop_all(bind=engine)
+        models.Base.metadata.create_all(bind=engine)
+        # Start from the pre-index schema.
+        for table in models.Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.drop(bind=engine, checkfirst=True)
+        populate(engine, args.rows, args.students, rng)
+
+        queries = benchmark_queries(args.students, args.rows, rng)
+        before = run_queries(engine, session_factory, queries, args.repeat)
+
+        started = time.perf_counter()
+        created = ensure_indexes(engine)
+        print(f"ensure_indexes created {len(created)} indexes in {time.perf_counter() - started:.1f} s.")
+        if engine.dialect.name == "sqlite":
+            with engine.begin() as conn:
+                conn.exec_driver_sql("ANALYZE")
+        after = run_queries(engine, session_factory, queries, args.repeat)
+
+        for name, _ in queries:
+            before_ms, before_plan = before[name]
+            after_ms, after_plan = after[name]
+            print(f"\n{name}: {before_ms:.2f} ms -> {after_ms:.2f} ms ({before_ms / max(after_ms, 1e-6):.0f}x)")
+            print(f"  before: {before_plan}")
+            print(f"  after:  {after_plan}")
+    finally:
+        engine.dispose()
+        if scratch:
+            os.remove(scratch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Microbenchmark for the mock LLM keyword matching.
+
+Compares the previous nested loop over every config and keyword with the
+compiled KeywordMatcher for a growing number of simulation rules.
+
+    python -m backend.scripts.bench_keyword_matcher [--rules 10 100 1000 5000] [--texts 2000]
+"""
+import argparse
+import random
+import time
+
+from backend.keyword_matcher import KeywordMatcher
+
+SYLLABLES = "가나다라마바사아자차카타파하수학방정식함수그래프미분적분정리도형확률통계"
+
+
+def make_configs(rule_count: int, rng: random.Random) -> list:
+    configs = []
+    for i in range(rule_count):
+        keywords = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 6))) + str(i) for _ in range(rng.randint(1, 4))]
+        configs.append({"keywords": keywords, "response": {"rule": i}})
+    return configs
+
+
+def make_texts(configs: list, text_count: int, rng: random.Random) -> list:
+    texts = []
+    for _ in range(text_count):
+        words = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))) for _ in range(40)]
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words)), rng.choice(rng.choice(configs)["keywords"]))
+        texts.append(" ".join(words))
+    return texts
+
+
+def nested_loop(configs: list, text: str):
+    for index, config in enumerate(configs):
+        for keyword in config["keywords"]:
+            if keyword in text:
+                return index
+    return None
+
+
+def bench(label: str, fn, texts: list) -> float:
+    started = time.perf_counter()
+    for text in texts:
+        fn(text)
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<16} {elapsed * 1e6 / len(texts):10.1f} us/text")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", type=int, nargs="+", default=[4, 100, 1000, 5000])
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for rule_count in args.rules:
+        configs = make_configs(rule_count, rng)
+        texts = make_texts(configs, args.texts, rng)
+
+        started = time.perf_counter()
+        matcher = KeywordMatcher.from_configs(configs)
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        mismatches = sum(1 for text in texts if matcher.find(text) != nested_loop(configs, text))
+        print(f"{rule_count} rules, {len(matcher)} keywords (compiled in {compile_ms:.1f} ms, {mismatches} mismatches)")
+        loop_time = bench("nested loop", lambda text: nested_loop(configs, text), texts)
+        matcher_time = bench("KeywordMatcher", matcher.find, texts)
+        print(f"  speedup          {loop_time / matcher_time:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
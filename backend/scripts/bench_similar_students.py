@@ -0,0 +1,56 @@
+"""
+Times the similarity index behind GET /students/{id}/similar on random
+integer vectors: building it, k-nearest queries and incremental updates.
+The last line compares one query with a brute-force Python scan.
+
+    python -m backend.scripts.bench_similar_students [--students 100000] [--k 10] [--queries 200]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from backend.crud import VECTOR_AXES
+from backend.similarity_index import StudentVectorIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.integers(0, 101, size=(args.students, len(VECTOR_AXES)))
+    student_ids = [f"std_{i:06d}" for i in range(args.students)]
+
+    started = time.perf_counter()
+    index = StudentVectorIndex(capacity=args.students)
+    for student_id, axes in zip(student_ids, vectors):
+        index.upsert(student_id, axes)
+    print(f"build:  {args.students} students in {time.perf_counter() - started:.2f} s")
+
+    picks = random.Random(0).sample(student_ids, args.queries)
+    started = time.perf_counter()
+    for student_id in picks:
+        index.nearest(student_id, args.k)
+    print(f"query:  {(time.perf_counter() - started) / args.queries * 1000:.2f} ms per k={args.k} query")
+
+    started = time.perf_counter()
+    for student_id in picks:
+        index.upsert(student_id, rng.integers(0, 101, size=len(VECTOR_AXES)))
+    print(f"update: {(time.perf_counter() - started) / args.queries * 1e6:.1f} us per vector")
+
+    target = vectors[0].tolist()
+    started = time.perf_counter()
+    sorted(
+        (sum((a - b) ** 2 for a, b in zip(target, row)), student_id)
+        for student_id, row in zip(student_ids[1:], vectors[1:].tolist())
+    )[:args.k]
+    print(f"python scan: {(time.perf_counter() - started) * 1000:.0f} ms per query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Counts commits and SQL statements per submission on the synchronous write
+path and measures SQLite write throughput.
+
+Uses the mock LLM and a no-op speech synthesizer, so it only measures the
+database work of crud.process_submission.
+
+    python -m backend.scripts.bench_submission_writes [--submissions 200] [--students 20]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+os.environ.setdefault("USE_MOCK_LLM", "true")
+
+from sqlalchemy import event
+
+from backend import crud, models, schemas
+from backend.audio_store import AudioStore
+from backend.database import create_db_engine, create_session_factory
+
+PROBLEMS = [
+    "x^2 - 4x + 3 = 0의 해를 구하시오. (이차방정식 문제)",
+    "직각삼각형에서 피타고라스의 정리를 이용하시오.",
+    "f(x) = x^2의 미분과 적분을 구하시오.",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--submissions", type=int, default=200)
+    parser.add_argument("--students", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_submission_writes_")
+    engine = create_db_engine(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    session_factory = create_session_factory(engine)
+    models.Base.metadata.create_all(bind=engine)
+
+    counts = {"statements": 0, "commits": 0}
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        counts["statements"] += 1
+
+    def count_commit(conn):
+        counts["commits"] += 1
+
+    db = session_factory()
+    try:
+        db.add(models.ConceptsLibrary(concept_id="C-HCOM-004", concept_name="이차방정식"))
+        for i in range(args.students):
+            db.add(models.Student(student_id=f"std_{i:04d}", student_name=f"Student {i}"))
+        db.commit()
+
+        event.listen(engine, "before_cursor_execute", count_statement)
+        event.listen(engine, "commit", count_commit)
+        with patch.object(crud.fish_speech_adapter, "synthesize_speech", return_value=b"RIFF"), \
+                patch.object(crud, "audio_store", AudioStore(root=os.path.join(workdir, "audio"))):
+            started = time.perf_counter()
+            for i in range(args.submissions):
+                db_submission, _ = crud.process_submission(db, f"std_{i % args.students:04d}", PROBLEMS[i % len(PROBLEMS)])
+                # What the router reads to build its response
+                schemas.SubmissionResult(
+                    submission_id=db_submission.submission_id,
+                    student_id=db_submission.student_id,
+                    problem_text=db_submission.problem_text,
+                    status=db_submission.status,
+                    logical_path_text=db_submission.logical_path_text,
+                    concept_id=db_submission.concept_id,
+                    manim_content_url=db_submission.manim_data_path,
+                    audio_explanation_url=db_submission.audio_explanation_url,
+                    submitted_at=db_submission.submitted_at,
+                )
+                db.expunge_all()
+            elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+        event.remove(engine, "commit", count_commit)
+        db.close()
+        engine.dispose()
+        shutil.rmtree(workdir)
+
+    n = args.submissions
+    print(f"{n} submissions in {elapsed:.2f} s ({n / elapsed:.0f} submissions/s)")
+    print(f"commits per submission:    {counts['commits'] / n:.2f}")
+    print(f"statements per submission: {counts['statements'] / n:.2f}")
+
+
+if __name__ == "__main__":
+    main()
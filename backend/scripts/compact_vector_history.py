@@ -0,0 +1,36 @@
+"""
+Rolls old student vector history into daily and weekly rollups (see
+crud.compact_vector_history). Meant to run nightly; safe to re-run.
+
+    python -m backend.scripts.compact_vector_history [--student-id std_001] [--raw-days 90] [--daily-days 365]
+"""
+import argparse
+import time
+
+from backend import crud
+from backend.main import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--student-id", default=None, help="Only compact this student's history")
+    parser.add_argument("--raw-days", type=int, default=crud.VECTOR_HISTORY_RAW_DAYS)
+    parser.add_argument("--daily-days", type=int, default=crud.VECTOR_HISTORY_DAILY_DAYS)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        totals = crud.compact_vector_history(
+            db, student_id=args.student_id, raw_days=args.raw_days, daily_days=args.daily_days
+        )
+        print(
+            f"Compacted {totals['vectors']} vector(s) of {totals['students']} student(s) into {totals['rollups']} rollup(s), "
+            f"promoted {totals['promoted']} daily rollup(s) in {time.perf_counter() - started:.2f} s."
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
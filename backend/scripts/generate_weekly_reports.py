@@ -103,6 +103,7 @@ def generate_weekly_reports(db: Session):
                     ai_summary=summary,
                     vector_start_id=weekly_start_vector.vector_id,
                     vector_end_id=latest_vector.vector_id,
+                    created_at=datetime.now(timezone.utc),  # keyset pages of reports need sub-second timestamps
                 )
                 db.add(report)
                 db.commit()
@@ -1,20 +1,16 @@
 import os
 import sys
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 
 # Add the backend directory to the system path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from models import Base, Curriculum, ConceptsLibrary, ConceptRelation
-
-# Database connection string
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./atlas.db")
+from database import create_db_engine, create_session_factory
 
 def populate_curriculum_data():
-    engine = create_engine(DATABASE_URL)
+    engine = create_db_engine()
     Base.metadata.create_all(engine)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    SessionLocal = create_session_factory(engine)
     db = SessionLocal()
 
     try:
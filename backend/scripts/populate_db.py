@@ -1,17 +1,16 @@
 import sys
 import os
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
 
 # Add the parent directory to the path to allow imports from 'backend'
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from backend import models
+from backend.database import DATABASE_URL, create_db_engine, create_session_factory
 
 # Database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///./atlas.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SQLALCHEMY_DATABASE_URL = DATABASE_URL
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
+SessionLocal = create_session_factory(engine)
 
 # Create tables
 models.Base.metadata.create_all(bind=engine)
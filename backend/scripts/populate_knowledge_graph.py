@@ -1,5 +1,4 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from backend.database import DATABASE_URL, create_db_engine, create_session_factory
 from backend.models import Base, Curriculum, ConceptsLibrary, ConceptRelation
 import os
 import sys
@@ -8,11 +7,9 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///./atlas.db"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SQLALCHEMY_DATABASE_URL = DATABASE_URL
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
+SessionLocal = create_session_factory(engine)
 
 def get_db():
     db = SessionLocal()
@@ -0,0 +1,31 @@
+"""
+Recomputes the student_current_vector projection from student_vector_history.
+
+Run it once after upgrading an existing database, or whenever history rows
+were written outside crud.create_assessment_and_vector.
+
+    python -m backend.scripts.rebuild_current_vectors [--student-id std_001]
+"""
+import argparse
+import time
+
+from backend import crud
+from backend.main import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--student-id", default=None, help="Only rebuild this student's row")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        count = crud.rebuild_student_current_vectors(db, student_id=args.student_id)
+        print(f"Rebuilt {count} current vector row(s) in {time.perf_counter() - started:.2f} s.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
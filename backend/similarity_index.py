@@ -0,0 +1,167 @@
+"""
+In-memory nearest-neighbour index over students' latest 11-axis vectors.
+
+The vectors live in one contiguous float32 matrix with a row per student.
+A k-nearest query computes the squared Euclidean distances to every row in
+one vectorized pass and selects the k smallest with argpartition, so it is
+O(N) per query rather than the O(N^2) of comparing all pairs, and takes a
+few milliseconds for 100k students. With only 11 integer dimensions, a
+KD-tree or grid would prune little and make updates harder; a row write is
+O(1) here.
+
+The index is loaded from the student_current_vector projection on first use.
+Vectors committed afterwards (crud.create_assessment_and_vector, bulk
+assessments, submissions) mark their students pending through
+vector_stats.on_vectors_committed, and the next query re-reads just those
+rows. SIMILARITY_INDEX_MAX_AGE_SECONDS bounds how long writes from other
+processes can go unnoticed. As with vector_stats, the rows are read from the
+primary, never from a read replica that may not have replayed the commit yet.
+"""
+import logging
+import os
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import async_crud, vector_stats
+from .crud import VECTOR_AXES
+
+logger = logging.getLogger(__name__)
+
+SIMILAR_STUDENTS_MAX_K = int(os.getenv("SIMILAR_STUDENTS_MAX_K", "50"))
+SIMILARITY_INDEX_MAX_AGE_SECONDS = float(os.getenv("SIMILARITY_INDEX_MAX_AGE_SECONDS", "600"))
+
+_RELOAD = object()
+
+
+class StudentVectorIndex:
+    """Row-per-student matrix supporting upserts, removals and k-nearest queries."""
+
+    def __init__(self, capacity: int = 1024):
+        self.values = np.zeros((capacity, len(VECTOR_AXES)), dtype=np.float32)
+        self.student_ids: List[str] = []
+        self.rows = {}
+
+    def __len__(self):
+        return len(self.student_ids)
+
+    def __contains__(self, student_id: str):
+        return student_id in self.rows
+
+    def upsert(self, student_id: str, axes: Sequence[float]):
+        row = self.rows.get(student_id)
+        if row is None:
+            row = len(self.student_ids)
+            if row == len(self.values):
+                self.values = np.concatenate([self.values, np.zeros_like(self.values)])
+            self.student_ids.append(student_id)
+            self.rows[student_id] = row
+        self.values[row] = axes
+
+    def remove(self, student_id: str):
+        row = self.rows.pop(student_id, None)
+        if row is None:
+            return
+        # Move the last row into the gap to keep the matrix dense.
+        last = len(self.student_ids) - 1
+        if row != last:
+            moved = self.student_ids[last]
+            self.values[row] = self.values[last]
+            self.student_ids[row] = moved
+            self.rows[moved] = row
+        self.student_ids.pop()
+
+    def nearest(self, student_id: str, k: int) -> Optional[List[Tuple[str, float]]]:
+        """The k closest other students with their Euclidean distances, nearest first; None if not indexed."""
+        row = self.rows.get(student_id)
+        if row is None:
+            return None
+        count = len(self.student_ids)
+        values = self.values[:count]
+        diff = values - values[row]
+        distances = np.einsum("ij,ij->i", diff, diff)
+        distances[row] = np.inf
+        k = min(k, count - 1)
+        if k <= 0:
+            return []
+        candidates = np.argpartition(distances, k - 1)[:k]
+        ordered = candidates[np.argsort(distances[candidates], kind="stable")]
+        return [(self.student_ids[i], float(np.sqrt(distances[i]))) for i in ordered]
+
+
+class SimilarityIndex:
+    """The process-wide StudentVectorIndex, its loading and its incremental refresh."""
+
+    def __init__(self, max_age: float = SIMILARITY_INDEX_MAX_AGE_SECONDS):
+        self.max_age = max_age
+        self._index: Optional[StudentVectorIndex] = None
+        self._loaded_at = 0.0
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def mark_pending(self, student_ids: Optional[frozenset]):
+        """Vectors of `student_ids` (None: anyone) were committed."""
+        with self._lock:
+            if student_ids is None:
+                self._pending = _RELOAD
+            elif self._pending is not _RELOAD:
+                self._pending.update(student_ids)
+
+    def _take_pending(self):
+        with self._lock:
+            if self._index is None or self._pending is _RELOAD or time.monotonic() - self._loaded_at >= self.max_age:
+                # Writes committed while the full load runs stay pending and are re-read next time.
+                self._pending = set()
+                return _RELOAD
+            pending, self._pending = self._pending, set()
+            return pending
+
+    def _restore_pending(self, pending):
+        """Puts back what `_take_pending` handed out when reading it failed."""
+        with self._lock:
+            if pending is _RELOAD:
+                self._pending = _RELOAD
+            elif self._pending is not _RELOAD:
+                self._pending.update(pending)
+
+    async def refresh(self, db: AsyncSession):
+        """Loads or patches the index; `db` must be a primary session."""
+        pending = self._take_pending()
+        try:
+            await self._apply(db, pending)
+        except BaseException:
+            # Also on cancellation: the next request must still re-read these students.
+            self._restore_pending(pending)
+            raise
+
+    async def _apply(self, db: AsyncSession, pending):
+        if pending is _RELOAD:
+            started = time.perf_counter()
+            rows = await async_crud.get_current_vectors(db)
+            index = StudentVectorIndex(capacity=max(1024, len(rows) * 2))
+            for student_id, *axes in rows:
+                index.upsert(student_id, axes)
+            with self._lock:
+                self._index, self._loaded_at = index, time.monotonic()
+            logger.info(f"Loaded similarity index with {len(index)} students in {time.perf_counter() - started:.2f} s.")
+        elif pending:
+            rows = await async_crud.get_current_vectors(db, sorted(pending))
+            found = {student_id: axes for student_id, *axes in rows}
+            with self._lock:
+                for student_id in pending:
+                    if student_id in found:
+                        self._index.upsert(student_id, found[student_id])
+                    else:
+                        self._index.remove(student_id)
+
+    async def nearest(self, db: AsyncSession, student_id: str, k: int) -> Optional[List[Tuple[str, float]]]:
+        await self.refresh(db)
+        with self._lock:
+            return self._index.nearest(student_id, k)
+
+
+index = SimilarityIndex()
+vector_stats.on_vectors_committed(index.mark_pending)
@@ -0,0 +1,126 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from . import crud
+
+logger = logging.getLogger(__name__)
+
+# Number of submissions analysed concurrently, and how many more may wait in the queue.
+SUBMISSION_WORKER_COUNT = int(os.getenv("SUBMISSION_WORKER_COUNT", "4"))
+SUBMISSION_QUEUE_LIMIT = int(os.getenv("SUBMISSION_QUEUE_LIMIT", "100"))
+SUBMISSION_QUEUE_RETRY_AFTER = int(os.getenv("SUBMISSION_QUEUE_RETRY_AFTER", "5"))
+
+INTERRUPTED_DETAIL = "Interrupted by a restart and could not be queued again. Please resubmit."
+
+
+class SubmissionWorkerPool:
+    """
+    Bounded in-process worker pool that completes PENDING submissions in the
+    background, so the HTTP request does not wait for the LLM and TTS calls.
+    """
+
+    def __init__(self, max_workers: int = SUBMISSION_WORKER_COUNT, max_queue: int = SUBMISSION_QUEUE_LIMIT):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._futures = set()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="submission-worker")
+            return self._executor
+
+    def submit(self, session_factory: Callable[[], Session], submission_id: str):
+        """
+        Queues a PENDING submission for processing.
+
+        Raises:
+            HTTPException: 503 if the pool and its queue are full.
+        """
+        if not self._slots.acquire(blocking=False):
+            logger.warning(f"Submission queue is full. Rejecting submission {submission_id}.")
+            raise HTTPException(
+                status_code=503,
+                detail="Submission queue is full. Please retry later.",
+                headers={"Retry-After": str(SUBMISSION_QUEUE_RETRY_AFTER)},
+            )
+        try:
+            future = self._get_executor().submit(self._run, session_factory, submission_id)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._discard_future)
+        logger.info(f"Queued submission {submission_id} for background processing.")
+
+    def _discard_future(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _run(self, session_factory: Callable[[], Session], submission_id: str):
+        db = session_factory()
+        try:
+            crud.complete_pending_submission(db, submission_id)
+            logger.info(f"Background processing finished for submission {submission_id}.")
+        except HTTPException as e:
+            self._fail(db, submission_id, str(e.detail))
+        except Exception as e:
+            logger.error(f"Unexpected error while processing submission {submission_id}: {e}", exc_info=True)
+            self._fail(db, submission_id, f"Unexpected error: {e}")
+        finally:
+            db.close()
+            self._slots.release()
+
+    def _fail(self, db: Session, submission_id: str, detail: str):
+        logger.error(f"Background processing failed for submission {submission_id}: {detail}")
+        db.rollback()
+        # Stored on the row, so status polling still reports it after a restart.
+        crud.mark_submission_failed(db, submission_id, detail)
+
+    def recover(self, session_factory: Callable[[], Session]) -> dict:
+        """
+        Queues again the submissions a previous process left PENDING, or
+        PROCESSING past their lease (see crud.reset_interrupted_submissions);
+        those that no longer fit in the queue are marked FAILED. Run once at
+        startup, before new submissions arrive.
+        """
+        with session_factory() as db:
+            submission_ids = crud.reset_interrupted_submissions(db)
+        counts = {"requeued": 0, "failed": 0}
+        for submission_id in submission_ids:
+            try:
+                self.submit(session_factory, submission_id)
+                counts["requeued"] += 1
+            except HTTPException:
+                with session_factory() as db:
+                    crud.mark_submission_failed(db, submission_id, INTERRUPTED_DETAIL)
+                counts["failed"] += 1
+        if submission_ids:
+            logger.info(f"Recovered interrupted submissions: {counts}.")
+        return counts
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until every queued submission has been processed. Returns False on timeout."""
+        with self._lock:
+            pending = list(self._futures)
+        _, not_done = wait(pending, timeout=timeout)
+        return not not_done
+
+    def shutdown(self, wait_for_jobs: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait_for_jobs)
+
+
+pool = SubmissionWorkerPool()
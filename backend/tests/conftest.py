@@ -1,6 +1,8 @@
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
+from backend import crud
+from backend.analysis_cache import AnalysisCache
 from backend.models import Base
 
 # Setup the Test Database
@@ -18,3 +20,12 @@ def db_session():
     finally:
         db.close()
         Base.metadata.drop_all(bind=test_engine)
+
+
+@pytest.fixture(autouse=True)
+def isolated_analysis_cache(tmp_path, monkeypatch):
+    """Every test gets an empty analysis cache of its own instead of the shared file."""
+    cache = AnalysisCache(path=str(tmp_path / "analysis_cache.db"))
+    monkeypatch.setattr(crud, "analysis_cache", cache)
+    yield cache
+    cache.close()
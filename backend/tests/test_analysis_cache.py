@@ -0,0 +1,106 @@
+import json
+import time
+from unittest.mock import patch, Mock
+
+import pytest
+from sqlalchemy.orm import Session
+
+from backend import crud, models
+from backend.analysis_cache import AnalysisCache, make_cache_key, normalize_problem_text
+
+SAMPLE_ANALYSIS = {
+    "concept_id": "C-HCOM-004",
+    "logical_path_text": "Apply the quadratic formula.",
+    "manim_data_path": "https://youtube.com/watch?v=quadratic",
+    "vector_data": {
+        "axis1_geo": 40, "axis1_alg": 85, "axis1_ana": 60,
+        "axis2_opt": 70, "axis2_piv": 60, "axis2_dia": 75,
+        "axis3_con": 80, "axis3_pro": 85, "axis3_ret": 70,
+        "axis4_acc": 90, "axis4_gri": 80,
+    },
+}
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = AnalysisCache(path=str(tmp_path / "analysis_cache.db"), memory_size=2, ttl_seconds=60, max_rows=3, enabled=True)
+    yield cache
+    cache.close()
+
+def test_cache_key_normalizes_problem_text():
+    assert normalize_problem_text("  x^2 - 4 = 0 \n 풀이 ") == "x^2 - 4 = 0 풀이"
+    assert make_cache_key("x^2 - 4 = 0", "llama2", "v1") == make_cache_key(" x^2  - 4 = 0\n", "llama2", "v1")
+    assert make_cache_key("x^2 - 4 = 0", "llama2", "v1") != make_cache_key("x^2 - 4 = 0", "llama3", "v1")
+    assert make_cache_key("x^2 - 4 = 0", "llama2", "v1") != make_cache_key("x^2 - 4 = 0", "llama2", "v2")
+
+def test_memory_and_disk_tiers(cache, tmp_path):
+    assert cache.get("k1") is None
+    cache.put("k1", SAMPLE_ANALYSIS)
+
+    hit = cache.get("k1")
+    assert hit == SAMPLE_ANALYSIS
+    # Callers get their own copy and cannot corrupt the cached entry.
+    hit["vector_data"]["axis1_geo"] = 0
+    assert cache.get("k1")["vector_data"]["axis1_geo"] == 40
+
+    # A fresh instance only has the persistent tier.
+    reopened = AnalysisCache(path=str(tmp_path / "analysis_cache.db"), memory_size=2, ttl_seconds=60, max_rows=3, enabled=True)
+    assert reopened.get("k1") == SAMPLE_ANALYSIS
+    assert reopened.get("k1") == SAMPLE_ANALYSIS
+    stats = reopened.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 1
+    reopened.close()
+
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["memory_hits"] == 2
+    assert stats["stores"] == 1
+
+def test_size_based_eviction(cache):
+    for i in range(5):
+        cache.put(f"k{i}", SAMPLE_ANALYSIS)
+    stats = cache.stats()
+    assert stats["disk_entries"] == 3
+    assert stats["memory_entries"] == 2
+    assert stats["evictions"] == 2
+    assert cache.get("k0") is None
+    assert cache.get("k4") == SAMPLE_ANALYSIS
+
+def test_ttl_expiry(cache):
+    cache.put("k1", SAMPLE_ANALYSIS)
+    with patch("backend.analysis_cache.time.time", return_value=time.time() + 120):
+        assert cache.get("k1") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["disk_entries"] == 0
+
+def test_disabled_cache(tmp_path):
+    cache = AnalysisCache(path=str(tmp_path / "disabled.db"), enabled=False)
+    cache.put("k1", SAMPLE_ANALYSIS)
+    assert cache.get("k1") is None
+    assert not (tmp_path / "disabled.db").exists()
+
+def test_llm_analysis_cache_hit_skips_ollama(db_session: Session, cache, monkeypatch):
+    db_session.add(models.ConceptsLibrary(concept_id="C-HCOM-004", concept_name="이차방정식", manim_data_path="https://youtube.com/watch?v=quadratic"))
+    db_session.commit()
+    monkeypatch.setenv("USE_MOCK_LLM", "false")
+    monkeypatch.setattr(crud, "analysis_cache", cache)
+
+    ollama_output = {key: value for key, value in SAMPLE_ANALYSIS.items() if key != "manim_data_path"}
+    mock_response = Mock()
+    mock_response.json.return_value = {"response": json.dumps(ollama_output)}
+    mock_response.raise_for_status.return_value = None
+
+    with patch("backend.http_client.OutboundClient.post", return_value=mock_response) as mock_post:
+        first = crud.call_external_llm_for_analysis(db_session, "x^2 - 4x + 3 = 0의 해를 구하시오.")
+        second = crud.call_external_llm_for_analysis(db_session, "x^2 - 4x + 3 = 0의  해를 구하시오. ")
+
+    assert mock_post.call_count == 1
+    assert first == second == SAMPLE_ANALYSIS
+    assert cache.stats()["memory_hits"] == 1
+
+    # A change to the concept catalog must not serve the stale analysis.
+    db_session.add(models.ConceptsLibrary(concept_id="C-NEW", concept_name="새 개념"))
+    db_session.commit()
+    with patch("backend.http_client.OutboundClient.post", return_value=mock_response) as mock_post:
+        crud.call_external_llm_for_analysis(db_session, "x^2 - 4x + 3 = 0의 해를 구하시오.")
+    assert mock_post.call_count == 1
@@ -1,8 +1,9 @@
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from backend.main import app, get_db
-from backend.models import Base, StudentVectorHistory
+from backend import crud
+from backend.models import Base, Student, StudentCurrentVector, StudentVectorHistory
 
 # Setup the Test Database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -59,3 +60,64 @@ def test_create_assessment():
     assert history_entry.student_id == "std_testuser"
     assert history_entry.axis4_gri == 100
     db.close()
+
+
+def _vector(value):
+    return {axis: value for axis in crud.VECTOR_AXES}
+
+
+def test_create_assessments_bulk():
+    db = TestingSessionLocal()
+    for student_id in ("std_bulk_1", "std_bulk_2"):
+        if db.get(Student, student_id) is None:
+            db.add(Student(student_id=student_id, student_name=student_id))
+    db.commit()
+    db.close()
+
+    items = [
+        {"student_id": "std_bulk_1", "assessment_type": "MOCK_EXAM", "vector_data": _vector(40)},
+        {"student_id": "std_bulk_2", "assessment_type": "MOCK_EXAM", "vector_data": _vector(50)},
+        {"student_id": "std_bulk_missing", "assessment_type": "MOCK_EXAM", "vector_data": _vector(60)},
+        {"student_id": "std_bulk_2", "assessment_type": "MOCK_EXAM", "vector_data": {**_vector(70), "axis2_piv": 101}},
+        {"student_id": "std_bulk_1", "assessment_type": "MOCK_EXAM", "vector_data": _vector(80)},
+        {"student_id": "std_bulk_2", "vector_data": _vector(90)},
+        "not an assessment",
+    ]
+    inserts = []
+
+    def count_inserts(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT"):
+            inserts.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_inserts)
+    try:
+        response = client.post("/assessments/bulk", json=items)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_inserts)
+
+    assert response.status_code == 201
+    data = response.json()
+    assert (data["succeeded"], data["failed"]) == (3, 4)
+    assert [item["error"] is None for item in data["items"]] == [True, True, False, False, True, False, False]
+    assert "not found" in data["items"][2]["error"]
+    assert "axis2_piv" in data["items"][3]["error"]
+    # Items that are not valid assessments fail alone, with the validation error.
+    assert data["items"][5]["student_id"] == "std_bulk_2" and "assessment_type" in data["items"][5]["error"]
+    assert data["items"][6]["student_id"] is None and data["items"][6]["vector_id"] is None
+    # Assessments, vectors and the new current-vector rows: one multi-row INSERT each
+    assert len(inserts) <= 3
+
+    db = TestingSessionLocal()
+    try:
+        history = crud.get_vector_history_by_student(db, "std_bulk_1")
+        assert [row.vector_id for row in history[-2:]] == [data["items"][0]["vector_id"], data["items"][4]["vector_id"]]
+        current = db.get(StudentCurrentVector, "std_bulk_1")
+        assert current.vector_id == data["items"][4]["vector_id"]
+        assert current.axis1_geo == 80
+        assert db.get(StudentCurrentVector, "std_bulk_2").vector_id == data["items"][1]["vector_id"]
+    finally:
+        db.close()
+
+
+def test_create_assessments_bulk_rejects_empty_request():
+    assert client.post("/assessments/bulk", json=[]).status_code == 400
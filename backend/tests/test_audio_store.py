@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import crud
+from backend.audio_store import AudioStore, make_audio_key
+from backend.main import app
+
+client = TestClient(app)
+
+AUDIO = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = AudioStore(root=str(tmp_path / "audio"), max_bytes=2500)
+    monkeypatch.setattr(crud, "audio_store", store)
+    return store
+
+
+def test_identical_text_is_synthesized_once(store):
+    def synthesize(text, speaker_id, output_format):
+        time.sleep(0.1)
+        return AUDIO
+
+    synthesize = Mock(side_effect=synthesize)
+    keys = []
+    threads = [
+        threading.Thread(target=lambda: keys.append(store.get_or_synthesize("같은 설명", synthesize)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert synthesize.call_count == 1
+    assert set(keys) == {make_audio_key("같은 설명", "default", "wav")}
+    assert store.get_or_synthesize("같은 설명", synthesize) == keys[0]
+    assert synthesize.call_count == 1
+    assert store.stats()["misses"] == 1
+    assert store.stats()["hits"] == 4
+
+
+def test_synthesis_errors_are_not_stored(store):
+    with pytest.raises(RuntimeError):
+        store.get_or_synthesize("text", Mock(side_effect=RuntimeError("fish-speech down")))
+    assert store.stats()["files"] == 0
+    assert store.get_or_synthesize("text", Mock(return_value=AUDIO))
+
+
+def test_waiters_share_the_lock_after_a_failed_synthesis(store):
+    key = make_audio_key("text", "default", "wav")
+    fail, release, second_started = threading.Event(), threading.Event(), threading.Event()
+    calls = []
+
+    def synthesize(text, speaker_id, output_format):
+        calls.append(text)
+        if len(calls) == 1:
+            fail.wait(5)
+            raise RuntimeError("fish-speech down")
+        second_started.set()
+        release.wait(5)
+        return AUDIO
+
+    def wait_for_users(count):
+        deadline = time.monotonic() + 5
+        while store._key_locks.get(key, [None, 0])[1] != count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def request():
+        try:
+            store.get_or_synthesize("text", synthesize)
+        except RuntimeError:
+            pass
+
+    first, second, third = (threading.Thread(target=request) for _ in range(3))
+    first.start()
+    wait_for_users(1)
+    second.start()
+    wait_for_users(2)
+    fail.set()
+    assert second_started.wait(5)
+    # Arrives while the second request synthesizes under the lock the failed one released.
+    third.start()
+    wait_for_users(2)
+    release.set()
+    for thread in (first, second, third):
+        thread.join(5)
+
+    assert len(calls) == 2
+    assert store._key_locks == {}
+
+
+def test_lru_eviction_by_size(store):
+    first = store.get_or_synthesize("one", Mock(return_value=AUDIO))
+    second = store.get_or_synthesize("two", Mock(return_value=AUDIO))
+    # Touch the first file so the second becomes least recently used.
+    assert store.get_path(first)
+    third = store.get_or_synthesize("three", Mock(return_value=AUDIO))
+
+    assert store.get_path(second) is None
+    assert store.get_path(first) and store.get_path(third)
+    stats = store.stats()
+    assert stats["files"] == 2
+    assert stats["bytes"] == 2 * len(AUDIO)
+    assert stats["evictions"] == 1
+    assert len(os.listdir(store.root)) == 2
+
+
+def test_index_is_rebuilt_from_disk(store):
+    key = store.get_or_synthesize("persisted", Mock(return_value=AUDIO))
+    reopened = AudioStore(root=store.root, max_bytes=store.max_bytes)
+    assert reopened.get_path(key).endswith(f"{key}.wav")
+    assert reopened.stats()["bytes"] == len(AUDIO)
+
+
+def test_get_audio_supports_range_requests(store):
+    key = store.get_or_synthesize("served", Mock(return_value=AUDIO))
+
+    response = client.get(f"/audio/{key}")
+    assert response.status_code == 200
+    assert response.content == AUDIO
+    assert response.headers["content-type"] == "audio/wav"
+    assert response.headers["accept-ranges"] == "bytes"
+
+    response = client.get(f"/audio/{key}", headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == AUDIO[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(AUDIO)}"
+
+    response = client.get(f"/audio/{key}", headers={"Range": f"bytes={len(AUDIO) + 10}-"})
+    assert response.status_code == 416
+
+
+def test_get_audio_not_found(store):
+    response = client.get("/audio/" + "0" * 64)
+    assert response.status_code == 404
+    response = client.get("/audio/..%2Fatlas.db")
+    assert response.status_code == 404
+
+
+def test_submission_audio_url_points_to_store(store):
+    with patch.object(crud.fish_speech_adapter, "synthesize_speech", return_value=AUDIO) as synthesize:
+        first = crud._synthesize_explanation_audio("sub_1", "Apply the quadratic formula.")
+        second = crud._synthesize_explanation_audio("sub_2", "Apply the quadratic formula.")
+
+    assert first == second == f"/audio/{make_audio_key('Apply the quadratic formula.', 'default', 'wav')}"
+    assert synthesize.call_count == 1
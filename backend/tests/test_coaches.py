@@ -1,9 +1,11 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import sessionmaker, Session
-from backend.main import app, get_db
+from backend.main import app, get_async_db, get_async_read_db, get_db
+from backend.database import create_async_db_engine, create_async_session_factory
 from backend import models, crud, schemas
 from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
 from datetime import datetime, timedelta, timezone
 
 # Setup for the test database
@@ -31,6 +33,17 @@ def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
+# The read endpoints use the async session; each TestClient request runs on its own event loop, hence NullPool.
+async_engine = create_async_db_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+AsyncTestingSessionLocal = create_async_session_factory(async_engine)
+
+async def override_get_async_db():
+    async with AsyncTestingSessionLocal() as db:
+        yield db
+
+app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_async_read_db] = override_get_async_db
+
 client = TestClient(app)
 
 def setup_test_data(db: Session):
@@ -220,3 +233,115 @@ def test_read_coach_submissions(db_session: Session):
     assert len(submissions_data) == 1
     assert submissions_data[0]["submission_id"] == data_ids["submission2_id"]
     assert submissions_data[0]["status"] == "PENDING"
+
+def test_read_coach_submissions_constant_queries(db_session: Session):
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    data_ids = setup_test_data(db_session)
+    coach = db_session.get(models.Coach, data_ids["coach1_id"])
+    now = datetime.now(timezone.utc)
+    for i in range(20):
+        student = models.Student(student_id=f"std_feed_{i}", student_name=f"Feed Student {i}")
+        coach.students.append(student)
+        for j in range(5):
+            db_session.add(models.Submission(
+                submission_id=f"sub_feed_{i}_{j}", student_id=student.student_id, problem_text="Problem",
+                status="COMPLETE", concept_id=f"C_COACH_{1 + (i + j) % 2}",
+                manim_visualization_json='{"scene": "quadratic"}',
+                submitted_at=now - timedelta(days=3, hours=i * 5 + j),
+            ))
+    db_session.commit()
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", count_statement)
+    try:
+        response = client.get(f"/coaches/{data_ids['coach1_id']}/submissions", params={"status": "COMPLETE", "limit": 500})
+    finally:
+        event.remove(Engine, "before_cursor_execute", count_statement)
+
+    assert response.status_code == 200
+    submissions_data = response.json()
+    assert len(submissions_data) == 101  # 100 feed submissions + sub_coach_1
+    assert len(statements) == 1
+    by_id = {s["submission_id"]: s for s in submissions_data}
+    assert by_id["sub_feed_0_1"]["manim_content_url"] == "http://manim.com/coach2"
+    assert by_id["sub_feed_0_1"]["manim_visualization_json"] == {"scene": "quadratic"}
+    submitted = [s["submitted_at"] for s in submissions_data]
+    assert submitted == sorted(submitted, reverse=True)
+
+    # Date window: submitted_from inclusive, submitted_to exclusive
+    response = client.get(f"/coaches/{data_ids['coach1_id']}/submissions", params={
+        "submitted_from": (now - timedelta(days=3, hours=9, minutes=30)).isoformat(),
+        "submitted_to": (now - timedelta(days=3)).isoformat(),
+    })
+    assert response.status_code == 200
+    assert {s["submission_id"] for s in response.json()} == {
+        "sub_feed_0_1", "sub_feed_0_2", "sub_feed_0_3", "sub_feed_0_4", "sub_feed_1_0", "sub_feed_1_1",
+        "sub_feed_1_2", "sub_feed_1_3", "sub_feed_1_4",
+    }
+
+def _add_vector(db: Session, student_id: str, values: dict):
+    assessment = schemas.AssessmentCreate(
+        student_id=student_id, assessment_type="COACH_MANUAL",
+        vector_data={axis: values.get(axis, 50) for axis in crud.VECTOR_AXES},
+    )
+    crud.create_assessment_and_vector(db, assessment)
+
+def test_read_coach_cohort_stats_refreshes_incrementally(db_session: Session):
+    from backend import cohort_stats
+
+    setup_test_data(db_session)
+    db_session.query(models.StudentCurrentVector).delete()
+    db_session.commit()
+    _add_vector(db_session, "std_coach_1", {"axis1_geo": 20, "axis1_alg": 30})
+    _add_vector(db_session, "std_coach_2", {"axis1_geo": 80, "axis1_alg": 70})
+
+    response = client.get("/coaches/coach_test_1/cohort-stats")
+    assert response.status_code == 200
+    stats = response.json()
+    assert (stats["roster_size"], stats["students_with_vectors"]) == (2, 2)
+    geo = stats["axes"]["axis1_geo"]
+    assert geo["mean"] == 50.0
+    assert geo["quantiles"]["p50"] == 50.0
+    assert geo["histogram"][2] == 1 and geo["histogram"][8] == 1 and sum(geo["histogram"]) == 2
+    geo_index, alg_index, gri_index = (stats["axis_order"].index(axis) for axis in ("axis1_geo", "axis1_alg", "axis4_gri"))
+    assert stats["correlation"][geo_index][alg_index] == pytest.approx(1.0)
+    assert stats["correlation"][geo_index][gri_index] is None  # axis4_gri is 50 for everyone
+
+    snapshot, _ = cohort_stats.cache.checkout("coach_test_1")
+    assert snapshot is not None
+    # A new vector only marks its student stale; the cached matrix is patched in place.
+    _add_vector(db_session, "std_coach_1", {"axis1_geo": 100, "axis1_alg": 30})
+    assert cohort_stats.cache._snapshots["coach_test_1"].stale == {"std_coach_1"}
+    stats = client.get("/coaches/coach_test_1/cohort-stats").json()
+    assert stats["axes"]["axis1_geo"]["mean"] == 90.0
+    assert stats["axes"]["axis1_geo"]["histogram"][-1] == 1  # 100 lands in the last bin
+    assert cohort_stats.cache.checkout("coach_test_1")[0] is snapshot
+
+    assert client.get("/coaches/coach_missing/cohort-stats").status_code == 404
+
+def test_read_coach_cohort_stats_keeps_stale_marks_when_the_refresh_fails(db_session: Session, monkeypatch):
+    from backend import async_crud, cohort_stats
+
+    setup_test_data(db_session)
+    db_session.query(models.StudentCurrentVector).delete()
+    db_session.commit()
+    _add_vector(db_session, "std_coach_1", {"axis1_geo": 20})
+    _add_vector(db_session, "std_coach_2", {"axis1_geo": 80})
+    assert client.get("/coaches/coach_test_1/cohort-stats").status_code == 200
+    _add_vector(db_session, "std_coach_1", {"axis1_geo": 100})
+
+    async def failing_read(db, coach_id, student_ids=None):
+        raise RuntimeError("database unavailable")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(async_crud, "get_cohort_vectors", failing_read)
+        with pytest.raises(RuntimeError):
+            client.get("/coaches/coach_test_1/cohort-stats")
+    assert cohort_stats.cache._snapshots["coach_test_1"].stale == {"std_coach_1"}
+    assert client.get("/coaches/coach_test_1/cohort-stats").json()["axes"]["axis1_geo"]["mean"] == 90.0
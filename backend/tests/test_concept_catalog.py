@@ -0,0 +1,93 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend import concept_catalog, crud
+from backend.models import ConceptsLibrary
+
+
+def add_concepts(db: Session):
+    db.add_all([
+        ConceptsLibrary(concept_id="C-HCOM-004", curriculum_id="H-COMMON", concept_name="이차방정식", manim_data_path="https://youtube.com/watch?v=quadratic"),
+        ConceptsLibrary(concept_id="C-MALL-013", curriculum_id="M-ALL", concept_name="피타고라스의 정리"),
+    ])
+    db.commit()
+
+
+def count_queries(db: Session):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", before_cursor_execute)
+    return statements, lambda: event.remove(db.get_bind(), "before_cursor_execute", before_cursor_execute)
+
+
+def test_catalog_snapshot_lookups(db_session: Session):
+    add_concepts(db_session)
+    catalog = concept_catalog.get_catalog(db_session)
+
+    assert len(catalog) == 2
+    assert catalog.get("C-HCOM-004").manim_data_path == "https://youtube.com/watch?v=quadratic"
+    assert catalog.get("missing") is None
+    assert catalog.find_by_name("피타고라스의 정리").concept_id == "C-MALL-013"
+    assert catalog.default.concept_id == "C-HCOM-004"
+    assert catalog.prompt_fragment == "C-HCOM-004, C-MALL-013"
+
+
+def test_catalog_is_reused_without_queries(db_session: Session):
+    add_concepts(db_session)
+    first = concept_catalog.get_catalog(db_session)
+
+    statements, stop = count_queries(db_session)
+    try:
+        for _ in range(10):
+            assert concept_catalog.get_catalog(db_session) is first
+    finally:
+        stop()
+    assert statements == []
+
+
+def test_catalog_invalidated_by_concept_writes(db_session: Session):
+    add_concepts(db_session)
+    first = concept_catalog.get_catalog(db_session)
+
+    db_session.add(ConceptsLibrary(concept_id="C-NEW", concept_name="새 개념"))
+    db_session.commit()
+    second = concept_catalog.get_catalog(db_session)
+    assert second.version > first.version
+    assert second.fingerprint != first.fingerprint
+    assert second.get("C-NEW") is not None
+
+    # Bulk deletes bypass the unit of work but must still invalidate the snapshot.
+    db_session.query(ConceptsLibrary).filter(ConceptsLibrary.concept_id == "C-NEW").delete()
+    db_session.commit()
+    third = concept_catalog.get_catalog(db_session)
+    assert third.version > second.version
+    assert third.get("C-NEW") is None
+    assert third.fingerprint == first.fingerprint
+
+
+def test_catalog_kept_after_rollback(db_session: Session):
+    add_concepts(db_session)
+    first = concept_catalog.get_catalog(db_session)
+
+    db_session.add(ConceptsLibrary(concept_id="C-ROLLED-BACK", concept_name="취소된 개념"))
+    db_session.flush()
+    db_session.rollback()
+    assert concept_catalog.get_catalog(db_session) is first
+
+
+def test_mock_llm_analysis_uses_catalog(db_session: Session, monkeypatch):
+    monkeypatch.setenv("USE_MOCK_LLM", "true")
+    add_concepts(db_session)
+    concept_catalog.get_catalog(db_session)
+
+    statements, stop = count_queries(db_session)
+    try:
+        result = crud.call_external_llm_for_analysis(db_session, "x^2 - 4x + 3 = 0 (이차방정식 문제)")
+    finally:
+        stop()
+    assert statements == []
+    assert result["concept_id"] == "C-HCOM-004"
+    assert result["manim_data_path"] == "https://youtube.com/watch?v=quadratic"
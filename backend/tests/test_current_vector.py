@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend import crud, models, schemas
+
+VECTOR = {
+    "axis1_geo": 50, "axis1_alg": 50, "axis1_ana": 50,
+    "axis2_opt": 50, "axis2_piv": 50, "axis2_dia": 50,
+    "axis3_con": 50, "axis3_pro": 50, "axis3_ret": 50,
+    "axis4_acc": 50, "axis4_gri": 50,
+}
+
+
+def add_vectors(db: Session, student_id: str, scores):
+    vectors = []
+    for score in scores:
+        _, db_vector = crud.create_assessment_and_vector(db, schemas.AssessmentCreate(
+            student_id=student_id, assessment_type="test", vector_data={**VECTOR, "axis1_geo": score},
+        ))
+        vectors.append(db_vector)
+    return vectors
+
+
+def test_projection_tracks_latest_vector(db_session: Session):
+    crud.create_student(db_session, schemas.StudentCreate(student_id="std_cv", student_name="Current"))
+    vectors = add_vectors(db_session, "std_cv", [10, 20, 30])
+
+    current = db_session.get(models.StudentCurrentVector, "std_cv")
+    assert current.vector_id == vectors[-1].vector_id
+    assert current.axis1_geo == 30
+    assert db_session.query(models.StudentCurrentVector).count() == 1
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    db_session.expire_all()
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        latest = crud.get_latest_vector_for_student(db_session, "std_cv")
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+    assert latest.vector_id == vectors[-1].vector_id
+    assert len(statements) == 1
+    assert "student_current_vector" in statements[0] and "ORDER BY" not in statements[0]
+
+
+def test_fallback_and_rebuild(db_session: Session):
+    crud.create_student(db_session, schemas.StudentCreate(student_id="std_a", student_name="A"))
+    crud.create_student(db_session, schemas.StudentCreate(student_id="std_b", student_name="B"))
+    vectors_a = add_vectors(db_session, "std_a", [10, 20])
+    vectors_b = add_vectors(db_session, "std_b", [70])
+    # Simulate a database that predates the projection.
+    db_session.query(models.StudentCurrentVector).delete()
+    db_session.commit()
+
+    latest = crud.get_latest_vector_for_student(db_session, "std_a")
+    assert isinstance(latest, models.StudentVectorHistory)
+    assert latest.vector_id == vectors_a[-1].vector_id
+
+    assert crud.rebuild_student_current_vectors(db_session, student_id="std_b") == 1
+    assert db_session.query(models.StudentCurrentVector).count() == 1
+    assert crud.rebuild_student_current_vectors(db_session) == 2
+    current = {row.student_id: row for row in db_session.query(models.StudentCurrentVector)}
+    assert current["std_a"].vector_id == vectors_a[-1].vector_id
+    assert current["std_a"].axis1_geo == 20
+    assert current["std_b"].vector_id == vectors_b[-1].vector_id
+    assert crud.get_latest_vector_for_student(db_session, "std_missing") is None
+
+
+def test_projection_keeps_the_newest_vector_when_writers_race(db_session: Session):
+    crud.create_student(db_session, schemas.StudentCreate(student_id="std_race", student_name="Race"))
+    newest = add_vectors(db_session, "std_race", [40])[0]
+    # A writer that stamped its vector earlier but commits later does not overwrite the projection.
+    assessment = models.Assessment(assessment_id="asmt_race_old", student_id="std_race", assessment_type="test")
+    older = models.StudentVectorHistory(
+        vector_id="vec_race_old", assessment_id="asmt_race_old", student_id="std_race",
+        created_at=newest.created_at - timedelta(seconds=1), **{**VECTOR, "axis1_geo": 10},
+    )
+    db_session.add_all([assessment, older])
+    crud._update_current_vector(db_session, older)
+    db_session.commit()
+
+    current = db_session.get(models.StudentCurrentVector, "std_race")
+    assert (current.vector_id, current.axis1_geo) == (newest.vector_id, 40)
+    assert db_session.query(models.StudentCurrentVector).filter_by(student_id="std_race").count() == 1
+
+    latest = add_vectors(db_session, "std_race", [90])[0]
+    current = db_session.get(models.StudentCurrentVector, "std_race")
+    assert (current.vector_id, current.axis1_geo) == (latest.vector_id, 90)
+
+
+def test_latest_vector_sees_unflushed_writes(db_session: Session):
+    crud.create_student(db_session, schemas.StudentCreate(student_id="std_tx", student_name="Transaction"))
+    for score in (30, 60):
+        _, db_vector = crud.create_assessment_and_vector(db_session, schemas.AssessmentCreate(
+            student_id="std_tx", assessment_type="test", vector_data={**VECTOR, "axis1_geo": score},
+        ), commit=False)
+        assert crud.get_latest_vector_for_student(db_session, "std_tx") is db_vector
+    db_session.commit()
+
+    current = crud.get_latest_vector_for_student(db_session, "std_tx")
+    assert isinstance(current, models.StudentCurrentVector)
+    assert (current.vector_id, current.axis1_geo) == (db_vector.vector_id, 60)
@@ -0,0 +1,149 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from backend import crud, exports, models
+from backend.database import create_db_engine, create_session_factory
+from backend.main import app, get_read_db
+from backend.migrations import normalize_timestamps
+
+START = datetime(2026, 3, 1, 9, 0, tzinfo=UTC)
+
+
+def _seed(db):
+    for student_id in ("std_exp_a", "std_exp_b"):
+        db.add(models.Student(student_id=student_id, student_name=student_id))
+    for i in range(5):
+        student_id = "std_exp_a" if i % 2 == 0 else "std_exp_b"
+        created_at = START + timedelta(days=i)
+        db.add(models.Assessment(assessment_id=f"asmt_exp{i}", student_id=student_id, assessment_type="test"))
+        db.add(models.StudentVectorHistory(
+            vector_id=f"vec_exp{i}", assessment_id=f"asmt_exp{i}", student_id=student_id, created_at=created_at,
+            **{axis: 10 * i for axis in crud.VECTOR_AXES},
+        ))
+        db.add(models.Submission(
+            submission_id=f"sub_exp{i}", student_id=student_id, submitted_at=created_at,
+            problem_text=f"problem, \"quoted\" {i}\nsecond line", status="COMPLETED",
+        ))
+        db.add(models.LLMLog(source_submission_id=f"sub_exp{i}", decision="ANALYZED", created_at=created_at))
+    db.add(models.LLMLog(source_submission_id=None, decision="ORPHAN", created_at=START))
+    db.commit()
+
+
+@pytest.fixture
+def export_db(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'exports.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    factory = create_session_factory(engine)
+    with factory() as db:
+        _seed(db)
+
+    def read_db():
+        with factory() as db:
+            yield db
+
+    saved = app.dependency_overrides.get(get_read_db)
+    app.dependency_overrides[get_read_db] = read_db
+    try:
+        yield factory
+    finally:
+        if saved is None:
+            app.dependency_overrides.pop(get_read_db, None)
+        else:
+            app.dependency_overrides[get_read_db] = saved
+        engine.dispose()
+
+
+client = TestClient(app)
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_vector_history_export_as_ndjson_with_filters(export_db):
+    response = client.get("/admin/exports/vector-history")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = _ndjson(response)
+    assert [row["vector_id"] for row in rows] == [f"vec_exp{i}" for i in range(5)]
+    assert rows[0]["created_at"] == START.isoformat()
+    assert rows[4]["axis4_gri"] == 40
+
+    response = client.get("/admin/exports/vector-history", params={
+        "from": "2026-03-02T09:00:00Z", "to": "2026-03-05T09:00:00Z", "student_id": "std_exp_a",
+    })
+    assert [row["vector_id"] for row in _ndjson(response)] == ["vec_exp2"]
+
+    # Bounds in another zone are converted to UTC.
+    response = client.get("/admin/exports/vector-history", params={"from": "2026-03-04T18:00:00+09:00"})
+    assert [row["vector_id"] for row in _ndjson(response)] == ["vec_exp3", "vec_exp4"]
+
+
+def test_submissions_export_as_csv(export_db):
+    response = client.get("/admin/exports/submissions", params={"format": "csv", "student_id": ["std_exp_b", "std_exp_a"]})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="submissions.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["submission_id"] for row in rows] == [f"sub_exp{i}" for i in range(5)]
+    assert rows[1]["problem_text"] == "problem, \"quoted\" 1\nsecond line"
+    assert rows[1]["concept_id"] == ""
+
+
+def test_llm_logs_export_carries_the_submission_student(export_db):
+    rows = _ndjson(client.get("/admin/exports/llm-logs"))
+    assert len(rows) == 6
+    assert rows[-1]["decision"] == "ORPHAN" and rows[-1]["student_id"] is None
+
+    rows = _ndjson(client.get("/admin/exports/llm-logs", params={"student_id": "std_exp_b"}))
+    assert [row["source_submission_id"] for row in rows] == ["sub_exp1", "sub_exp3"]
+    assert {row["student_id"] for row in rows} == {"std_exp_b"}
+
+    # An empty export is an empty body; CSV still carries its header.
+    response = client.get("/admin/exports/llm-logs", params={"format": "csv", "student_id": "std_unknown"})
+    assert response.text.splitlines() == [",".join(crud.export_columns("llm-logs"))]
+
+
+def test_llm_log_range_bounds_match_server_default_timestamps(export_db):
+    # The CURRENT_TIMESTAMP server default stores whole seconds without a fraction.
+    with export_db() as db:
+        db.execute(text("UPDATE llm_logs SET created_at = '2026-03-10 12:00:00' WHERE decision = 'ORPHAN'"))
+        db.execute(text("UPDATE llm_logs SET created_at = '2026-03-11 12:00:00' WHERE source_submission_id = 'sub_exp4'"))
+        db.commit()
+        normalize_timestamps(db.get_bind())
+
+    rows = _ndjson(client.get("/admin/exports/llm-logs", params={"from": "2026-03-10T12:00:00Z", "to": "2026-03-11T12:00:00Z"}))
+    assert [row["decision"] for row in rows] == ["ORPHAN"]
+    assert rows[0]["created_at"] == "2026-03-10T12:00:00+00:00"
+
+
+def test_export_rejects_bad_filters(export_db):
+    assert client.get("/admin/exports/submissions", params={"format": "xml"}).status_code == 422
+    response = client.get("/admin/exports/submissions", params={"from": "2026-03-02T00:00:00Z", "to": "2026-03-01T00:00:00Z"})
+    assert response.status_code == 400
+    too_many = [f"std_{i}" for i in range(exports.EXPORT_MAX_STUDENT_IDS + 1)]
+    assert client.get("/admin/exports/submissions", params={"student_id": too_many}).status_code == 400
+
+
+def test_export_streams_in_chunks_without_holding_a_transaction(export_db):
+    chunks = exports.stream_export(export_db, "vector-history", "ndjson", chunk_rows=2)
+    first = next(chunks)
+    assert [json.loads(line)["vector_id"] for line in first.splitlines()] == ["vec_exp0", "vec_exp1"]
+
+    # A writer commits while the export is suspended between chunks.
+    with export_db() as db:
+        db.add(models.Assessment(assessment_id="asmt_exp9", student_id="std_exp_a", assessment_type="test"))
+        db.add(models.StudentVectorHistory(
+            vector_id="vec_exp9", assessment_id="asmt_exp9", student_id="std_exp_a", created_at=START,
+            **{axis: 90 for axis in crud.VECTOR_AXES},
+        ))
+        db.commit()
+
+    rest = [json.loads(line)["vector_id"] for chunk in chunks for line in chunk.splitlines()]
+    assert rest == ["vec_exp2", "vec_exp3", "vec_exp4", "vec_exp9"]
@@ -24,7 +24,7 @@ def test_fish_speech_adapter_initialization():
     assert adapter.api_url == "http://mock-fish-speech-api.com/synthesize"
     assert adapter.api_key == "mock_api_key"
 
-@patch('requests.post')
+@patch('backend.http_client.OutboundClient.post')
 def test_synthesize_speech_success(mock_post):
     mock_response_instance = MockResponse(
         status_code=200,
@@ -51,7 +51,7 @@ def test_synthesize_speech_success(mock_post):
     )
     assert audio_data == b"mock_audio_data"
 
-@patch('requests.post')
+@patch('backend.http_client.OutboundClient.post')
 def test_synthesize_speech_http_error(mock_post):
     mock_response_instance = MockResponse(
         status_code=400,
@@ -67,7 +67,7 @@ def test_synthesize_speech_http_error(mock_post):
     assert exc_info.value.status_code == 503
     assert "Failed to connect to fish-speech service" in exc_info.value.detail
 
-@patch('requests.post')
+@patch('backend.http_client.OutboundClient.post')
 def test_synthesize_speech_timeout(mock_post):
     adapter = FishSpeechAdapter(api_url="http://mock-fish-speech-api.com/synthesize", api_key="mock_api_key")
     text = "Timeout text"
@@ -80,7 +80,7 @@ def test_synthesize_speech_timeout(mock_post):
     assert exc_info.value.status_code == 504
     assert "Fish-speech API request timed out" in exc_info.value.detail
 
-@patch('requests.post')
+@patch('backend.http_client.OutboundClient.post')
 def test_synthesize_speech_unexpected_content_type(mock_post):
     mock_response_instance = MockResponse(
         status_code=200,
@@ -96,7 +96,7 @@ def test_synthesize_speech_unexpected_content_type(mock_post):
     assert exc_info.value.status_code == 500
     assert "Unexpected audio format from fish-speech API" in exc_info.value.detail
 
-@patch('requests.post')
+@patch('backend.http_client.OutboundClient.post')
 def test_synthesize_speech_general_exception(mock_post):
     mock_post.side_effect = Exception("Some unexpected error")
     mock_response_instance = MockResponse(
@@ -0,0 +1,84 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from backend import crud
+from backend.http_client import OutboundClient
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path == "/slow":
+            time.sleep(0.5)
+        body = b'{"ok": true}'
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except BrokenPipeError:
+            # The client gave up (read timeout test).
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_connections_are_reused(server):
+    client = OutboundClient(pool_maxsize=2)
+    for _ in range(3):
+        response = client.post(f"{server}/generate", json={"prompt": "hi"})
+        assert response.json() == {"ok": True}
+
+    host = server.replace("http://", "")
+    metrics = client.metrics()[host]
+    assert metrics["requests"] == 3
+    assert metrics["errors"] == 0
+    assert metrics["connections_opened"] == 1
+    assert metrics["connections_reused"] == 2
+    assert metrics["avg_latency_ms"] > 0
+    client.close()
+
+
+def test_read_timeout_is_enforced(server):
+    client = OutboundClient(connect_timeout=1)
+    with pytest.raises(requests.exceptions.Timeout):
+        client.post(f"{server}/slow", json={}, timeout=0.1)
+    assert client.metrics()[server.replace("http://", "")]["errors"] == 1
+    client.close()
+
+
+def test_scalar_timeout_uses_connect_timeout():
+    client = OutboundClient(connect_timeout=2, read_timeout=7)
+    with patch.object(client._session, "request") as mock_request:
+        mock_request.return_value.status_code = 200
+        client.post("http://ollama:11434/api/generate", json={})
+        client.post("http://ollama:11434/api/generate", json={}, timeout=120)
+    assert mock_request.call_args_list[0].kwargs["timeout"] == (2, 7)
+    assert mock_request.call_args_list[1].kwargs["timeout"] == (2, 120)
+    client.close()
+
+
+def test_manim_agent_call_has_timeout():
+    with patch("backend.http_client.OutboundClient.post") as mock_post:
+        mock_post.return_value.json.return_value = {"video_url": "https://manim.example.com/video.mp4"}
+        assert crud.call_external_manim_agent("C-HCOM-004", "Apply the quadratic formula.") == "https://manim.example.com/video.mp4"
+    assert mock_post.call_args.kwargs["timeout"] == crud.MANIM_AGENT_READ_TIMEOUT
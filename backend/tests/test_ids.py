@@ -0,0 +1,22 @@
+from datetime import datetime, UTC
+
+from backend import ids
+
+
+def test_new_ids_are_unique_and_time_ordered():
+    generated = ids.new_ids(ids.SUBMISSION_PREFIX, 5000)
+    assert len(set(generated)) == len(generated)
+    assert generated == sorted(generated)
+    assert all(ids.is_time_ordered_id(value, ids.SUBMISSION_PREFIX) for value in generated)
+    assert len(generated[0]) == len("sub_") + ids.ULID_LENGTH
+
+
+def test_id_for_datetime_sorts_by_time():
+    earlier = ids.id_for_datetime(ids.VECTOR_PREFIX, datetime(2025, 1, 1, tzinfo=UTC))
+    later = ids.id_for_datetime(ids.VECTOR_PREFIX, datetime(2025, 1, 1, 0, 0, 1))  # naive means UTC
+    assert earlier < later < ids.new_id(ids.VECTOR_PREFIX)
+
+
+def test_legacy_ids_are_not_time_ordered():
+    assert not ids.is_time_ordered_id("sub_1a2b3c4d", ids.SUBMISSION_PREFIX)
+    assert not ids.is_time_ordered_id(ids.new_id(ids.VECTOR_PREFIX), ids.SUBMISSION_PREFIX)
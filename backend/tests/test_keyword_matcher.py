@@ -0,0 +1,55 @@
+import random
+
+from backend import crud
+from backend.keyword_matcher import KeywordMatcher
+
+
+def nested_loop(configs, text):
+    for index, config in enumerate(configs):
+        for keyword in config["keywords"]:
+            if keyword in text:
+                return index
+    return None
+
+
+def test_overlapping_keywords():
+    matcher = KeywordMatcher([("he", 3), ("she", 2), ("hers", 1), ("his", 4)])
+    assert matcher.find("ushers") == 1
+    assert matcher.find("ushe") == 2
+    assert matcher.find("this") == 4
+    assert matcher.find("xyz") is None
+    assert matcher.find("") is None
+    assert len(matcher) == 4
+
+
+def test_priority_does_not_depend_on_position():
+    configs = [
+        {"keywords": ["이차방정식"]},
+        {"keywords": ["이차함수", "그래프"]},
+        {"keywords": ["피타고라스", "정리"]},
+    ]
+    matcher = KeywordMatcher.from_configs(configs)
+    # "정리" appears first in the text, but the earlier config still wins.
+    text = "근의 공식 정리: 이차방정식 x^2 - 4 = 0"
+    assert matcher.find(text) == 0 == nested_loop(configs, text)
+    assert matcher.find("이차함수의 그래프와 피타고라스") == 1
+    assert KeywordMatcher.from_configs([{"keywords": []}, {"keywords": [""]}]).find("anything") is None
+
+
+def test_matches_nested_loop_on_random_rules():
+    rng = random.Random(3)
+    alphabet = "abcde가나다"
+    configs = [
+        {"keywords": ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 3))]}
+        for _ in range(300)
+    ]
+    matcher = KeywordMatcher.from_configs(configs)
+    for _ in range(500):
+        text = "".join(rng.choice(alphabet + "xyz ") for _ in range(rng.randint(0, 30)))
+        assert matcher.find(text) == nested_loop(configs, text)
+
+
+def test_mock_llm_uses_compiled_matcher():
+    assert len(crud.llm_sim_matcher) == sum(len(config["keywords"]) for config in crud.llm_sim_configs)
+    index = crud.llm_sim_matcher.find("x^2 - 4x + 3 = 0의 해를 구하시오. (이차방정식 문제)")
+    assert crud.llm_sim_configs[index]["response"]["concept_id"] == "C-HCOM-004"
@@ -0,0 +1,103 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from backend import crud, models
+from backend.analysis_cache import AnalysisCache
+from backend.llm_stream import IncrementalJSONObjectParser, iter_ollama_tokens
+
+ANALYSIS_JSON = json.dumps({
+    "concept_id": "C-HCOM-004",
+    "logical_path_text": "Use the formula {x = -b ± √(b^2-4ac)} / 2a, \"carefully\".",
+    "vector_data": {
+        "axis1_geo": 40, "axis1_alg": 85, "axis1_ana": 60,
+        "axis2_opt": 70, "axis2_piv": 60, "axis2_dia": 75,
+        "axis3_con": 80, "axis3_pro": 85, "axis3_ret": 70,
+        "axis4_acc": 90, "axis4_gri": 120,
+    },
+}, ensure_ascii=False)
+
+
+def test_parser_emits_fields_in_order():
+    parser = IncrementalJSONObjectParser()
+    fields = []
+    for ch in "```json\n" + ANALYSIS_JSON + "\n```\n{\"ignored\": 1}":
+        fields.extend(parser.feed(ch))
+
+    assert [key for key, _ in fields] == ["concept_id", "logical_path_text", "vector_data"]
+    assert fields[1][1] == "Use the formula {x = -b ± √(b^2-4ac)} / 2a, \"carefully\"."
+    assert parser.closed
+    assert parser.result() == json.loads(ANALYSIS_JSON)
+
+
+def test_parser_reports_incomplete_object():
+    parser = IncrementalJSONObjectParser()
+    assert parser.feed('{"concept_id": "C-HCOM-004", "logical_') == [("concept_id", "C-HCOM-004")]
+    assert not parser.closed
+    with pytest.raises(ValueError):
+        parser.result()
+
+
+def test_iter_ollama_tokens_stops_at_done():
+    lines = [
+        b'{"response": "{\\"a\\"", "done": false}',
+        b"",
+        b'{"response": ": 1}", "done": false}',
+        b'{"response": "", "done": true}',
+        b'{"response": "never read", "done": false}',
+    ]
+    assert list(iter_ollama_tokens(lines)) == ['{"a"', ": 1}"]
+
+
+def ollama_stream(text: str, trailing_tokens: int = 50):
+    """Ollama NDJSON lines producing `text` a few characters at a time, followed by more tokens."""
+    for i in range(0, len(text), 7):
+        yield json.dumps({"response": text[i:i + 7], "done": False}).encode()
+    for _ in range(trailing_tokens):
+        yield json.dumps({"response": " ", "done": False}).encode()
+    yield json.dumps({"response": "", "done": True}).encode()
+
+
+def test_stream_llm_analysis_stops_after_object(db_session: Session, monkeypatch):
+    db_session.add(models.ConceptsLibrary(concept_id="C-HCOM-004", concept_name="이차방정식", manim_data_path="https://youtube.com/watch?v=quadratic"))
+    db_session.commit()
+    monkeypatch.setenv("USE_MOCK_LLM", "false")
+    cache = AnalysisCache(enabled=False)
+    monkeypatch.setattr(crud, "analysis_cache", cache)
+
+    lines = ollama_stream(ANALYSIS_JSON)
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.iter_lines.return_value = lines
+
+    with patch("backend.http_client.OutboundClient.post", return_value=response) as mock_post:
+        events = list(crud.stream_llm_analysis(db_session, "x^2 - 4x + 3 = 0"))
+
+    assert mock_post.call_args.kwargs["stream"] is True
+    assert mock_post.call_args.kwargs["json"]["stream"] is True
+    assert [event["event"] for event in events] == ["concept", "logical_path_text", "analysis"]
+    assert events[0] == {"event": "concept", "concept_id": "C-HCOM-004", "manim_data_path": "https://youtube.com/watch?v=quadratic"}
+    assert events[2]["analysis"]["vector_data"]["axis4_gri"] == 100
+    # The trailing tokens were never read and the connection was released.
+    assert len(list(lines)) > 0
+    response.__exit__.assert_called_once()
+
+
+def test_stream_llm_analysis_incomplete_stream(db_session: Session, monkeypatch):
+    db_session.add(models.ConceptsLibrary(concept_id="C-HCOM-004", concept_name="이차방정식"))
+    db_session.commit()
+    monkeypatch.setenv("USE_MOCK_LLM", "false")
+    monkeypatch.setattr(crud, "analysis_cache", AnalysisCache(enabled=False))
+
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.iter_lines.return_value = ollama_stream(ANALYSIS_JSON[:60], trailing_tokens=0)
+
+    with patch("backend.http_client.OutboundClient.post", return_value=response):
+        stream = crud.stream_llm_analysis(db_session, "x^2 - 4x + 3 = 0")
+        assert next(stream)["event"] == "concept"
+        with pytest.raises(crud.HTTPException) as exc_info:
+            list(stream)
+    assert exc_info.value.status_code == 500
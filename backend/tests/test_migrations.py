@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud, ids, models
+from backend.migrations import ensure_columns, ensure_indexes, missing_columns, missing_indexes, rekey_legacy_ids
+
+
+def test_ensure_indexes_upgrades_existing_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    # Simulate a database created before the indexes were declared.
+    for table in models.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.drop(bind=engine)
+    assert "ix_student_vector_history_student_id_created_at" in {index.name for index in missing_indexes(engine)}
+
+    created = ensure_indexes(engine)
+    assert "ix_llm_logs_source_submission_id" in created
+    assert "ix_anki_cards_student_id_next_review_date" in created
+    assert missing_indexes(engine) == []
+    assert ensure_indexes(engine) == []
+
+    indexes = {index["name"]: index["column_names"] for index in inspect(engine).get_indexes("submissions")}
+    assert indexes["ix_submissions_student_id_submitted_at"] == ["student_id", "submitted_at"]
+
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT * FROM student_vector_history WHERE student_id = ? ORDER BY created_at DESC LIMIT 1",
+            ("std_1",),
+        ).fetchall()
+    assert "ix_student_vector_history_student_id_created_at" in " ".join(str(row[-1]) for row in plan)
+    engine.dispose()
+
+
+def test_ensure_columns_adds_nullable_columns(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO students (student_id, student_name) VALUES ('std_1', 'Student')")
+        conn.exec_driver_sql("INSERT INTO submissions (submission_id, student_id, status) VALUES ('sub_1', 'std_1', 'FAILED')")
+        # Simulate a database created before error_detail was declared.
+        conn.exec_driver_sql("ALTER TABLE submissions DROP COLUMN error_detail")
+    assert [f"{column.table.name}.{column.name}" for column in missing_columns(engine)] == ["submissions.error_detail"]
+
+    assert ensure_columns(engine) == ["submissions.error_detail"]
+    assert ensure_columns(engine) == []
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT status, error_detail FROM submissions")).one() == ("FAILED", None)
+    engine.dispose()
+
+
+def test_rekey_legacy_ids_keeps_references(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy_ids.db'}")
+    models.Base.metadata.create_all(bind=engine)
+
+    @event.listens_for(engine, "connect")
+    def enforce_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    Session = sessionmaker(bind=engine)
+    started = datetime(2026, 1, 1)
+    with Session() as db:
+        db.add(models.Student(student_id="std_rekey", student_name="Rekey Student"))
+        db.flush()
+        for i in range(3):
+            moment = started + timedelta(days=i)
+            db.add(models.Assessment(assessment_id=f"asmt_{i:08x}", student_id="std_rekey", assessment_type="test", assessment_date=moment))
+            db.flush()
+            db.add(models.StudentVectorHistory(
+                vector_id=f"vec_{i:08x}", assessment_id=f"asmt_{i:08x}", student_id="std_rekey", created_at=moment,
+                **{axis: 50 + i for axis in crud.VECTOR_AXES},
+            ))
+            db.add(models.Submission(submission_id=f"sub_{i:08x}", student_id="std_rekey", status="COMPLETED", submitted_at=moment))
+            db.flush()
+            db.add(models.LLMLog(source_submission_id=f"sub_{i:08x}", decision="AUTO", model_version="mock"))
+        db.flush()
+        db.add(models.StudentCurrentVector(
+            student_id="std_rekey", vector_id="vec_00000002", assessment_id="asmt_00000002", created_at=started + timedelta(days=2),
+            **{axis: 52 for axis in crud.VECTOR_AXES},
+        ))
+        db.add(models.WeeklyReport(student_id="std_rekey", period_start=started, period_end=started + timedelta(days=7),
+                                   vector_start_id="vec_00000000", vector_end_id="vec_00000002"))
+        db.commit()
+
+    counts = rekey_legacy_ids(engine, batch_size=2)
+    assert counts == {"assessments": 3, "student_vector_history": 3, "submissions": 3}
+    assert rekey_legacy_ids(engine) == {"assessments": 0, "student_vector_history": 0, "submissions": 0}
+
+    with Session() as db:
+        vectors = db.query(models.StudentVectorHistory).order_by(models.StudentVectorHistory.vector_id).all()
+        assert all(ids.is_time_ordered_id(vector.vector_id, ids.VECTOR_PREFIX) for vector in vectors)
+        # The new ids sort by the rows' timestamps.
+        assert [vector.axis1_geo for vector in vectors] == [50, 51, 52]
+        assert all(db.get(models.Assessment, vector.assessment_id) is not None for vector in vectors)
+        current = db.get(models.StudentCurrentVector, "std_rekey")
+        assert (current.vector_id, current.assessment_id) == (vectors[2].vector_id, vectors[2].assessment_id)
+        report = db.query(models.WeeklyReport).one()
+        assert (report.vector_start_id, report.vector_end_id) == (vectors[0].vector_id, vectors[2].vector_id)
+        submission_ids = {submission.submission_id for submission in db.query(models.Submission)}
+        assert {log.source_submission_id for log in db.query(models.LLMLog)} == submission_ids
+        assert db.execute(text("PRAGMA foreign_key_check")).fetchall() == []
+    engine.dispose()
+
+
+def test_rekey_legacy_ids_repoints_assessment_source_submission(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy_source_ref.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    moment = datetime(2026, 1, 1)
+    with Session() as db:
+        db.add(models.Student(student_id="std_rekey", student_name="Rekey Student"))
+        db.add(models.Submission(submission_id="sub_0000000a", student_id="std_rekey", status="COMPLETED", submitted_at=moment))
+        db.add(models.Assessment(assessment_id="asmt_0000000a", student_id="std_rekey", assessment_type="llm_analysis",
+                                 source_ref_id="sub_0000000a", assessment_date=moment))
+        db.add(models.Assessment(assessment_id="asmt_0000000b", student_id="std_rekey", assessment_type="test",
+                                 source_ref_id="quiz_7", assessment_date=moment))
+        db.commit()
+
+    rekey_legacy_ids(engine)
+
+    with Session() as db:
+        submission = db.query(models.Submission).one()
+        assert ids.is_time_ordered_id(submission.submission_id, ids.SUBMISSION_PREFIX)
+        analysis = db.query(models.Assessment).filter_by(assessment_type="llm_analysis").one()
+        assert db.get(models.Submission, analysis.source_ref_id) is submission
+        assert db.query(models.Assessment).filter_by(assessment_type="test").one().source_ref_id == "quiz_7"
+    engine.dispose()
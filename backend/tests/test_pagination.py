@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from backend import crud, models, schemas
+from backend.database import create_db_engine, create_session_factory
+from backend.main import app, get_db
+from backend.migrations import normalize_timestamps
+from backend.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 3, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor([created_at, "vec_1"])
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at.isoformat(), "vec_1")
+    assert decode_cursor(None) is None
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor!", encode_cursor([]), "e30"])  # "e30" is {}
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor)
+    assert exc_info.value.status_code == 400
+
+
+def test_vector_history_pages_in_order(db_session):
+    student_id = "std_paging"
+    db_session.add(models.Student(student_id=student_id, student_name="Paging Student"))
+    started = datetime(2026, 1, 1, tzinfo=UTC)
+    for i in range(7):
+        db_session.add(models.Assessment(assessment_id=f"asmt_{i}", student_id=student_id, assessment_type="test"))
+        db_session.add(models.StudentVectorHistory(
+            vector_id=f"vec_{i}", assessment_id=f"asmt_{i}", student_id=student_id,
+            # Two vectors share each timestamp, so the id has to break ties.
+            created_at=started + timedelta(minutes=i // 2),
+            **{axis: 50 for axis in crud.VECTOR_AXES},
+        ))
+    db_session.commit()
+
+    seen = []
+    after = None
+    while True:
+        rows = crud.get_vector_history_by_student(db_session, student_id, limit=3, after=after)
+        page = rows[:3]
+        seen.extend(row.vector_id for row in page)
+        if len(rows) <= 3:
+            break
+        after = decode_cursor(encode_cursor([page[-1].created_at, page[-1].vector_id]))
+    assert seen == [f"vec_{i}" for i in range(7)]
+
+
+def _walk(fetch, page_key_of, limit=3):
+    seen, after = [], None
+    while True:
+        rows = fetch(limit=limit, after=after)
+        seen.extend(rows[:limit])
+        if len(rows) <= limit:
+            return seen
+        after = decode_cursor(encode_cursor(page_key_of(rows[limit - 1])))
+
+
+def test_rows_created_through_crud_page_across_one_second(db_session):
+    # All of these land within the same second; none may be skipped at a page boundary.
+    for i in range(7):
+        crud.create_student(db_session, schemas.StudentCreate(student_id=f"s{i}", student_name=f"Student {i}"))
+    crud.create_coach(db_session, schemas.CoachCreate(coach_id="coach_second", coach_name="Coach"))
+    for i in range(7):
+        crud.create_coach_memo(db_session, schemas.CoachMemoCreate(coach_id="coach_second", student_id="s0", memo_text=f"memo {i}"))
+
+    students = _walk(lambda **page: crud.get_students(db_session, **page), lambda s: [s.created_at, s.student_id])
+    assert [student.student_id for student in students] == [f"s{i}" for i in range(7)]
+    memos = _walk(
+        lambda **page: crud.get_coach_memos(db_session, student_id="s0", **page), lambda m: [m.created_at, m.memo_id]
+    )
+    assert [memo.memo_text for memo in memos] == [f"memo {i}" for i in reversed(range(7))]
+
+
+def test_server_default_timestamps_are_normalized(db_session):
+    for i in range(5):
+        db_session.add(models.Student(student_id=f"legacy_{i}", student_name="Legacy"))  # CURRENT_TIMESTAMP
+    db_session.commit()
+
+    assert normalize_timestamps(db_session.get_bind())["students.created_at"] == 5
+    db_session.expire_all()
+    students = _walk(lambda **page: crud.get_students(db_session, **page), lambda s: [s.created_at, s.student_id], limit=2)
+    assert [student.student_id for student in students] == [f"legacy_{i}" for i in range(5)]
+    assert normalize_timestamps(db_session.get_bind())["students.created_at"] == 0
+
+
+@pytest.fixture
+def api_db(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pagination.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    session_factory = create_session_factory(engine)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield session_factory
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous
+        engine.dispose()
+
+
+def test_coach_memos_cursor_header(api_db):
+    db = api_db()
+    db.add(models.Coach(coach_id="coach_paging", coach_name="Paging Coach"))
+    db.add(models.Student(student_id="std_memo_paging", student_name="Memo Student"))
+    started = datetime(2026, 1, 1, tzinfo=UTC)
+    for i in range(5):
+        db.add(models.CoachMemo(
+            coach_id="coach_paging", student_id="std_memo_paging", memo_text=f"memo {i}",
+            created_at=started + timedelta(days=i),
+        ))
+    db.commit()
+    db.close()
+
+    client = TestClient(app)
+    texts = []
+    params = {"student_id": "std_memo_paging", "limit": 2}
+    pages = 0
+    while True:
+        response = client.get("/coach-memos/", params=params)
+        assert response.status_code == 200
+        pages += 1
+        texts.extend(memo["memo_text"] for memo in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+
+    assert pages == 3
+    assert texts == [f"memo {i}" for i in reversed(range(5))]  # newest first
+
+    assert client.get("/coach-memos/", params={"cursor": "garbage!"}).status_code == 400
+    assert client.get("/coach-memos/", params={"limit": 0}).status_code == 422
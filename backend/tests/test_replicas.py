@@ -0,0 +1,220 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import NullPool
+
+from backend import cohort_stats, crud, main, models, schemas, similarity_index, vector_stats
+from backend.database import (
+    create_async_db_engine,
+    create_async_session_factory,
+    create_db_engine,
+    create_session_factory,
+    to_async_url,
+)
+from backend.main import app, get_async_db, get_async_read_db, get_db, get_read_db
+from backend.replicas import PRIMARY_PIN_COOKIE, ReplicaRouter
+
+
+def _seed(session_factory, student_name):
+    with session_factory() as db:
+        db.add(models.Student(student_id="std_replica", student_name=student_name))
+        db.commit()
+
+
+@pytest.fixture
+def replica_setup(tmp_path, monkeypatch):
+    """A primary and a replica SQLite file holding different names for the same student."""
+    engines, factories, async_factories = [], [], []
+    for name in ("primary", "replica"):
+        url = f"sqlite:///{tmp_path / f'{name}.db'}"
+        engine = create_db_engine(url)
+        models.Base.metadata.create_all(bind=engine)
+        factory = create_session_factory(engine)
+        _seed(factory, f"{name} copy")
+        engines.append(engine)
+        factories.append(factory)
+        # Each TestClient request runs on its own event loop, hence NullPool.
+        async_factories.append(create_async_session_factory(create_async_db_engine(to_async_url(url), poolclass=NullPool)))
+
+    lag = {"seconds": 0.0}
+
+    def probe(conn):
+        if isinstance(lag["seconds"], Exception):
+            raise lag["seconds"]
+        return lag["seconds"]
+
+    router = ReplicaRouter(
+        factories[0], async_factories[0],
+        replica_factory=factories[1], async_replica_factory=async_factories[1],
+        replica_engine=engines[1], lag_probe=probe, max_lag=2, check_interval=0, pin_seconds=60,
+    )
+    monkeypatch.setattr(main, "replica_router", router)
+    # Other test modules point the dependencies at test.db; read through the router and write to the primary file here.
+    saved = {
+        dep: app.dependency_overrides.pop(dep)
+        for dep in (get_read_db, get_async_read_db, get_db, get_async_db)
+        if dep in app.dependency_overrides
+    }
+
+    def primary_db():
+        with factories[0]() as db:
+            yield db
+
+    async def async_primary_db():
+        async with async_factories[0]() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = primary_db
+    app.dependency_overrides[get_async_db] = async_primary_db
+    try:
+        yield router, lag, factories
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_async_db, None)
+        app.dependency_overrides.update(saved)
+        for engine in engines:
+            engine.dispose()
+
+
+def _students(client):
+    response = client.get("/students/", params={"limit": 10})
+    assert response.status_code == 200
+    return {student["student_id"]: student["student_name"] for student in response.json()}
+
+
+def _student_name(client):
+    return _students(client)["std_replica"]
+
+
+def test_reads_go_to_replica(replica_setup):
+    router, _, _ = replica_setup
+    assert _student_name(TestClient(app)) == "replica copy"
+    assert router.snapshot()["replica_reads"] == 1
+
+
+def test_write_pins_client_to_primary(replica_setup):
+    router, _, _ = replica_setup
+    client = TestClient(app)
+    response = client.post("/students/", json={"student_id": "std_new", "student_name": "New Student"})
+    assert response.status_code == 201
+    assert PRIMARY_PIN_COOKIE in response.cookies
+
+    # The pinned client reads its own write back from the primary.
+    assert _students(client) == {"std_replica": "primary copy", "std_new": "New Student"}
+    assert router.snapshot()["pinned_reads"] == 1
+    # Another client has not written anything and still reads from the replica.
+    assert _student_name(TestClient(app)) == "replica copy"
+
+
+def test_failed_write_does_not_pin(replica_setup):
+    client = TestClient(app)
+    response = client.post("/students/", json={})
+    assert response.status_code == 422
+    assert PRIMARY_PIN_COOKIE not in response.cookies
+    assert _student_name(client) == "replica copy"
+
+
+@pytest.mark.parametrize("lag_seconds", [30.0, RuntimeError("replica down")])
+def test_lagging_replica_falls_back_to_primary(replica_setup, lag_seconds):
+    router, lag, _ = replica_setup
+    lag["seconds"] = lag_seconds
+    assert _student_name(TestClient(app)) == "primary copy"
+    assert router.snapshot()["lagging_reads"] == 1
+
+    lag["seconds"] = 0.5
+    assert _student_name(TestClient(app)) == "replica copy"
+
+
+def test_sync_read_dependency_follows_router(replica_setup):
+    router, lag, _ = replica_setup
+    request = type("FakeRequest", (), {"method": "GET", "cookies": {}})()
+    assert router.session_factory(request) is router.replica_factory
+    lag["seconds"] = 30.0
+    assert router.session_factory(request) is router.primary_factory
+    request.method = "POST"
+    assert router.session_factory(request) is router.primary_factory
+
+
+def test_async_read_dependency_never_probes_on_the_event_loop(replica_setup):
+    router, lag, _ = replica_setup
+    on_event_loop = []
+
+    def probe(conn):
+        try:
+            asyncio.get_running_loop()
+            on_event_loop.append(True)
+        except RuntimeError:
+            on_event_loop.append(False)
+        return lag["seconds"]
+
+    router.lag_probe = probe
+    request = type("FakeRequest", (), {"method": "GET", "cookies": {}})()
+    # Nothing measured yet: the primary, without probing.
+    assert router.async_session_factory(request) is router.async_primary_factory
+    assert on_event_loop == []
+    router.replica_lag()
+    lag["seconds"] = 30.0
+    # Only the last measurement counts, even when it is due for a refresh.
+    assert router.async_session_factory(request) is router.async_replica_factory
+    assert on_event_loop == [False]
+
+    # The dependency refreshes the measurement in a worker thread.
+    assert _student_name(TestClient(app)) == "primary copy"
+    assert on_event_loop == [False, False]
+
+
+def _add_vector(session_factory, level):
+    with session_factory() as db:
+        crud.create_assessment_and_vector(db, schemas.AssessmentCreate(
+            student_id="std_replica", assessment_type="test", vector_data={axis: level for axis in crud.VECTOR_AXES},
+        ))
+
+
+def test_vector_stats_are_not_cached_from_a_lagging_replica(replica_setup):
+    _, _, factories = replica_setup
+    vector_stats.cache.invalidate()
+    # The primary has committed a vector the replica has not replayed yet.
+    _add_vector(factories[0], 90)
+    stats = TestClient(app).get("/students/std_replica/vector-stats").json()
+    assert stats["count"] == 1
+    assert stats["axes"]["axis1_geo"]["latest"] == 90
+
+
+def test_cohort_stats_are_refreshed_from_the_primary(replica_setup):
+    _, _, factories = replica_setup
+    for factory in factories:
+        with factory() as db:
+            coach = models.Coach(coach_id="coach_replica", coach_name="Coach")
+            coach.students.append(db.get(models.Student, "std_replica"))
+            db.add(coach)
+            db.commit()
+    _add_vector(factories[0], 10)
+    _add_vector(factories[1], 10)
+    cohort_stats.cache.clear()
+    client = TestClient(app)
+    assert client.get("/coaches/coach_replica/cohort-stats").json()["axes"]["axis1_geo"]["mean"] == 10
+
+    # Only the primary has the new vector; it marks the student stale in the cached matrix.
+    _add_vector(factories[0], 90)
+    assert client.get("/coaches/coach_replica/cohort-stats").json()["axes"]["axis1_geo"]["mean"] == 90
+
+
+def test_similarity_index_is_refreshed_from_the_primary(replica_setup):
+    _, _, factories = replica_setup
+    for factory in factories:
+        with factory() as db:
+            db.add(models.Student(student_id="std_peer", student_name="Peer"))
+            db.commit()
+        _add_vector(factory, 10)
+    with factories[0]() as db:
+        crud.create_assessment_and_vector(db, schemas.AssessmentCreate(
+            student_id="std_peer", assessment_type="test", vector_data={axis: 10 for axis in crud.VECTOR_AXES},
+        ))
+    similarity_index.index.mark_pending(None)
+    client = TestClient(app)
+    assert client.get("/students/std_replica/similar").json()[0]["distance"] == 0
+
+    # Only the primary has the new vector; the student is pending and re-read once.
+    _add_vector(factories[0], 13)
+    assert client.get("/students/std_replica/similar").json()[0]["distance"] == pytest.approx(3 * len(crud.VECTOR_AXES) ** 0.5)
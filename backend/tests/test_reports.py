@@ -1,6 +1,6 @@
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import sessionmaker, Session
-from backend.main import app, get_db
+from backend.main import app, get_db, get_read_db
 from backend import models, crud
 from sqlalchemy import create_engine
 from datetime import datetime, timedelta, timezone # Added timezone
@@ -22,6 +22,7 @@ def override_get_db():
         db.close()
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
 
 client = TestClient(app)
 
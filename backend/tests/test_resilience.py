@@ -0,0 +1,132 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+import requests
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from backend import crud, models
+from backend.analysis_cache import AnalysisCache
+from backend.main import app
+from backend.resilience import AIMDLimiter, CircuitBreaker, OutboundGuard
+
+client = TestClient(app)
+
+
+def fail(guard: OutboundGuard, exc=requests.exceptions.ConnectionError("refused")):
+    with pytest.raises(type(exc)):
+        with guard.admit():
+            raise exc
+
+
+def test_breaker_opens_and_recovers_after_probe():
+    guard = OutboundGuard("Ollama", breaker=CircuitBreaker(window=4, min_calls=4, failure_rate=0.5, open_seconds=0.2))
+    with guard.admit():
+        pass
+    with guard.admit():
+        pass
+    fail(guard)
+    fail(guard)
+    assert guard.snapshot()["breaker"]["state"] == "OPEN"
+
+    with pytest.raises(HTTPException) as exc_info:
+        with guard.admit():
+            pytest.fail("body must not run while the breaker is open")
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "1"
+
+    time.sleep(0.25)
+    fail(guard)  # failed probe re-opens the breaker
+    assert guard.snapshot()["breaker"]["state"] == "OPEN"
+    time.sleep(0.25)
+    with guard.admit():
+        pass
+    snapshot = guard.snapshot()
+    assert snapshot["breaker"]["state"] == "CLOSED"
+    assert snapshot["rejected_open"] == 1
+    assert snapshot["failures"] == 3
+
+
+def test_bad_model_output_does_not_trip_breaker():
+    guard = OutboundGuard("Ollama", breaker=CircuitBreaker(window=2, min_calls=2, failure_rate=0.5))
+    for _ in range(3):
+        fail(guard, HTTPException(status_code=500, detail="Ollama did not return valid JSON"))
+    assert guard.snapshot()["breaker"]["state"] == "CLOSED"
+    fail(guard, HTTPException(status_code=504, detail="Ollama API request timed out"))
+    assert guard.snapshot()["breaker"]["state"] == "OPEN"
+
+
+def test_slow_calls_trip_breaker():
+    breaker = CircuitBreaker(window=2, min_calls=2, failure_rate=1.0, slow_call_seconds=0.5)
+    breaker.record(0.6, failed=False)
+    breaker.record(0.7, failed=False)
+    assert breaker.snapshot()["state"] == "OPEN"
+
+
+def test_aimd_limit_increases_and_backs_off():
+    limiter = AIMDLimiter(initial=2, minimum=1, maximum=4, latency_target=0.05, backoff=0.5)
+    for _ in range(20):
+        assert limiter.try_acquire()
+        limiter.release(0.001, failed=False)
+    assert limiter.limit == 4
+
+    assert limiter.try_acquire()
+    limiter.release(1.0, failed=False)
+    assert limiter.limit == 2
+    # A second slow call finishing right after counts as the same congestion event.
+    assert limiter.try_acquire()
+    limiter.release(1.0, failed=False)
+    assert limiter.limit == 2
+
+
+def test_limit_rejects_excess_concurrency():
+    guard = OutboundGuard("Ollama", limiter=AIMDLimiter(initial=1, minimum=1, maximum=1), retry_after=3)
+    entered, leave = threading.Event(), threading.Event()
+
+    def hold():
+        with guard.admit():
+            entered.set()
+            leave.wait(5)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    assert entered.wait(5)
+    with pytest.raises(HTTPException) as exc_info:
+        with guard.admit():
+            pass
+    leave.set()
+    thread.join()
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "3"
+    assert guard.snapshot()["rejected_limit"] == 1
+    assert guard.snapshot()["limiter"]["in_flight"] == 0
+
+
+def test_submission_fails_fast_when_breaker_open(db_session: Session, monkeypatch):
+    db_session.add(models.ConceptsLibrary(concept_id="C-HCOM-004", concept_name="이차방정식"))
+    db_session.commit()
+    monkeypatch.setenv("USE_MOCK_LLM", "false")
+    monkeypatch.setattr(crud, "analysis_cache", AnalysisCache(enabled=False))
+    guard = OutboundGuard("Ollama", breaker=CircuitBreaker(window=2, min_calls=2, failure_rate=0.5, open_seconds=30))
+    monkeypatch.setattr(crud, "llm_guard", guard)
+
+    with patch("backend.http_client.OutboundClient.post", side_effect=requests.exceptions.ReadTimeout()) as mock_post:
+        for _ in range(2):
+            with pytest.raises(HTTPException) as exc_info:
+                crud.call_external_llm_for_analysis(db_session, "x^2 - 4 = 0")
+            assert exc_info.value.status_code == 504
+        with pytest.raises(HTTPException) as exc_info:
+            crud.call_external_llm_for_analysis(db_session, "x^2 - 4 = 0")
+
+    assert mock_post.call_count == 2
+    assert exc_info.value.status_code == 503
+    assert int(exc_info.value.headers["Retry-After"]) >= 29
+
+    response = client.get("/system/llm-guard")
+    assert response.status_code == 200
+    assert response.json()["breaker"]["state"] == "OPEN"
+    assert response.json()["limiter"]["in_flight"] == 0
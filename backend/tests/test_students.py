@@ -1,8 +1,10 @@
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import sessionmaker, Session
-from backend.main import app, get_db
-from backend import models, crud
+from backend.main import app, get_async_db, get_async_read_db, get_db
+from backend.database import create_async_db_engine, create_async_session_factory
+from backend import models, crud, schemas
 from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
 from datetime import datetime, timedelta, timezone
 import pytest
 
@@ -31,6 +33,17 @@ def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
+# The read endpoints use the async session; each TestClient request runs on its own event loop, hence NullPool.
+async_engine = create_async_db_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+AsyncTestingSessionLocal = create_async_session_factory(async_engine)
+
+async def override_get_async_db():
+    async with AsyncTestingSessionLocal() as db:
+        yield db
+
+app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_async_read_db] = override_get_async_db
+
 client = TestClient(app)
 
 def setup_test_data(db: Session):
@@ -152,3 +165,119 @@ def test_get_student_mastery(db_session: Session):
     assert response.status_code == 200
     assert len(response.json()) == 1
     assert response.json()[0]['mastery_score'] == 80
+
+def test_compute_vector_stats_trends():
+    from backend.vector_stats import compute_vector_stats
+
+    started = datetime(2026, 1, 1)
+    # axis1_geo climbs 2 points a day; every other axis stays at 50.
+    rows = [(started + timedelta(days=i), 40 + 2 * i, *[50] * 10) for i in range(5)]
+    stats = compute_vector_stats("std_trend", rows, (3, 10))
+
+    geo = stats["axes"]["axis1_geo"]
+    assert (stats["count"], geo["latest"], geo["min"], geo["max"]) == (5, 48, 40, 48)
+    assert geo["moving_average"] == {3: 46.0, 10: None}  # fewer than 10 vectors
+    assert geo["slope_per_day"][3] == pytest.approx(2.0)
+    assert geo["volatility"] == 0.0  # steady climb
+    assert stats["axes"]["axis4_gri"]["slope_per_day"][3] == 0.0
+
+def test_get_vector_stats_cached_until_next_vector(db_session: Session):
+    from backend import vector_stats
+
+    data = setup_test_data(db_session)
+    student_id = data["student1_id"]
+    response = client.get(f"/students/{student_id}/vector-stats", params={"windows": "1,2"})
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["count"] == 1
+    assert stats["axes"]["axis1_geo"]["moving_average"] == {"1": 20.0, "2": None}
+    assert vector_stats.cache.get(student_id, (1, 2)) is not None
+
+    assessment = {
+        "student_id": student_id, "assessment_type": "COACH_MANUAL",
+        "vector_data": {axis: 60 for axis in crud.VECTOR_AXES},
+    }
+    assert client.post("/assessments/", json=assessment).status_code == 201
+    # The new vector dropped the cached stats.
+    assert vector_stats.cache.get(student_id, (1, 2)) is None
+
+    stats = client.get(f"/students/{student_id}/vector-stats", params={"windows": "1,2"}).json()
+    assert stats["count"] == 2
+    assert stats["axes"]["axis1_geo"]["moving_average"] == {"1": 60.0, "2": 40.0}
+    assert stats["axes"]["axis1_geo"]["latest"] == 60.0
+
+    assert client.get(f"/students/{data['student2_id']}/vector-stats").status_code == 404
+    assert client.get(f"/students/{student_id}/vector-stats", params={"windows": "0"}).status_code == 422
+
+def test_student_vector_index_nearest():
+    from backend.similarity_index import StudentVectorIndex
+
+    index = StudentVectorIndex(capacity=2)
+    for student_id, level in [("a", 10), ("b", 12), ("c", 50), ("d", 90), ("e", 11)]:
+        index.upsert(student_id, [level] * len(crud.VECTOR_AXES))
+    assert [peer for peer, _ in index.nearest("a", 2)] == ["e", "b"]
+    assert index.nearest("a", 1)[0][1] == pytest.approx(len(crud.VECTOR_AXES) ** 0.5)
+
+    index.remove("e")
+    index.upsert("b", [95] * len(crud.VECTOR_AXES))
+    assert [peer for peer, _ in index.nearest("a", 10)] == ["c", "d", "b"]
+    assert index.nearest("e", 3) is None
+
+def test_get_similar_students_follows_new_vectors(db_session: Session):
+    data = setup_test_data(db_session)
+    db_session.query(models.StudentCurrentVector).delete()
+    db_session.add(models.Student(student_id="std_test_3", student_name="Test Student 3"))
+    db_session.commit()
+    for student_id, level in [(data["student1_id"], 20), (data["student2_id"], 80), ("std_test_3", 30)]:
+        crud.create_assessment_and_vector(db_session, schemas.AssessmentCreate(
+            student_id=student_id, assessment_type="COACH_MANUAL",
+            vector_data={axis: level for axis in crud.VECTOR_AXES},
+        ))
+
+    response = client.get(f"/students/{data['student1_id']}/similar", params={"k": 2})
+    assert response.status_code == 200
+    assert [peer["student_id"] for peer in response.json()] == ["std_test_3", data["student2_id"]]
+    assert response.json()[0]["student_name"] == "Test Student 3"
+
+    # Student 2 moves next to student 1; the index picks it up without a reload.
+    crud.create_assessment_and_vector(db_session, schemas.AssessmentCreate(
+        student_id=data["student2_id"], assessment_type="COACH_MANUAL",
+        vector_data={axis: 21 for axis in crud.VECTOR_AXES},
+    ))
+    response = client.get(f"/students/{data['student1_id']}/similar", params={"k": 1})
+    assert [peer["student_id"] for peer in response.json()] == [data["student2_id"]]
+
+    assert client.get("/students/std_without_vector/similar").status_code == 404
+    assert client.get(f"/students/{data['student1_id']}/similar", params={"k": 0}).status_code == 422
+
+def test_similarity_index_keeps_pending_students_when_the_refresh_fails(monkeypatch):
+    import asyncio
+    from backend import async_crud
+    from backend.similarity_index import SimilarityIndex
+
+    rows = [("a", *[10] * len(crud.VECTOR_AXES)), ("b", *[90] * len(crud.VECTOR_AXES))]
+    fail = True
+
+    async def get_current_vectors(db, student_ids=None):
+        if fail:
+            raise RuntimeError("database unavailable")
+        return [row for row in rows if student_ids is None or row[0] in student_ids]
+
+    monkeypatch.setattr(async_crud, "get_current_vectors", get_current_vectors)
+    similarity = SimilarityIndex()
+    # A failed first load is retried in full.
+    with pytest.raises(RuntimeError):
+        asyncio.run(similarity.refresh(None))
+    fail = False
+    assert [peer for peer, _ in asyncio.run(similarity.nearest(None, "a", 1))] == ["b"]
+
+    # A failed patch leaves its students pending.
+    rows = [("a", *[10] * len(crud.VECTOR_AXES)), ("b", *[11] * len(crud.VECTOR_AXES)), ("c", *[50] * len(crud.VECTOR_AXES))]
+    similarity.mark_pending(frozenset({"b", "c"}))
+    fail = True
+    with pytest.raises(RuntimeError):
+        asyncio.run(similarity.refresh(None))
+    fail = False
+    assert asyncio.run(similarity.nearest(None, "a", 2)) == [
+        ("b", pytest.approx(len(crud.VECTOR_AXES) ** 0.5)), ("c", pytest.approx(40 * len(crud.VECTOR_AXES) ** 0.5)),
+    ]
@@ -1,5 +1,5 @@
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, update
 from sqlalchemy.orm import sessionmaker, Session
 from backend.main import app, get_db
 from backend.models import Base, Student, Submission, StudentMastery, StudentVectorHistory, ConceptsLibrary, Curriculum
@@ -7,6 +7,7 @@ from backend import crud, schemas, models
 import pytest
 import os
 import json # Added this line
+from datetime import datetime, timedelta, UTC
 
 # Setup the Test Database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -186,4 +187,359 @@ def test_review_submission(db_session: Session):
     assert db_llm_log_before.coach_feedback == "Good work, but consider the edge cases."
 
     db_submission = db_session.query(models.Submission).filter(models.Submission.submission_id == submission_id).first()
-    assert db_submission.status == "REVIEWED"    
\ No newline at end of file
+    assert db_submission.status == "REVIEWED"    
+
+def test_create_submission_async(db_session: Session):
+    from backend import submission_worker
+
+    student_id = "std_async_submission"
+    crud.create_student(db_session, schemas.StudentCreate(student_id=student_id, student_name="Async Student"))
+
+    submission_data = {
+        "student_id": student_id,
+        "problem_text": "x^2 - 4x + 3 = 0의 해를 구하시오. (이차방정식 문제)",
+    }
+    response = client.post("/submissions/async", json=submission_data)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["job_id"] == job["submission_id"]
+    assert job["status"] == "PENDING"
+    assert job["status_url"] == f"/submissions/{job['submission_id']}/status"
+
+    assert submission_worker.pool.wait_idle(timeout=30)
+
+    response_status = client.get(job["status_url"])
+    assert response_status.status_code == 200
+    status_data = response_status.json()
+    assert status_data["status"] == "COMPLETE"
+    assert status_data["error"] is None
+    assert status_data["result"]["concept_id"] == "C-HCOM-004"
+
+    db_session.expire_all()
+    assert db_session.query(StudentVectorHistory).filter_by(student_id=student_id).count() == 1
+    db_llm_log = db_session.query(models.LLMLog).filter_by(source_submission_id=job["submission_id"]).first()
+    assert db_llm_log is not None and db_llm_log.decision == "pending_review"
+
+
+def test_create_submission_async_failure(db_session: Session):
+    from backend import submission_worker
+    from fastapi import HTTPException
+
+    student_id = "std_async_failure"
+    crud.create_student(db_session, schemas.StudentCreate(student_id=student_id, student_name="Async Failure Student"))
+
+    with unittest.mock.patch.object(
+        crud, "call_external_llm_for_analysis",
+        side_effect=HTTPException(status_code=504, detail="Ollama API request timed out"),
+    ):
+        response = client.post("/submissions/async", json={"student_id": student_id, "problem_text": "Slow problem"})
+        assert response.status_code == 202
+        assert submission_worker.pool.wait_idle(timeout=30)
+
+    status_data = client.get(f"/submissions/{response.json()['submission_id']}/status").json()
+    assert status_data["status"] == "FAILED"
+    assert status_data["error"] == "Ollama API request timed out"
+    assert status_data["result"] is None
+
+
+def test_worker_recovers_submissions_interrupted_by_a_restart(db_session: Session):
+    from backend import submission_worker
+    from backend.database import create_session_factory
+
+    student_id = "std_async_restart"
+    crud.create_student(db_session, schemas.StudentCreate(student_id=student_id, student_name="Restart Student"))
+    problem = "x^2 - 4x + 3 = 0의 해를 구하시오. (이차방정식 문제)"
+    pending = crud.create_pending_submission(db_session, student_id=student_id, problem_text=problem)
+    processing = crud.create_pending_submission(db_session, student_id=student_id, problem_text=problem)
+    processing.status = "PROCESSING"
+    processing.processing_started_at = datetime.now(UTC) - timedelta(seconds=crud.SUBMISSION_PROCESSING_LEASE_SECONDS + 1)
+    # Claimed just now, possibly by a worker of another process that is still running.
+    running = crud.create_pending_submission(db_session, student_id=student_id, problem_text=problem)
+    running.status = "PROCESSING"
+    running.processing_started_at = datetime.now(UTC)
+    db_session.commit()
+
+    # A fresh pool, as after a restart; its queue has room for one of the two.
+    pool = submission_worker.SubmissionWorkerPool(max_workers=1, max_queue=0)
+    try:
+        assert pool.recover(create_session_factory(db_session.get_bind())) == {"requeued": 1, "failed": 1}
+        assert pool.wait_idle(timeout=30)
+    finally:
+        pool.shutdown()
+
+    assert client.get(f"/submissions/{pending.submission_id}/status").json()["status"] == "COMPLETE"
+    status_data = client.get(f"/submissions/{processing.submission_id}/status").json()
+    assert status_data["status"] == "FAILED"
+    assert status_data["error"] == submission_worker.INTERRUPTED_DETAIL
+    assert client.get(f"/submissions/{running.submission_id}/status").json()["status"] == "PROCESSING"
+
+
+def test_pending_submission_is_claimed_once(db_session: Session):
+    student_id = "std_async_claim"
+    crud.create_student(db_session, schemas.StudentCreate(student_id=student_id, student_name="Claim Student"))
+    submission = crud.create_pending_submission(db_session, student_id=student_id, problem_text="Claimed problem")
+    assert submission.status == "PENDING"  # loaded in this session
+
+    # Another worker claims it first.
+    other = TestingSessionLocal()
+    other.execute(update(Submission).where(Submission.submission_id == submission.submission_id).values(status="PROCESSING"))
+    other.commit()
+    other.close()
+
+    with unittest.mock.patch.object(crud, "call_external_llm_for_analysis") as analyse:
+        result = crud.complete_pending_submission(db_session, submission.submission_id)
+    analyse.assert_not_called()
+    assert result.status == "PROCESSING"
+
+
+def test_get_submission_status_not_found(db_session: Session):
+    response = client.get("/submissions/non_existent_id/status")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Submission not found"
+
+
+def test_post_analysis_stages_run_concurrently(db_session: Session, monkeypatch, tmp_path):
+    import time
+    from backend.audio_store import AudioStore
+
+    student_id = "std_fanout"
+    crud.create_student(db_session, schemas.StudentCreate(student_id=student_id, student_name="Fan-out Student"))
+    monkeypatch.setattr(crud, "MANIM_AGENT_ENABLED", True)
+    monkeypatch.setattr(crud, "audio_store", AudioStore(root=str(tmp_path / "audio")))
+
+    def slow_tts(text, *args, **kwargs):
+        time.sleep(0.4)
+        return b"audio"
+
+    def slow_manim(concept_id, logical_path_text):
+        time.sleep(0.4)
+        return "https://manim.example.com/generated.mp4"
+
+    with unittest.mock.patch.object(crud.fish_speech_adapter, "synthesize_speech", side_effect=slow_tts), \
+            unittest.mock.patch.object(crud, "call_external_manim_agent", side_effect=slow_manim):
+        started = time.monotonic()
+        db_submission, manim_content_url = crud.process_submission(
+            db_session, student_id, "x^2 - 4x + 3 = 0의 해를 구하시오. (이차방정식 문제)"
+        )
+        elapsed = time.monotonic() - started
+
+    # The two 0.4 s stages overlap instead of adding up.
+    assert elapsed < 0.75
+    assert manim_content_url == "https://manim.example.com/generated.mp4"
+    assert db_submission.audio_explanation_url.startswith("/audio/")
+    assert db_submission.status == "COMPLETE"
+
+
+def test_post_analysis_stage_deadline(db_session: Session, monkeypatch, tmp_path):
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from backend.audio_store import AudioStore
+
+    student_id = "std_fanout_deadline"
+    crud.create_student(db_session, schemas.StudentCreate(student_id=student_id, student_name="Deadline Student"))
+    monkeypatch.setattr(crud, "MANIM_AGENT_ENABLED", True)
+    monkeypatch.setattr(crud, "TTS_STAGE_DEADLINE", 0.1)
+    monkeypatch.setattr(crud, "audio_store", AudioStore(root=str(tmp_path / "audio")))
+    executor = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(crud, "post_analysis_executor", executor)
+
+    def slow_tts(text, *args, **kwargs):
+        time.sleep(0.5)
+        return b"audio"
+
+    with unittest.mock.patch.object(crud.fish_speech_adapter, "synthesize_speech", side_effect=slow_tts), \
+            unittest.mock.patch.object(crud, "call_external_manim_agent", return_value=crud.MANIM_AGENT_ERROR_URL):
+        db_submission, manim_content_url = crud.process_submission(
+            db_session, student_id, "x^2 - 4x + 3 = 0의 해를 구하시오. (이차방정식 문제)"
+        )
+
+        # Let the late stage finish before its mock is removed.
+        executor.shutdown(wait=True)
+
+    assert db_submission.audio_explanation_url == crud.AUDIO_ERROR_URL
+    # A failed Manim request keeps the concept's own video.
+    assert manim_content_url == "https://youtube.com/watch?v=manim_video_for_quadratic_equation"
+
+
+def test_process_submission_single_commit(db_session: Session, monkeypatch, tmp_path):
+    from sqlalchemy import event
+    from backend.audio_store import AudioStore
+
+    student_id = "std_single_commit"
+    crud.create_student(db_session, schemas.StudentCreate(student_id=student_id, student_name="Single Commit Student"))
+    monkeypatch.setattr(crud, "audio_store", AudioStore(root=str(tmp_path / "audio")))
+    problem_text = "x^2 - 4x + 3 = 0의 해를 구하시오. (이차방정식 문제)"
+
+    statements = []
+    commits = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0])
+
+    def count_commit(conn):
+        commits.append(conn)
+
+    with unittest.mock.patch.object(crud.fish_speech_adapter, "synthesize_speech", return_value=b"audio"):
+        crud.process_submission(db_session, student_id, problem_text)  # first vector and mastery rows
+        db_session.expunge_all()
+
+        event.listen(engine, "before_cursor_execute", count_statement)
+        event.listen(engine, "commit", count_commit)
+        try:
+            db_submission, _ = crud.process_submission(db_session, student_id, problem_text)
+            # Reading the result after the commit does not reload it.
+            assert db_submission.audio_explanation_url.startswith("/audio/")
+            assert db_submission.submitted_at is not None
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+            event.remove(engine, "commit", count_commit)
+
+    assert len(commits) == 1
+    # Current vector and mastery lookups, then one insert or update per row and no UPDATE of the new submission.
+    assert statements.count("SELECT") == 2
+    assert statements.count("INSERT") == 5  # submission, assessment, vector history, current vector upsert, LLM log
+    assert statements.count("UPDATE") == 1  # mastery
+
+
+def test_create_submission_batch(db_session: Session):
+    from fastapi import HTTPException
+
+    student_id = "std_batch"
+    crud.create_student(db_session, schemas.StudentCreate(student_id=student_id, student_name="Batch Student"))
+
+    real_analysis = crud.call_external_llm_for_analysis
+
+    def analysis(db, problem_text):
+        if "실패" in problem_text:
+            raise HTTPException(status_code=504, detail="Ollama API request timed out")
+        return real_analysis(db, problem_text)
+
+    batch_data = {
+        "student_id": student_id,
+        "problems": [
+            {"problem_text": "x^2 - 4x + 3 = 0의 해를 구하시오. (이차방정식 문제)"},
+            {"problem_text": "x^2 - 4x + 3 = 0의  해를 구하시오. (이차방정식 문제) "},
+            {"problem_text": "실패하는 문제"},
+            {"problem_text": "피타고라스의 정리를 이용하시오."},
+        ],
+    }
+    with unittest.mock.patch.object(crud, "call_external_llm_for_analysis", side_effect=analysis) as mock_analysis:
+        response = client.post("/submissions/batch", json=batch_data)
+
+    assert response.status_code == 201
+    data = response.json()
+    # The two identical problems are analysed once.
+    assert mock_analysis.call_count == 3
+    assert data["succeeded"] == 3
+    assert data["failed"] == 1
+    assert [item["index"] for item in data["items"]] == [0, 1, 2, 3]
+    assert data["items"][0]["submission"]["concept_id"] == "C-HCOM-004"
+    assert data["items"][1]["submission"]["concept_id"] == "C-HCOM-004"
+    assert data["items"][1]["submission"]["submission_id"] != data["items"][0]["submission"]["submission_id"]
+    assert data["items"][2]["submission"] is None
+    assert data["items"][2]["error"] == "Ollama API request timed out"
+    assert data["items"][3]["submission"]["status"] == "COMPLETE"
+
+    db_session.expire_all()
+    assert db_session.query(Submission).filter_by(student_id=student_id).count() == 3
+    vectors = crud.get_vector_history_by_student(db_session, student_id)
+    assert len(vectors) == 3
+    # Each vector builds on the previous one written in the same transaction.
+    assert vectors[0].axis1_alg == 65
+    assert vectors[1].axis1_alg == int(65 * 0.9 + 65 * 0.1)
+    assert vectors[2].axis1_alg == int(vectors[1].axis1_alg * 0.9 + 50 * 0.1)
+
+
+def test_create_submission_batch_too_large(db_session: Session, monkeypatch):
+    monkeypatch.setattr(crud, "SUBMISSION_BATCH_MAX_ITEMS", 2)
+    response = client.post("/submissions/batch", json={
+        "student_id": "std_batch",
+        "problems": [{"problem_text": f"문제 {i}"} for i in range(3)],
+    })
+    assert response.status_code == 400
+
+
+def test_create_submission_batch_packed_prompt(db_session: Session, monkeypatch):
+    from backend.analysis_cache import AnalysisCache
+
+    student_id = "std_batch_packed"
+    crud.create_student(db_session, schemas.StudentCreate(student_id=student_id, student_name="Packed Student"))
+    monkeypatch.setenv("USE_MOCK_LLM", "false")
+    monkeypatch.setattr(crud, "BATCH_PACK_PROMPTS", True)
+    monkeypatch.setattr(crud, "BATCH_PACK_SIZE", 5)
+    monkeypatch.setattr(crud, "analysis_cache", AnalysisCache(enabled=False))
+
+    vector_data = {
+        "axis1_geo": 40, "axis1_alg": 85, "axis1_ana": 60,
+        "axis2_opt": 70, "axis2_piv": 60, "axis2_dia": 75,
+        "axis3_con": 80, "axis3_pro": 85, "axis3_ret": 70,
+        "axis4_acc": 90, "axis4_gri": 80,
+    }
+    # The model only answers the first of the two problems.
+    ollama_output = {"analyses": [
+        {"concept_id": "C-HCOM-004", "logical_path_text": "Apply the quadratic formula.", "vector_data": vector_data},
+    ]}
+    mock_response = unittest.mock.Mock()
+    mock_response.json.return_value = {"response": json.dumps(ollama_output)}
+    mock_response.raise_for_status.return_value = None
+
+    with unittest.mock.patch("backend.http_client.OutboundClient.post", return_value=mock_response) as mock_post:
+        response = client.post("/submissions/batch", json={
+            "student_id": student_id,
+            "problems": [{"problem_text": "x^2 - 4x + 3 = 0"}, {"problem_text": "x^2 - 9 = 0"}],
+        })
+
+    assert response.status_code == 201
+    llm_calls = [call for call in mock_post.call_args_list if call.args[0] == crud.LLM_API_URL]
+    assert len(llm_calls) == 1
+    prompt = llm_calls[0].kwargs["json"]["prompt"]
+    assert '1. "x^2 - 4x + 3 = 0"' in prompt and '2. "x^2 - 9 = 0"' in prompt
+    items = response.json()["items"]
+    assert items[0]["submission"]["logical_path_text"] == "Apply the quadratic formula."
+    assert items[1]["error"] == "Ollama response missing analysis for this problem."
+
+
+def test_create_submission_stream(db_session: Session):
+    student_id = "std_stream"
+    crud.create_student(db_session, schemas.StudentCreate(student_id=student_id, student_name="Stream Student"))
+
+    with client.stream("POST", "/submissions/stream", json={
+        "student_id": student_id,
+        "problem_text": "x^2 - 4x + 3 = 0의 해를 구하시오. (이차방정식 문제)",
+    }) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in response.iter_lines() if line]
+
+    assert [event["event"] for event in events] == ["concept", "logical_path_text", "submission"]
+    assert events[0]["concept_id"] == "C-HCOM-004"
+    submission = events[2]["submission"]
+    assert submission["status"] == "COMPLETE"
+    assert submission["logical_path_text"] == events[1]["logical_path_text"]
+
+    db_session.expire_all()
+    assert db_session.query(Submission).filter_by(submission_id=submission["submission_id"]).first() is not None
+
+
+def test_create_submission_stream_error(db_session: Session):
+    from fastapi import HTTPException
+
+    with unittest.mock.patch.object(
+        crud, "call_external_llm_for_analysis",
+        side_effect=HTTPException(status_code=503, detail="Failed to connect to Ollama service"),
+    ):
+        response = client.post("/submissions/stream", json={"student_id": "std_stream", "problem_text": "문제"})
+
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert events == [{"event": "error", "status_code": 503, "detail": "Failed to connect to Ollama service"}]
+
+
+def test_create_submission_stream_storage_error(db_session: Session):
+    with unittest.mock.patch.object(crud, "store_analyzed_submission", side_effect=RuntimeError("disk I/O error")):
+        response = client.post("/submissions/stream", json={
+            "student_id": "std_stream", "problem_text": "x^2 - 4x + 3 = 0의 해를 구하시오. (이차방정식 문제)",
+        })
+
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert [event["event"] for event in events] == ["concept", "logical_path_text", "error"]
+    assert events[-1] == {"event": "error", "status_code": 500, "detail": "Failed to store the submission."}
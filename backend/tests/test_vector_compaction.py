@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, UTC
+
+from backend import crud, models
+from backend.pagination import decode_cursor, encode_cursor
+
+NOW = datetime(2026, 6, 15, 12, 0, tzinfo=UTC)  # a Monday
+
+
+def _add_vector(db, student_id, vector_id, created_at, level):
+    db.add(models.Assessment(assessment_id=f"asmt_{vector_id}", student_id=student_id, assessment_type="test"))
+    db.add(models.StudentVectorHistory(
+        vector_id=vector_id, assessment_id=f"asmt_{vector_id}", student_id=student_id, created_at=created_at,
+        **{axis: level for axis in crud.VECTOR_AXES},
+    ))
+
+
+def _seed(db):
+    db.add(models.Student(student_id="std_compact", student_name="Compact Student"))
+    # Two vectors on one day 200 days ago, three across one week 500 days ago, then recent ones.
+    day = NOW - timedelta(days=200)
+    _add_vector(db, "std_compact", "vec_d1", day.replace(hour=9), 40)
+    _add_vector(db, "std_compact", "vec_d2", day.replace(hour=17), 60)
+    week = NOW - timedelta(days=500)
+    week -= timedelta(days=week.weekday())
+    for i, level in enumerate((10, 20, 30)):
+        _add_vector(db, "std_compact", f"vec_w{i}", week + timedelta(days=i, hours=10), level)
+    _add_vector(db, "std_compact", "vec_reported", NOW - timedelta(days=300), 55)
+    _add_vector(db, "std_compact", "vec_recent", NOW - timedelta(days=10), 70)
+    _add_vector(db, "std_compact", "vec_latest", NOW - timedelta(days=1), 80)
+    db.add(models.WeeklyReport(
+        student_id="std_compact", period_start=NOW - timedelta(days=307), period_end=NOW - timedelta(days=300),
+        vector_start_id="vec_reported", vector_end_id="vec_reported",
+    ))
+    db.commit()
+
+
+def test_compaction_rolls_up_old_vectors_and_history_merges_tiers(db_session):
+    _seed(db_session)
+    before = crud.get_vector_history_by_student(db_session, "std_compact")
+    assert len(before) == 8
+
+    totals = crud.compact_vector_history(db_session, now=NOW)
+    assert totals == {"students": 1, "vectors": 5, "rollups": 2, "promoted": 0}
+
+    remaining = {row.vector_id for row in db_session.query(models.StudentVectorHistory)}
+    assert remaining == {"vec_reported", "vec_recent", "vec_latest"}
+    assert db_session.get(models.Assessment, "asmt_vec_d1") is None
+    assert db_session.get(models.Assessment, "asmt_vec_recent") is not None
+
+    daily = db_session.query(models.StudentVectorRollup).filter_by(granularity="day").one()
+    assert (daily.vector_count, daily.last_vector_id, daily.axis1_geo, daily.axis1_geo_mean) == (2, "vec_d2", 60, 50.0)
+    weekly = db_session.query(models.StudentVectorRollup).filter_by(granularity="week").one()
+    assert (weekly.vector_count, weekly.last_vector_id, weekly.axis4_gri_mean) == (3, "vec_w2", 20.0)
+
+    history = crud.get_vector_history_by_student(db_session, "std_compact")
+    assert [(row.vector_id, row.granularity, row.vector_count) for row in history] == [
+        ("vec_w2", "week", 3), ("vec_reported", "raw", 1), ("vec_d2", "day", 2),
+        ("vec_recent", "raw", 1), ("vec_latest", "raw", 1),
+    ]
+
+    # Keyset pages walk across both tiers without gaps or repeats.
+    seen, after = [], None
+    while True:
+        rows = crud.get_vector_history_by_student(db_session, "std_compact", limit=2, after=after)
+        seen.extend(row.vector_id for row in rows[:2])
+        if len(rows) <= 2:
+            break
+        after = decode_cursor(encode_cursor([rows[1].created_at, rows[1].vector_id]))
+    assert seen == [row.vector_id for row in history]
+
+
+def test_daily_rollups_are_promoted_to_weeks(db_session):
+    _seed(db_session)
+    crud.compact_vector_history(db_session, now=NOW)
+
+    # 200 days later the daily rollup falls outside the daily window.
+    totals = crud.compact_vector_history(db_session, now=NOW + timedelta(days=200))
+    assert totals["promoted"] == 1
+    rollups = db_session.query(models.StudentVectorRollup).order_by(models.StudentVectorRollup.last_created_at).all()
+    # vec_recent is now past the raw window, but still inside the daily one.
+    assert [(rollup.granularity, rollup.vector_count, rollup.last_vector_id) for rollup in rollups] == [
+        ("week", 3, "vec_w2"), ("week", 2, "vec_d2"), ("day", 1, "vec_recent"),
+    ]
+    assert rollups[1].axis1_geo_mean == 50.0
+
+    # Nothing left to do on a second run.
+    assert crud.compact_vector_history(db_session, now=NOW + timedelta(days=200))["vectors"] == 0
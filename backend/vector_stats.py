@@ -0,0 +1,221 @@
+"""
+Per-student trend statistics over the 11-axis vector history.
+
+The history is loaded with one query into an (n, 11) NumPy array and every
+statistic is computed for all axes at once:
+
+- latest, min, max, mean of each axis;
+- volatility: standard deviation of the change between consecutive vectors;
+- for every window w: the moving average of the last w vectors and the
+  least-squares slope over them, in points per day (null while the student
+  has fewer than w vectors, or when they all share one timestamp).
+
+Results are cached per student until one of the student's vectors is written
+through an ORM session in this process; VECTOR_STATS_MAX_AGE_SECONDS bounds
+how long writes from other processes can go unnoticed. Invalidation follows
+commits on the primary, so the history is always read from the primary, never
+from a read replica that may not have replayed the commit yet.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import Optional, Sequence
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import models
+from .crud import VECTOR_AXES, VECTOR_STUDENT_IDS_OPTION
+
+logger = logging.getLogger(__name__)
+
+VECTOR_STATS_WINDOWS = tuple(int(w) for w in os.getenv("VECTOR_STATS_WINDOWS", "3,5,10").split(","))
+VECTOR_STATS_MAX_WINDOW = int(os.getenv("VECTOR_STATS_MAX_WINDOW", "365"))
+VECTOR_STATS_MAX_AGE_SECONDS = float(os.getenv("VECTOR_STATS_MAX_AGE_SECONDS", "300"))
+VECTOR_STATS_CACHE_SIZE = int(os.getenv("VECTOR_STATS_CACHE_SIZE", "10000"))  # students
+
+VECTOR_TABLE = models.StudentVectorHistory.__tablename__
+_DIRTY_KEY = "vector_stats_dirty"
+_ALL_STUDENTS = object()
+_SECONDS_PER_DAY = 86400.0
+
+
+def _optional(values: np.ndarray, valid: bool) -> list:
+    return [float(v) if valid and np.isfinite(v) else None for v in values]
+
+
+def compute_vector_stats(student_id: str, rows: Sequence, windows: Sequence[int]) -> dict:
+    """
+    `rows` are (created_at, axis1_geo, ..., axis4_gri) tuples, oldest first,
+    as returned by crud.vector_axes_statement.
+    """
+    count = len(rows)
+    result = {"student_id": student_id, "count": count, "windows": list(windows), "axes": {}}
+    if not count:
+        result["first_at"] = result["last_at"] = None
+        return result
+
+    created_at = [row[0] for row in rows]
+    values = np.array([row[1:] for row in rows], dtype=np.float64)
+    days = np.array([(moment - created_at[0]).total_seconds() / _SECONDS_PER_DAY for moment in created_at])
+
+    volatility = np.diff(values, axis=0).std(axis=0) if count > 1 else np.zeros(len(VECTOR_AXES))
+    moving_average, slope = {}, {}
+    for window in windows:
+        enough = count >= window
+        tail, x = values[-window:], days[-window:]
+        moving_average[window] = _optional(tail.mean(axis=0), enough)
+        centered = x - x.mean()
+        spread = float(centered @ centered)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slopes = (centered @ (tail - tail.mean(axis=0))) / spread
+        slope[window] = _optional(slopes, enough and window > 1 and spread > 0)
+
+    columns = {
+        "latest": values[-1], "min": values.min(axis=0), "max": values.max(axis=0),
+        "mean": values.mean(axis=0), "volatility": volatility,
+    }
+    for i, axis in enumerate(VECTOR_AXES):
+        axis_stats = {name: float(column[i]) for name, column in columns.items()}
+        axis_stats["moving_average"] = {window: moving_average[window][i] for window in windows}
+        axis_stats["slope_per_day"] = {window: slope[window][i] for window in windows}
+        result["axes"][axis] = axis_stats
+    result["first_at"], result["last_at"] = created_at[0], created_at[-1]
+    return result
+
+
+def parse_windows(raw: Optional[str]) -> tuple:
+    """Parses the `windows` query parameter ("3,5,10"); raises ValueError on bad input."""
+    if not raw:
+        return VECTOR_STATS_WINDOWS
+    windows = sorted({int(part) for part in raw.split(",") if part.strip()})
+    if not windows or windows[0] < 1 or windows[-1] > VECTOR_STATS_MAX_WINDOW:
+        raise ValueError(f"windows must be integers between 1 and {VECTOR_STATS_MAX_WINDOW}.")
+    return tuple(windows)
+
+
+class VectorStatsCache:
+    """
+    LRU of computed stats per student. `generation(student_id)` is read before
+    loading the history and handed back to `put`, so results computed from
+    data that was invalidated in the meantime are not stored.
+    """
+
+    def __init__(self, max_students: int = VECTOR_STATS_CACHE_SIZE, max_age: float = VECTOR_STATS_MAX_AGE_SECONDS):
+        self.max_students = max_students
+        self.max_age = max_age
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._generations: dict = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def generation(self, student_id: str) -> tuple:
+        with self._lock:
+            return self._epoch, self._generations.get(student_id, 0)
+
+    def get(self, student_id: str, windows: tuple) -> Optional[dict]:
+        with self._lock:
+            entries = self._entries.get(student_id)
+            hit = entries.get(windows) if entries else None
+            if hit is None or time.monotonic() - hit[1] >= self.max_age:
+                return None
+            self._entries.move_to_end(student_id)
+            return hit[0]
+
+    def put(self, student_id: str, windows: tuple, stats: dict, generation: tuple):
+        with self._lock:
+            if generation != (self._epoch, self._generations.get(student_id, 0)):
+                return
+            self._entries.setdefault(student_id, {})[windows] = (stats, time.monotonic())
+            self._entries.move_to_end(student_id)
+            while len(self._entries) > self.max_students:
+                evicted, _ = self._entries.popitem(last=False)
+                self._generations.pop(evicted, None)
+
+    def invalidate(self, student_ids=_ALL_STUDENTS):
+        with self._lock:
+            if student_ids is _ALL_STUDENTS:
+                self._epoch += 1
+                self._entries.clear()
+                self._generations.clear()
+                return
+            for student_id in student_ids:
+                self._entries.pop(student_id, None)
+                self._generations[student_id] = self._generations.get(student_id, 0) + 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+cache = VectorStatsCache()
+
+
+def _is_vector(obj) -> bool:
+    # Compare by table name, as concept_catalog does for scripts that import the models module directly.
+    return getattr(obj, "__tablename__", None) == VECTOR_TABLE
+
+
+def _mark_dirty(session, student_ids):
+    dirty = session.info.get(_DIRTY_KEY)
+    if dirty is _ALL_STUDENTS:
+        return
+    if student_ids is _ALL_STUDENTS:
+        session.info[_DIRTY_KEY] = _ALL_STUDENTS
+    else:
+        session.info.setdefault(_DIRTY_KEY, set()).update(student_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_vector_writes(session, flush_context):
+    student_ids = {obj.student_id for obj in chain(session.new, session.dirty, session.deleted) if _is_vector(obj)}
+    if student_ids:
+        _mark_dirty(session, student_ids)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_vector_writes(orm_execute_state):
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or not _is_vector(mapper.class_):
+        return
+    named = orm_execute_state.execution_options.get(VECTOR_STUDENT_IDS_OPTION)
+    if named is not None:
+        _mark_dirty(orm_execute_state.session, set(named))
+        return
+    parameters = orm_execute_state.parameters
+    rows = parameters if isinstance(parameters, list) else [parameters] if parameters else []
+    student_ids = {row.get("student_id") for row in rows}
+    # A statement without per-row student ids (e.g. UPDATE ... WHERE) may touch anyone.
+    _mark_dirty(orm_execute_state.session, _ALL_STUDENTS if not student_ids or None in student_ids else student_ids)
+
+
+_commit_listeners = []
+
+
+def on_vectors_committed(listener):
+    """
+    Registers `listener(student_ids)` to run after a transaction that wrote
+    vectors commits; `student_ids` is None when any student may be affected.
+    """
+    _commit_listeners.append(listener)
+    return listener
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if dirty is not None:
+        cache.invalidate(dirty)
+        logger.debug(f"Vector stats invalidated for {'all students' if dirty is _ALL_STUDENTS else len(dirty)}.")
+        for listener in _commit_listeners:
+            listener(None if dirty is _ALL_STUDENTS else frozenset(dirty))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_writes(session):
+    session.info.pop(_DIRTY_KEY, None)
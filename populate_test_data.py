@@ -1,6 +1,5 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from backend import models, schemas, crud
+from backend.database import DATABASE_URL, create_db_engine, create_session_factory
 from datetime import datetime, timedelta, timezone
 import uuid
 import os
@@ -10,11 +9,9 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'backend')))
 
 # Database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///./atlas.db"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SQLALCHEMY_DATABASE_URL = DATABASE_URL
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
+SessionLocal = create_session_factory(engine)
 
 def get_db():
     db = SessionLocal()